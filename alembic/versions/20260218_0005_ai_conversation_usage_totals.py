@@ -0,0 +1,27 @@
+"""ai conversation token and cost totals
+
+Revision ID: 20260218_0005
+Revises: 20260218_0004
+Create Date: 2026-02-18 00:05:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260218_0005"
+down_revision: Union[str, None] = "20260218_0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("ai_conversations", sa.Column("total_tokens", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("ai_conversations", sa.Column("total_cost", sa.Float(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("ai_conversations", "total_cost")
+    op.drop_column("ai_conversations", "total_tokens")
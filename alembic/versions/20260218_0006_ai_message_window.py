@@ -0,0 +1,27 @@
+"""ai message window index and rolling summary marker
+
+Revision ID: 20260218_0006
+Revises: 20260218_0005
+Create Date: 2026-02-18 00:06:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260218_0006"
+down_revision: Union[str, None] = "20260218_0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_ai_messages_conversation_created", "ai_messages", ["conversation_id", "created_at"], unique=False)
+    op.add_column("ai_conversations", sa.Column("summarized_through_id", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ai_conversations", "summarized_through_id")
+    op.drop_index("ix_ai_messages_conversation_created", table_name="ai_messages")
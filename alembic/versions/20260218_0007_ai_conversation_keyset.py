@@ -0,0 +1,24 @@
+"""ai conversation keyset pagination index
+
+Revision ID: 20260218_0007
+Revises: 20260218_0006
+Create Date: 2026-02-18 00:07:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "20260218_0007"
+down_revision: Union[str, None] = "20260218_0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_ai_conversations_user_updated", "ai_conversations", ["user_id", "updated_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_conversations_user_updated", table_name="ai_conversations")
@@ -5,19 +5,25 @@ from uuid import uuid4
 from datetime import datetime, timedelta, time, date
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
-from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
 
 from app.db.session import get_db
+from app.db.upsert import get_or_create
+from app.core.admission import llm_admission
+from app.core.conditional import compute_etag, etag_matches, not_modified, set_etag
 from app.core.config import settings
+from app.core.serialization import SeriesFormat, negotiate_series_format
 from app.core.security import (
     RateLimitRule,
     SlidingWindowLimiter,
+    decode_access_token,
     get_current_token_claims,
     verify_request_signature,
     has_prompt_injection_risk,
     llm_usage_limiter,
     require_admin,
+    revoke_access_token,
     sanitize_text,
 )
 from app.models import (
@@ -33,9 +39,9 @@ from app.models import (
     User,
     LLMUsageDaily,
     VitalsEntry,
-    Recipe,
     Report,
     ReportParameter,
+    data_version,
 )
 from app.schemas.schemas import (
     AppleHealthImportRequest,
@@ -44,6 +50,7 @@ from app.schemas.schemas import (
     CoachingWaistResponse,
     CompleteChallengeRequest,
     CoachingMessageResponse,
+    DailySummaryRangeResponse,
     DailySummaryResponse,
     ExerciseSummaryResponse,
     LLMAnalyzeRequest,
@@ -76,7 +83,9 @@ from app.schemas.schemas import (
     AuthMeResponse,
     PasswordResetConfirmRequest,
     PasswordResetRequest,
+    AdvancedAnalyticsColumnarResponse,
     AdvancedAnalyticsResponse,
+    HabitIntelligenceColumnarResponse,
     HabitIntelligenceResponse,
     MetabolicPhasePerformanceResponse,
     MovementPanelResponse,
@@ -87,14 +96,31 @@ from app.schemas.schemas import (
 )
 from app.services.apple_health_service import AppleHealthService
 from app.services.challenge_engine import ChallengeEngine
+from app.services.dashboard_service import (
+    challenge_response,
+    daily_summary_response,
+    exercise_summary_response,
+    notification_settings_response,
+    profile_response,
+    recipe_response,
+    vitals_summary_response,
+)
+from app.services.daily_totals import (
+    apply_meal_deltas,
+    get_or_create_daily_log,
+    meal_contribution,
+    record_dinner,
+    summarize_range,
+)
 from app.services.exercise_engine import is_supported_movement
 from app.services.llm_service import llm_service
 from app.services.notification_service import notification_service
 from app.services.push_service import push_service
-from app.services.hydration_engine import apply_hydration_update, HYDRATION_TARGET_MIN_ML, HYDRATION_TARGET_MAX_ML
+from app.services.hydration_engine import apply_hydration_update, HYDRATION_TARGET_MIN_ML
+from app.services.insulin_engine import classify_insulin_score
 from app.services.metabolic_advisor_service import metabolic_advisor_service
 from app.services.food_image_service import food_image_service
-from app.services.recipe_service import recipe_service
+from app.services.recipe_service import RECIPE_CATALOG_VERSION, recipe_service
 from app.services.analytics_engine import analytics_engine
 from app.services.habit_intelligence_engine import habit_intelligence_engine
 from app.services.metabolic_phase_service import metabolic_phase_service
@@ -102,7 +128,6 @@ from app.services.movement_engine import movement_engine
 from app.services.auth_service import auth_service
 from app.services.audit_service import audit_service
 from app.services.rule_engine import (
-    calculate_daily_macros,
     evaluate_daily_status,
     get_or_create_metabolic_profile,
     validate_carb_limit,
@@ -110,16 +135,14 @@ from app.services.rule_engine import (
     validate_oil_limit,
     validate_protein_minimum,
 )
-from app.services.strength_engine import (
-    compute_grip_improvement_percent,
-    compute_monkey_bar_progress,
-    compute_strength_score,
-    compute_weekly_strength_graph,
-    metabolic_strength_signals,
-)
-from app.services.vitals_engine import calculate_vitals_risk_score
+from app.services.vitals_engine import apply_waist_coaching
 from app.services.report_parser_service import parse_lab_report
 
+
+def _user_etag(request: Request, db: Session, user_id: int) -> str:
+    return compute_etag(request, user_id, data_version(db, user_id))
+
+
 public_router = APIRouter()
 protected_router = APIRouter(dependencies=[Depends(get_current_token_claims)])
 logger = logging.getLogger(__name__)
@@ -127,31 +150,6 @@ health_sync_rate_limiter = SlidingWindowLimiter()
 parsed_report_store: dict[str, dict] = {}
 
 
-def _to_recipe_response(recipe: Recipe) -> RecipeResponse:
-    links = [link for link in [recipe.external_link_primary, recipe.external_link_secondary] if link]
-    return RecipeResponse(
-        id=recipe.id,
-        name=recipe.name,
-        ingredients=recipe.ingredients,
-        macros={"protein": recipe.protein, "carbs": recipe.carbs, "fats": recipe.fats},
-        cooking_time_minutes=recipe.cooking_time_minutes,
-        oil_usage_tsp=recipe.oil_usage_tsp,
-        insulin_score_impact=recipe.insulin_score_impact,
-        external_links=links,
-    )
-
-
-def _get_or_create_daily_log(db: Session, user_id: int, log_date):
-    daily_log = db.scalar(select(DailyLog).where(DailyLog.user_id == user_id, DailyLog.log_date == log_date))
-    if daily_log:
-        return daily_log
-
-    daily_log = DailyLog(user_id=user_id, log_date=log_date)
-    db.add(daily_log)
-    db.flush()
-    return daily_log
-
-
 login_rate_limiter = SlidingWindowLimiter()
 register_rate_limiter = SlidingWindowLimiter()
 
@@ -191,13 +189,17 @@ def _validate_csrf(request: Request) -> None:
 
 
 def _increment_llm_daily_usage(db: Session, user_id: int, route: str, ip_address: str | None) -> bool:
-    usage = db.scalar(select(LLMUsageDaily).where(LLMUsageDaily.user_id == user_id, LLMUsageDaily.usage_date == date.today()))
-    if not usage:
-        usage = LLMUsageDaily(user_id=user_id, usage_date=date.today(), request_count=0)
-        db.add(usage)
-        db.flush()
-
-    if usage.request_count >= settings.llm_requests_per_day:
+    usage = get_or_create(db, LLMUsageDaily, {"user_id": user_id, "usage_date": date.today()}, {"request_count": 0})
+    # Check and increment in one statement so concurrent calls cannot both take the last slot.
+    incremented = db.execute(
+        update(LLMUsageDaily)
+        .where(LLMUsageDaily.id == usage.id, LLMUsageDaily.request_count < settings.llm_requests_per_day)
+        .values(request_count=LLMUsageDaily.request_count + 1, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    if not incremented:
+        daily_count = db.scalar(select(LLMUsageDaily.request_count).where(LLMUsageDaily.id == usage.id))
         audit_service.log_event(
             db,
             event_type="excess_llm_calls",
@@ -205,14 +207,10 @@ def _increment_llm_daily_usage(db: Session, user_id: int, route: str, ip_address
             user_id=user_id,
             ip_address=ip_address,
             route=route,
-            details={"daily_count": usage.request_count, "daily_limit": settings.llm_requests_per_day},
+            details={"daily_count": daily_count, "daily_limit": settings.llm_requests_per_day},
         )
         db.commit()
         return False
-
-    usage.request_count += 1
-    usage.updated_at = datetime.utcnow()
-    db.flush()
     return True
 
 
@@ -222,6 +220,10 @@ def login(payload: LoginRequest, request: Request, response: Response, db: Sessi
     limit_rule = RateLimitRule(limit=5, window_seconds=60)
     if not login_rate_limiter.is_allowed(f"login:{client_ip}", limit_rule):
         raise HTTPException(status_code=429, detail="Too many login attempts. Please retry later.")
+    # Per account too, so a distributed burst against one email is cut off before any bcrypt work.
+    email_rule = RateLimitRule(limit=settings.login_rate_limit_attempts, window_seconds=settings.login_rate_limit_window_seconds)
+    if not login_rate_limiter.is_allowed(f"login-email:{payload.email.lower().strip()}", email_rule):
+        raise HTTPException(status_code=429, detail="Too many login attempts. Please retry later.")
 
     token_bundle = auth_service.authenticate(db, payload.email, payload.password, client_ip)
     _set_refresh_cookie(response, token_bundle["refresh_token"])
@@ -254,17 +256,30 @@ def refresh_token(request: Request, response: Response, db: Session = Depends(ge
     if not refresh_cookie:
         raise HTTPException(status_code=403, detail="Refresh token missing")
     token_bundle = auth_service.rotate_refresh_token(db, refresh_cookie)
+    # A client that still presents its old access token retires it with the rotation.
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        try:
+            revoke_access_token(decode_access_token(authorization.replace("Bearer ", "", 1).strip()))
+        except HTTPException:
+            pass
     _set_refresh_cookie(response, token_bundle["refresh_token"])
     _set_csrf_cookie(response)
     return AuthTokenResponse(access_token=token_bundle["access_token"], expires_in_seconds=token_bundle["expires_in_seconds"])
 
 
 @protected_router.post("/auth/logout")
-def logout(request: Request, response: Response, db: Session = Depends(get_db)):
+def logout(
+    request: Request,
+    response: Response,
+    claims: dict = Depends(get_current_token_claims),
+    db: Session = Depends(get_db),
+):
     _validate_csrf(request)
     refresh_cookie = request.cookies.get("refresh_token")
     if refresh_cookie:
         auth_service.logout(db, refresh_cookie)
+    revoke_access_token(claims)
     response.delete_cookie("refresh_token", path="/")
     response.delete_cookie("csrf_token", path="/")
     return {"status": "ok"}
@@ -305,11 +320,12 @@ def log_food(payload: LogFoodRequest, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Banana and mango are blocked during reset for high triglycerides.")
 
     log_date = payload.consumed_at.date()
-    daily_log = _get_or_create_daily_log(db, payload.user_id, log_date)
+    daily_log = get_or_create_daily_log(db, payload.user_id, log_date)
 
     meal_context = payload.meal_context.lower().strip()
     is_dinner = meal_context == "dinner"
 
+    logged_foods = [food_map[entry.food_item_id] for entry in payload.entries]
     for entry in payload.entries:
         db.add(
             MealEntry(
@@ -321,59 +337,14 @@ def log_food(payload: LogFoodRequest, db: Session = Depends(get_db)):
         )
 
     db.flush()
-
-    meal_entries = db.scalars(
-        select(MealEntry).options(joinedload(MealEntry.food_item)).where(MealEntry.daily_log_id == daily_log.id)
-    ).all()
-
-    todays_fruit_servings = sum(
-        entry.servings
-        for entry in meal_entries
-        if entry.food_item.food_group == "fruit"
-    )
-    todays_nut_servings = sum(
-        entry.servings
-        for entry in meal_entries
-        if entry.food_item.food_group == "nut" and not entry.food_item.nut_seed_exception
-    )
-
-    macro_inputs = [
-        {
-            "protein": entry.food_item.protein,
-            "carbs": entry.food_item.carbs,
-            "fats": entry.food_item.fats,
-            "sugar": entry.food_item.sugar,
-            "fiber": entry.food_item.fiber,
-            "hdl_support_score": entry.food_item.hdl_support_score,
-            "triglyceride_risk_weight": entry.food_item.triglyceride_risk_weight,
-            "hidden_oil_estimate": entry.food_item.hidden_oil_estimate,
-            "servings": entry.servings,
-        }
-        for entry in meal_entries
-    ]
-    totals = calculate_daily_macros(macro_inputs)
-
-    daily_log.total_protein = totals["protein"]
-    daily_log.total_carbs = totals["carbs"]
-    daily_log.total_fats = totals["fats"]
-    daily_log.total_sugar = totals["sugar"]
-    daily_log.total_fiber = totals["fiber"]
-    daily_log.total_hdl_support = totals["hdl_support"]
-    daily_log.total_triglyceride_risk = totals["triglyceride_risk"]
-    daily_log.total_hidden_oil = totals["hidden_oil"]
+    contributions = [meal_contribution(food_map[entry.food_item_id], entry.servings) for entry in payload.entries]
+    apply_meal_deltas(db, daily_log, contributions)
 
     if is_dinner:
-        dinner_payload = {
-            "carbs": round(sum(entry.food_item.carbs * entry.servings for entry in meal_entries if entry.consumed_at.date() == log_date and entry.consumed_at == payload.consumed_at), 2),
-            "protein": round(sum(entry.food_item.protein * entry.servings for entry in meal_entries if entry.consumed_at.date() == log_date and entry.consumed_at == payload.consumed_at), 2),
-        }
-        daily_log.dinner_meal = dinner_payload
-        daily_log.dinner_mode = payload.dinner_mode
-        daily_log.dinner_logged_at = payload.consumed_at
+        record_dinner(daily_log, contributions, payload.consumed_at, payload.dinner_mode)
 
     db.flush()
 
-    daily_log = db.scalar(select(DailyLog).options(joinedload(DailyLog.user), joinedload(DailyLog.meal_entries)).where(DailyLog.id == daily_log.id))
     status = evaluate_daily_status(db, daily_log, profile)
     daily_log.dinner_insulin_impact = status.get("dinner_insulin_impact", 0.0)
     daily_log.evening_insulin_spike_risk = status.get("evening_insulin_spike_risk", False)
@@ -383,6 +354,15 @@ def log_food(payload: LogFoodRequest, db: Session = Depends(get_db)):
     movement_engine.evaluate(db, payload.user_id, now=payload.consumed_at)
     db.commit()
 
+    totals = {
+        "protein": round(daily_log.total_protein, 2),
+        "carbs": round(daily_log.total_carbs, 2),
+        "fats": round(daily_log.total_fats, 2),
+        "sugar": round(daily_log.total_sugar, 2),
+        "fiber": round(daily_log.total_fiber, 2),
+        "hidden_oil": round(daily_log.total_hidden_oil, 2),
+    }
+
     fruit_budget_limit = 1
     two_week_start = log_date - timedelta(days=13)
     waist_entries = db.scalars(
@@ -400,13 +380,13 @@ def log_food(payload: LogFoodRequest, db: Session = Depends(get_db)):
 
     suggestions: list[str] = []
     warnings: list[str] = []
-    if any(entry.food_item.food_group == "fruit" for entry in meal_entries):
+    if any(food.food_group == "fruit" for food in logged_foods):
         suggestions.append("Pair fruit with protein.")
-    if any(entry.food_item.food_group == "nut" for entry in meal_entries):
+    if any(food.food_group == "nut" for food in logged_foods):
         suggestions.append("Healthy fat – supports HDL.")
-    if any(entry.food_item.name.lower() == "banana" for entry in meal_entries):
+    if any(food.name.lower() == "banana" for food in logged_foods):
         warnings.append("High insulin fruit for current triglyceride level.")
-    if daily_log.total_carbs >= profile.carb_ceiling and any(entry.food_item.name.lower() == "mango" for entry in meal_entries):
+    if daily_log.total_carbs >= profile.carb_ceiling and any(food.name.lower() == "mango" for food in logged_foods):
         warnings.append("High triglyceride risk.")
     if daily_log.evening_insulin_spike_risk:
         warnings.append("Evening insulin spike risk")
@@ -427,9 +407,9 @@ def log_food(payload: LogFoodRequest, db: Session = Depends(get_db)):
         insulin_load_score=status["insulin_load_score"],
         total_sugar=totals["sugar"],
         total_fiber=totals["fiber"],
-        fruit_servings=todays_fruit_servings,
+        fruit_servings=round(daily_log.fruit_servings, 2),
         fruit_budget=fruit_budget_limit,
-        nuts_servings=todays_nut_servings,
+        nuts_servings=round(daily_log.nut_servings, 2),
         nuts_budget=1.0,
         remaining_carb_budget=max(0.0, round(profile.carb_ceiling - totals["carbs"], 2)),
         suggestions=suggestions,
@@ -457,53 +437,55 @@ def daily_summary(
 
     user = db.get(User, user_id)
     profile = get_or_create_metabolic_profile(db, user)
-    latest_score = db.scalar(
-        select(InsulinScore.score)
-        .where(InsulinScore.daily_log_id == daily_log.id)
-        .order_by(InsulinScore.calculated_at.desc())
-        .limit(1)
-    )
+    return daily_summary_response(db, daily_log, profile)
 
-    validations = {
-        "carb_limit": validate_carb_limit(daily_log.total_carbs, profile.carb_ceiling),
-        "oil_limit": validate_oil_limit(daily_log.total_hidden_oil, profile.oil_limit_tsp),
-        "protein_minimum": validate_protein_minimum(daily_log.total_protein, profile.protein_target_min),
-    }
 
-    meal_entries = db.scalars(select(MealEntry).options(joinedload(MealEntry.food_item)).where(MealEntry.daily_log_id == daily_log.id)).all()
-    fruit_servings = sum(entry.servings for entry in meal_entries if entry.food_item.food_group == "fruit")
-    nuts_servings = sum(entry.servings for entry in meal_entries if entry.food_item.food_group == "nut" and not entry.food_item.nut_seed_exception)
-    warnings = []
-    if any(entry.food_item.name.lower() == "banana" for entry in meal_entries):
-        warnings.append("High insulin fruit for current triglyceride level.")
+@protected_router.get("/daily-summary/range", response_model=DailySummaryRangeResponse)
+def daily_summary_range(
+    start: date = Query(...),
+    end: date = Query(...),
+    user_id: int = Query(default=1),
+    db: Session = Depends(get_db),
+):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must be on or after start")
+    if (end - start).days + 1 > settings.daily_summary_range_max_days:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range exceeds {settings.daily_summary_range_max_days} days; request a shorter window",
+        )
+    user = db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    return DailySummaryResponse(
-        date=target_date,
-        total_protein=daily_log.total_protein,
-        total_carbs=daily_log.total_carbs,
-        total_fats=daily_log.total_fats,
-        total_sugar=daily_log.total_sugar,
-        total_fiber=daily_log.total_fiber,
-        total_hidden_oil=daily_log.total_hidden_oil,
-        insulin_load_score=latest_score,
-        fruit_servings=fruit_servings,
-        fruit_budget=1.0,
-        nuts_servings=nuts_servings,
-        nuts_budget=1.0,
-        remaining_carb_budget=max(0.0, round(profile.carb_ceiling - daily_log.total_carbs, 2)),
-        warnings=warnings,
-        water_ml=daily_log.water_ml,
-        hydration_score=daily_log.hydration_score,
-        hydration_target_min_ml=HYDRATION_TARGET_MIN_ML,
-        hydration_target_max_ml=HYDRATION_TARGET_MAX_ML,
-        hydration_target_achieved=daily_log.water_ml >= HYDRATION_TARGET_MIN_ML,
-        validations=validations,
-        dinner_logged=bool(daily_log.dinner_meal),
-        dinner_carbs=float((daily_log.dinner_meal or {}).get("carbs", 0.0)),
-        dinner_protein=float((daily_log.dinner_meal or {}).get("protein", 0.0)),
-        dinner_mode=daily_log.dinner_mode,
-        dinner_insulin_impact=daily_log.dinner_insulin_impact,
-        evening_insulin_spike_risk=daily_log.evening_insulin_spike_risk,
+    profile = get_or_create_metabolic_profile(db, user)
+    rows = summarize_range(db, user_id, start, end)
+    db.commit()
+    return DailySummaryRangeResponse(
+        user_id=user_id,
+        start=start,
+        end=end,
+        dates=[row.log_date for row in rows],
+        total_protein=[row.total_protein for row in rows],
+        total_carbs=[row.total_carbs for row in rows],
+        total_fats=[row.total_fats for row in rows],
+        total_sugar=[row.total_sugar for row in rows],
+        total_fiber=[row.total_fiber for row in rows],
+        total_hidden_oil=[row.total_hidden_oil for row in rows],
+        fruit_servings=[row.fruit_servings for row in rows],
+        nut_servings=[row.nut_servings for row in rows],
+        water_ml=[row.water_ml for row in rows],
+        hydration_score=[row.hydration_score for row in rows],
+        hydration_target_achieved=[row.water_ml >= HYDRATION_TARGET_MIN_ML for row in rows],
+        insulin_load_score=[row.insulin_load_score for row in rows],
+        insulin_status=[
+            classify_insulin_score(row.insulin_load_score, profile) if row.insulin_load_score is not None else None
+            for row in rows
+        ],
+        meal_count=[row.meal_count for row in rows],
+        protein_compliance=[validate_protein_minimum(row.total_protein, profile.protein_target_min) for row in rows],
+        carb_compliance=[validate_carb_limit(row.total_carbs, profile.carb_ceiling) for row in rows],
+        oil_compliance=[validate_oil_limit(row.total_hidden_oil, profile.oil_limit_tsp) for row in rows],
     )
 
 
@@ -545,34 +527,13 @@ def log_vitals(payload: LogVitalsRequest, db: Session = Depends(get_db)):
 
     user = db.get(User, payload.user_id)
     profile = get_or_create_metabolic_profile(db, user)
-
-    coaching_message = "Waist unchanged. Stay consistent with your current plan."
-    waist_change_cm = 0.0
-    carb_ceiling_adjusted = False
-
-    if payload.waist_cm is not None and prior_waist is not None:
-        waist_change_cm = round(payload.waist_cm - prior_waist, 2)
-        if waist_change_cm < 0:
-            coaching_message = f"Great work — waist dropped by {abs(waist_change_cm):.2f} cm. Keep the momentum!"
-        elif waist_change_cm > 0:
-            old_ceiling = profile.carb_ceiling
-            profile.carb_ceiling = max(20, profile.carb_ceiling - 10)
-            user.carb_ceiling = profile.carb_ceiling
-            carb_ceiling_adjusted = profile.carb_ceiling != old_ceiling
-            coaching_message = (
-                f"Waist increased by {waist_change_cm:.2f} cm. Tightening carb ceiling to {profile.carb_ceiling}g for recovery."
-            )
+    coaching = apply_waist_coaching(user, profile, payload.waist_cm, prior_waist)
 
     db.commit()
     return {
         "status": "ok",
         "vitals_entry_id": vitals.id,
-        "coaching": CoachingWaistResponse(
-            message=coaching_message,
-            waist_change_cm=waist_change_cm,
-            carb_ceiling_adjusted=carb_ceiling_adjusted,
-            carb_ceiling=profile.carb_ceiling,
-        ).model_dump(),
+        "coaching": CoachingWaistResponse(**coaching).model_dump(),
     }
 
 
@@ -584,7 +545,7 @@ def log_exercise(payload: LogExerciseRequest, db: Session = Depends(get_db)):
     if not is_supported_movement(payload.exercise_category, payload.movement_type):
         raise HTTPException(status_code=400, detail="Unsupported movement_type for category")
 
-    daily_log = _get_or_create_daily_log(
+    daily_log = get_or_create_daily_log(
         db,
         payload.user_id,
         (payload.performed_at or datetime.utcnow()).date(),
@@ -622,24 +583,42 @@ def log_exercise(payload: LogExerciseRequest, db: Session = Depends(get_db)):
     return {"status": "ok", "exercise_entry_id": entry.id}
 
 
-@protected_router.get("/analytics/advanced", response_model=AdvancedAnalyticsResponse)
+@protected_router.get(
+    "/analytics/advanced",
+    response_model=AdvancedAnalyticsResponse | AdvancedAnalyticsColumnarResponse,
+)
 def advanced_analytics(
+    request: Request,
+    response: Response,
     user_id: int = Query(default=1),
     days: int = Query(default=30, ge=7, le=180),
+    series_format: SeriesFormat | None = Query(default=None),
     db: Session = Depends(get_db),
 ):
     analytics = analytics_engine.build_advanced_analytics(db, user_id=user_id, days=days)
     if not analytics:
         raise HTTPException(status_code=404, detail="User not found")
+    response.headers["Vary"] = "Accept"
+    if negotiate_series_format(request, series_format) == "columnar":
+        return AdvancedAnalyticsColumnarResponse(**analytics_engine.to_columnar(analytics))
     return AdvancedAnalyticsResponse(**analytics)
 
 
 @protected_router.get("/metabolic/performance-view", response_model=MetabolicPhasePerformanceResponse)
-def metabolic_performance_view(user_id: int = Query(default=1), db: Session = Depends(get_db)):
+def metabolic_performance_view(
+    request: Request,
+    response: Response,
+    user_id: int = Query(default=1),
+    db: Session = Depends(get_db),
+):
+    etag = _user_etag(request, db, user_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     payload = metabolic_phase_service.build_phase_dashboard(db, user_id=user_id)
     if not payload:
         raise HTTPException(status_code=404, detail="User not found")
     db.commit()
+    set_etag(response, _user_etag(request, db, user_id))
     return MetabolicPhasePerformanceResponse(**payload)
 
 
@@ -711,26 +690,17 @@ def metabolic_advisor_report(
 
 
 @protected_router.get("/profile", response_model=ProfileResponse)
-def get_profile(user_id: int = Query(default=1), db: Session = Depends(get_db)):
+def get_profile(request: Request, response: Response, user_id: int = Query(default=1), db: Session = Depends(get_db)):
+    etag = _user_etag(request, db, user_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     profile = get_or_create_metabolic_profile(db, user)
     db.commit()
-    return ProfileResponse(
-        user_id=user.id,
-        protein_target_min=profile.protein_target_min,
-        protein_target_max=profile.protein_target_max,
-        carb_ceiling=profile.carb_ceiling,
-        oil_limit_tsp=profile.oil_limit_tsp,
-        fasting_start_time=profile.fasting_start_time,
-        fasting_end_time=profile.fasting_end_time,
-        max_chapati_per_day=profile.max_chapati_per_day,
-        allow_rice=profile.allow_rice,
-        chocolate_limit_per_day=profile.chocolate_limit_per_day,
-        insulin_score_green_threshold=profile.insulin_score_green_threshold,
-        insulin_score_yellow_threshold=profile.insulin_score_yellow_threshold,
-    )
+    set_etag(response, _user_etag(request, db, user_id))
+    return profile_response(user, profile)
 
 
 @protected_router.put("/profile", response_model=ProfileResponse)
@@ -746,48 +716,13 @@ def put_profile(payload: UpdateProfileRequest, user_id: int = Query(default=1),
 
     db.commit()
     db.refresh(profile)
-    return ProfileResponse(
-        user_id=user.id,
-        protein_target_min=profile.protein_target_min,
-        protein_target_max=profile.protein_target_max,
-        carb_ceiling=profile.carb_ceiling,
-        oil_limit_tsp=profile.oil_limit_tsp,
-        fasting_start_time=profile.fasting_start_time,
-        fasting_end_time=profile.fasting_end_time,
-        max_chapati_per_day=profile.max_chapati_per_day,
-        allow_rice=profile.allow_rice,
-        chocolate_limit_per_day=profile.chocolate_limit_per_day,
-        insulin_score_green_threshold=profile.insulin_score_green_threshold,
-        insulin_score_yellow_threshold=profile.insulin_score_yellow_threshold,
-    )
+    return profile_response(user, profile)
 
 
 @protected_router.get("/exercise-summary", response_model=ExerciseSummaryResponse)
 def exercise_summary(user_id: int = Query(default=1), db: Session = Depends(get_db)):
     entries = db.scalars(select(ExerciseEntry).where(ExerciseEntry.user_id == user_id)).all()
-    total_sessions = len(entries)
-    total_duration = sum(entry.duration_minutes for entry in entries)
-    total_steps = sum(entry.step_count or 0 for entry in entries)
-
-    strength_score = compute_strength_score(entries)
-    monkey_bar_progress = compute_monkey_bar_progress(entries)
-    weekly_strength_graph = compute_weekly_strength_graph(entries)
-    grip_strength_improvement_pct = compute_grip_improvement_percent(entries)
-    metabolic_signals = metabolic_strength_signals(entries)
-
-    return ExerciseSummaryResponse(
-        user_id=user_id,
-        total_sessions=total_sessions,
-        total_duration_minutes=total_duration,
-        total_steps=total_steps,
-        strength_index=float(strength_score["strength_index"]),
-        grip_strength_improvement_pct=grip_strength_improvement_pct,
-        hdl_improvement_mode=bool(metabolic_signals["hdl_improvement_mode"]),
-        muscle_stimulus_reduced=bool(metabolic_signals["muscle_stimulus_reduced"]),
-        metabolic_message=str(metabolic_signals["metabolic_message"]),
-        monkey_bar_progress=monkey_bar_progress,
-        weekly_strength_graph=weekly_strength_graph,
-    )
+    return exercise_summary_response(user_id, entries)
 
 
 @protected_router.get("/vitals-summary", response_model=VitalsSummaryResponse)
@@ -795,19 +730,10 @@ def vitals_summary(user_id: int = Query(default=1), db: Session = Depends(get_db
     vitals_entries = db.scalars(
         select(VitalsEntry).where(VitalsEntry.user_id == user_id).order_by(VitalsEntry.recorded_at.asc())
     ).all()
-    if not vitals_entries:
+    summary = vitals_summary_response(user_id, vitals_entries)
+    if summary is None:
         raise HTTPException(status_code=404, detail="No vitals data found")
-
-    latest = vitals_entries[-1]
-    risk = calculate_vitals_risk_score(vitals_entries)
-
-    return VitalsSummaryResponse(
-        user_id=user_id,
-        latest_steps_total=latest.steps_total,
-        latest_resting_hr=latest.resting_hr,
-        latest_sleep_hours=latest.sleep_hours,
-        risk_flag=risk["flag"],
-    )
+    return summary
 
 
 def _validate_health_sync_payload(payload: HealthSummarySyncPayload):
@@ -868,10 +794,15 @@ def _merge_health_sync(existing: HealthSyncSummary, payload: HealthSummarySyncPa
     return merged_data, changed
 
 
+async def _raw_request_body(request: Request) -> bytes:
+    return await request.body()
+
+
 @protected_router.post("/health/sync-summary")
-async def sync_health_summary(
+def sync_health_summary(
     payload: HealthSummarySyncPayload,
     request: Request,
+    body: bytes = Depends(_raw_request_body),
     claims: dict = Depends(get_current_token_claims),
     db: Session = Depends(get_db),
 ):
@@ -900,7 +831,6 @@ async def sync_health_summary(
     except ValueError as exc:
         raise HTTPException(status_code=401, detail="Invalid sync timestamp header") from exc
 
-    body = await request.body()
     if not verify_request_signature(
         body=body,
         signature=signature,
@@ -990,23 +920,11 @@ def import_apple_health(
 
 
 
-def _challenge_payload(challenge: ChallengeAssignment, current_streak: int, longest_streak: int) -> ChallengeResponse:
-    return ChallengeResponse(
-        challenge_id=challenge.id,
-        frequency=challenge.frequency.value,
-        title=challenge.challenge_name,
-        description=challenge.challenge_description,
-        goal_metric=challenge.goal_metric,
-        goal_target=challenge.goal_target,
-        completed=challenge.completed,
-        current_streak=current_streak,
-        longest_streak=longest_streak,
-        banner_title="7 Day Insulin Control Challenge",
-    )
-
-
 @protected_router.get("/challenge", response_model=ChallengeResponse)
-def get_daily_challenge(user_id: int = Query(default=1), db: Session = Depends(get_db)):
+def get_daily_challenge(request: Request, response: Response, user_id: int = Query(default=1), db: Session = Depends(get_db)):
+    etag = _user_etag(request, db, user_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1015,25 +933,43 @@ def get_daily_challenge(user_id: int = Query(default=1), db: Session = Depends(g
     challenge = engine.assign_for_today(user, ChallengeFrequency.DAILY)
     streak = engine.get_or_create_streak(user.id, ChallengeFrequency.DAILY)
     db.commit()
-    return _challenge_payload(challenge, streak.current_streak, streak.longest_streak)
+    set_etag(response, _user_etag(request, db, user_id))
+    return challenge_response(challenge, streak.current_streak, streak.longest_streak)
 
 
-@protected_router.get("/habits/intelligence", response_model=HabitIntelligenceResponse)
+@protected_router.get(
+    "/habits/intelligence",
+    response_model=HabitIntelligenceResponse | HabitIntelligenceColumnarResponse,
+)
 def get_habit_intelligence(
+    request: Request,
+    response: Response,
     user_id: int = Query(default=1),
     days: int = Query(default=90, ge=7, le=365),
+    series_format: SeriesFormat | None = Query(default=None),
     db: Session = Depends(get_db),
 ):
+    resolved_format = negotiate_series_format(request, series_format)
+    etag = compute_etag(request, user_id, data_version(db, user_id), variant=resolved_format)
+    if etag_matches(request, etag):
+        return not_modified(etag, vary="Accept")
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     summary = habit_intelligence_engine.summarize(db, user_id=user_id, days=days)
+    set_etag(response, etag)
+    response.headers["Vary"] = "Accept"
+    if resolved_format == "columnar":
+        return HabitIntelligenceColumnarResponse(**habit_intelligence_engine.to_columnar(summary))
     return HabitIntelligenceResponse(**summary)
 
 
 @protected_router.get("/challenge/monthly", response_model=ChallengeResponse)
-def get_monthly_challenge(user_id: int = Query(default=1), db: Session = Depends(get_db)):
+def get_monthly_challenge(request: Request, response: Response, user_id: int = Query(default=1), db: Session = Depends(get_db)):
+    etag = _user_etag(request, db, user_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1042,7 +978,8 @@ def get_monthly_challenge(user_id: int = Query(default=1), db: Session = Depends
     challenge = engine.assign_for_today(user, ChallengeFrequency.MONTHLY)
     streak = engine.get_or_create_streak(user.id, ChallengeFrequency.MONTHLY)
     db.commit()
-    return _challenge_payload(challenge, streak.current_streak, streak.longest_streak)
+    set_etag(response, _user_etag(request, db, user_id))
+    return challenge_response(challenge, streak.current_streak, streak.longest_streak)
 
 
 @protected_router.post("/challenge/complete", response_model=ChallengeResponse)
@@ -1059,7 +996,7 @@ def complete_challenge(payload: CompleteChallengeRequest, db: Session = Depends(
     engine = ChallengeEngine(db)
     streak = engine.mark_completed(challenge)
     db.commit()
-    return _challenge_payload(challenge, streak.current_streak, streak.longest_streak)
+    return challenge_response(challenge, streak.current_streak, streak.longest_streak)
 
 @protected_router.post("/external-event")
 def external_event(payload: dict):
@@ -1067,6 +1004,7 @@ def external_event(payload: dict):
 
 
 @protected_router.post("/whatsapp-message", response_model=CoachingMessageResponse)
+@llm_admission.guard
 def whatsapp_message(payload: WhatsAppMessageRequest, db: Session = Depends(get_db)):
     user = db.get(User, payload.user_id)
     if not user:
@@ -1131,22 +1069,7 @@ def get_notification_settings(user_id: int = Query(default=1), db: Session = Dep
 
     settings = notification_service.get_or_create_settings(db, user_id)
     db.commit()
-    return NotificationSettingsResponse(
-        user_id=user_id,
-        whatsapp_enabled=settings.whatsapp_enabled,
-        push_enabled=settings.push_enabled,
-        email_enabled=settings.email_enabled,
-        silent_mode=settings.silent_mode,
-        protein_reminders_enabled=settings.protein_reminders_enabled,
-        fasting_alerts_enabled=settings.fasting_alerts_enabled,
-        hydration_alerts_enabled=settings.hydration_alerts_enabled,
-        insulin_alerts_enabled=settings.insulin_alerts_enabled,
-        strength_reminders_enabled=settings.strength_reminders_enabled,
-        quiet_hours_start=settings.quiet_hours_start,
-        quiet_hours_end=settings.quiet_hours_end,
-        movement_reminder_delay_minutes=settings.movement_reminder_delay_minutes,
-        movement_sensitivity=settings.movement_sensitivity,
-    )
+    return notification_settings_response(user_id, settings)
 
 
 @protected_router.put("/notification-settings", response_model=NotificationSettingsResponse)
@@ -1167,22 +1090,7 @@ def update_notification_settings(
     db.commit()
     db.refresh(settings)
 
-    return NotificationSettingsResponse(
-        user_id=user_id,
-        whatsapp_enabled=settings.whatsapp_enabled,
-        push_enabled=settings.push_enabled,
-        email_enabled=settings.email_enabled,
-        silent_mode=settings.silent_mode,
-        protein_reminders_enabled=settings.protein_reminders_enabled,
-        fasting_alerts_enabled=settings.fasting_alerts_enabled,
-        hydration_alerts_enabled=settings.hydration_alerts_enabled,
-        insulin_alerts_enabled=settings.insulin_alerts_enabled,
-        strength_reminders_enabled=settings.strength_reminders_enabled,
-        quiet_hours_start=settings.quiet_hours_start,
-        quiet_hours_end=settings.quiet_hours_end,
-        movement_reminder_delay_minutes=settings.movement_reminder_delay_minutes,
-        movement_sensitivity=settings.movement_sensitivity,
-    )
+    return notification_settings_response(user_id, settings)
 
 
 @protected_router.get("/movement/panel", response_model=MovementPanelResponse)
@@ -1262,10 +1170,10 @@ def hydration_log(payload: HydrationLogRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
 
     target_date = payload.log_date or date.today()
-    daily_log = _get_or_create_daily_log(db, payload.user_id, target_date)
-    data = apply_hydration_update(daily_log, payload.amount_ml)
+    daily_log = get_or_create_daily_log(db, payload.user_id, target_date)
+    data = apply_hydration_update(db, daily_log, payload.amount_ml)
 
-    if datetime.utcnow().hour >= 16 and daily_log.water_ml < 1500:
+    if datetime.utcnow().hour >= 16 and data["water_ml"] < 1500:
         settings_row = notification_service.get_or_create_settings(db, payload.user_id)
         if settings_row.hydration_alerts_enabled:
             notification_service.send_message(
@@ -1274,7 +1182,7 @@ def hydration_log(payload: HydrationLogRequest, db: Session = Depends(get_db)):
                 channel="push",
                 title="Hydration Check",
                 body="Hydration check – have you had water?",
-                metadata={"water_ml": daily_log.water_ml},
+                metadata={"water_ml": data["water_ml"]},
             )
 
     db.commit()
@@ -1301,6 +1209,7 @@ def _extract_text_from_report(path: Path, content_type: str) -> str:
 
 
 @protected_router.post('/reports/upload', response_model=ReportUploadResponse)
+@llm_admission.guard
 def upload_report(file: UploadFile = File(...), claims: dict = Depends(get_current_token_claims)):
     if not file.content_type:
         raise HTTPException(status_code=400, detail='File type missing')
@@ -1382,6 +1291,7 @@ def confirm_report(payload: ReportConfirmRequest, db: Session = Depends(get_db),
     return {'status': 'ok', 'report_id': report.id}
 
 @protected_router.post("/analyze-food-image", response_model=AnalyzeFoodImageResponse)
+@llm_admission.guard
 def analyze_food_image(
     request: Request,
     image: UploadFile = File(...),
@@ -1444,6 +1354,7 @@ def confirm_food_image_log(payload: ConfirmFoodImageLogRequest, db: Session = De
 
 
 @protected_router.post("/llm/analyze", response_model=LLMAnalyzeResponse)
+@llm_admission.guard
 def llm_analyze(payload: LLMAnalyzeRequest, request: Request, db: Session = Depends(get_db)):
     client_ip = request.client.host if request.client else "unknown"
     if not llm_usage_limiter.check_and_increment(payload.user_id, settings.llm_requests_per_hour):
@@ -1489,9 +1400,13 @@ def llm_analyze(payload: LLMAnalyzeRequest, request: Request, db: Session = Depe
 
 
 @protected_router.get("/recipes", response_model=list[RecipeResponse])
-def list_recipes(db: Session = Depends(get_db)):
+def list_recipes(request: Request, response: Response, db: Session = Depends(get_db)):
+    etag = compute_etag(request, None, RECIPE_CATALOG_VERSION)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     recipes = recipe_service.list_recipes(db)
-    return [_to_recipe_response(recipe) for recipe in recipes]
+    return [recipe_response(recipe) for recipe in recipes]
 
 
 @protected_router.get("/recipes/suggestions", response_model=RecipeSuggestionResponse)
@@ -1506,7 +1421,7 @@ def recipe_suggestions(user_id: int = Query(default=1), db: Session = Depends(ge
         user_id=user_id,
         carb_load_remaining=carb_load_remaining,
         suggestion=suggestion,
-        recipes=[_to_recipe_response(recipe) for recipe in recipes],
+        recipes=[recipe_response(recipe) for recipe in recipes],
     )
 
 
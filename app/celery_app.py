@@ -1,8 +1,25 @@
+import logging
 import os
+from time import perf_counter
+
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun, task_retry, worker_init, worker_process_init, worker_process_shutdown
+from prometheus_client import start_http_server
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.config import settings
+from app.core.monitoring import (
+    CELERY_TASK_DURATION,
+    CELERY_TASK_RETRIES,
+    build_registry,
+    clear_multiprocess_dir,
+    mark_process_dead,
+    multiprocess_dir,
+)
+from app.db.session import dispose_engines, get_sessionmaker
 
-from app.db.session import SessionLocal
+logger = logging.getLogger(__name__)
 
 broker_url = os.getenv("CELERY_BROKER_URL", "redis://:metabolic@redis:6379/0")
 result_backend = os.getenv("CELERY_RESULT_BACKEND", broker_url)
@@ -27,9 +44,85 @@ celery_app.conf.update(
             "task": "metabolic_agent.monthly_review",
             "schedule": crontab(day_of_month="1", hour=5, minute=30),
         },
+        "daily-totals-consistency-check": {
+            "task": "daily_totals.verify_recent",
+            "schedule": crontab(hour=3, minute=45),
+        },
     },
 )
 
+WorkerSessionLocal = get_sessionmaker("worker")
+
+
+_task_started_at: dict[str, float] = {}
+
+
+class CeleryQueueDepthCollector:
+    """Reads broker queue lengths at scrape time so the gauge is never stale."""
+
+    def __init__(self, app: Celery):
+        self.app = app
+
+    def collect(self):
+        depth = GaugeMetricFamily(
+            "myhealthtracker_celery_queue_depth",
+            "Messages waiting in the broker queue",
+            labels=["queue"],
+        )
+        queue = self.app.conf.task_default_queue
+        try:
+            with self.app.connection_for_read() as connection:
+                _name, message_count, _consumers = connection.default_channel.queue_declare(queue=queue, passive=True)
+            depth.add_metric([queue], message_count)
+        except Exception as exc:
+            logger.warning("Unable to read Celery queue depth: %s", exc)
+        yield depth
+
+
+@worker_init.connect
+def _start_metrics_exporter(**_kwargs) -> None:
+    # Tasks run in the prefork children; without a shared sample directory the
+    # parent's registry would serve empty task metrics as if nothing ran.
+    if not multiprocess_dir():
+        logger.warning("PROMETHEUS_MULTIPROC_DIR is not set; Celery metrics exporter not started")
+        return
+    # Runs in the parent before the pool forks, so no child has written samples yet.
+    clear_multiprocess_dir()
+    registry = build_registry()
+    registry.register(CeleryQueueDepthCollector(celery_app))
+    start_http_server(settings.celery_metrics_port, registry=registry)
+    logger.info("Celery metrics exporter listening on port %s", settings.celery_metrics_port)
+
+
+@worker_process_init.connect
+def _reset_db_pool_after_fork(**_kwargs) -> None:
+    # Prefork children inherit the parent's pooled sockets; never share them across processes.
+    dispose_engines(close=False)
+
+
+@worker_process_shutdown.connect
+def _release_worker_metrics(pid=None, **_kwargs) -> None:
+    mark_process_dead(pid)
+
+
+@task_prerun.connect
+def _record_task_start(task_id=None, **_kwargs) -> None:
+    _task_started_at[task_id] = perf_counter()
+
+
+@task_postrun.connect
+def _record_task_duration(task_id=None, task=None, state=None, **_kwargs) -> None:
+    started = _task_started_at.pop(task_id, None)
+    if started is None or task is None:
+        return
+    CELERY_TASK_DURATION.labels(task=task.name, state=state or "UNKNOWN").observe(perf_counter() - started)
+
+
+@task_retry.connect
+def _record_task_retry(sender=None, **_kwargs) -> None:
+    if sender is not None:
+        CELERY_TASK_RETRIES.labels(task=sender.name).inc()
+
 
 @celery_app.task(name="health.ping")
 def ping() -> str:
@@ -40,7 +133,7 @@ def ping() -> str:
 def metabolic_agent_daily_scan() -> dict[str, int]:
     from app.services.metabolic_agent import metabolic_agent_service
 
-    db = SessionLocal()
+    db = WorkerSessionLocal()
     try:
         processed = metabolic_agent_service.run_daily_scan_for_all_users(db)
     finally:
@@ -52,7 +145,7 @@ def metabolic_agent_daily_scan() -> dict[str, int]:
 def metabolic_agent_weekly_analysis() -> dict[str, int]:
     from app.services.metabolic_agent import metabolic_agent_service
 
-    db = SessionLocal()
+    db = WorkerSessionLocal()
     try:
         processed = metabolic_agent_service.run_weekly_analysis_for_all_users(db)
     finally:
@@ -64,9 +157,21 @@ def metabolic_agent_weekly_analysis() -> dict[str, int]:
 def metabolic_agent_monthly_review() -> dict[str, int]:
     from app.services.metabolic_agent import metabolic_agent_service
 
-    db = SessionLocal()
+    db = WorkerSessionLocal()
     try:
         processed = metabolic_agent_service.run_monthly_review_for_all_users(db)
     finally:
         db.close()
     return {"processed_users": processed}
+
+
+@celery_app.task(name="daily_totals.verify_recent")
+def daily_totals_verify_recent() -> dict[str, int]:
+    from app.services.daily_totals import verify_recent_daily_totals
+
+    db = WorkerSessionLocal()
+    try:
+        drifted = verify_recent_daily_totals(db)
+    finally:
+        db.close()
+    return {"drifted_logs": drifted}
@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import math
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+from typing import Any, AsyncIterator, Callable, Iterable
+
+import anyio
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.monitoring import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_WAIT, ADMISSION_REJECTED
+
+_END_OF_STREAM = object()
+
+
+class AdmissionController:
+    """Bounded executor for routes that block on third-party APIs.
+
+    Sync routes normally share AnyIO's default threadpool with meal logging and
+    summaries. Routes wrapped with ``guard`` run here instead, so a burst of
+    slow OpenAI calls queues against its own limit and is shed with 503 once
+    ``max_concurrency + max_queue`` requests are already admitted.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, retry_after_seconds: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self._lock = Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix=f"{self.name}-admission",
+                )
+            return self._executor
+
+    def _try_admit(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.max_concurrency + self.max_queue:
+                return False
+            self._in_flight += 1
+            ADMISSION_IN_FLIGHT.labels(pool=self.name).set(self._in_flight)
+            return True
+
+    def _release(self, _future: Future | None = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            ADMISSION_IN_FLIGHT.labels(pool=self.name).set(self._in_flight)
+
+    def _retry_after(self) -> int:
+        # Every full batch of queued work ahead of the caller costs roughly one more retry window.
+        batches = math.ceil(self._in_flight / max(1, self.max_concurrency))
+        return max(1, self.retry_after_seconds * batches)
+
+    def _admit_or_reject(self) -> None:
+        if not self._try_admit():
+            ADMISSION_REJECTED.labels(pool=self.name).inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Service is busy, please retry shortly",
+                headers={"Retry-After": str(self._retry_after())},
+            )
+
+    def _submit(self, run: Callable[[], Any]) -> Future:
+        try:
+            future = self._get_executor().submit(run)
+        except Exception:
+            self._release()
+            raise
+        # Released from the executor side so a disconnected client cannot free a slot that is still busy.
+        future.add_done_callback(self._release)
+        return future
+
+    def guard(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            self._admit_or_reject()
+            queued_at = perf_counter()
+
+            def run():
+                ADMISSION_QUEUE_WAIT.labels(pool=self.name).observe(perf_counter() - queued_at)
+                return func(*args, **kwargs)
+
+            waiter = asyncio.wrap_future(self._submit(run))
+            try:
+                return await asyncio.shield(waiter)
+            except asyncio.CancelledError:
+                # A disconnect unwinds the request scope, and get_db would close the Session the
+                # worker thread is still using. Hold the cancellation until the route returns.
+                with anyio.CancelScope(shield=True):
+                    await asyncio.wait({waiter})
+                raise
+
+        return wrapper
+
+    def stream(self, produce: Callable[[], Iterable[Any]]) -> AsyncIterator[Any]:
+        """Run ``produce()`` on this executor and hand its items to the event loop as they come.
+
+        Call it from the event loop before the response starts, so a full pool
+        still answers 503. A slow stream then holds one of these slots rather
+        than a thread from AnyIO's shared pool. The work runs to the end even if
+        the reader goes away, so whatever it persists at the end is persisted.
+        """
+        self._admit_or_reject()
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        queued_at = perf_counter()
+
+        def hand_over(item: tuple[Any, BaseException | None]) -> None:
+            try:
+                loop.call_soon_threadsafe(items.put_nowait, item)
+            except RuntimeError:
+                # The loop has shut down; finish the work anyway.
+                pass
+
+        def run():
+            ADMISSION_QUEUE_WAIT.labels(pool=self.name).observe(perf_counter() - queued_at)
+            try:
+                for item in produce():
+                    hand_over((item, None))
+            except Exception as exc:
+                hand_over((_END_OF_STREAM, exc))
+            else:
+                hand_over((_END_OF_STREAM, None))
+
+        self._submit(run)
+        return self._drain(items)
+
+    @staticmethod
+    async def _drain(items: asyncio.Queue) -> AsyncIterator[Any]:
+        while True:
+            item, error = await items.get()
+            if item is _END_OF_STREAM:
+                if error is not None:
+                    raise error
+                return
+            yield item
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+llm_admission = AdmissionController(
+    "llm",
+    max_concurrency=settings.llm_admission_max_concurrency,
+    max_queue=settings.llm_admission_max_queue,
+    retry_after_seconds=settings.llm_admission_retry_after_seconds,
+)
@@ -0,0 +1,27 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Streams that must reach the client frame by frame; gzip would buffer them.
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream",)
+
+
+class _StreamAwareGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            media_type = Headers(raw=message["headers"]).get("content-type", "").split(";")[0].strip()
+            if media_type in UNCOMPRESSED_MEDIA_TYPES:
+                # The parent forwards responses that are already encoded untouched.
+                self.content_encoding_set = True
+
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip for JSON responses that leaves server-sent event streams unbuffered."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _StreamAwareGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,40 @@
+import hashlib
+from datetime import datetime
+
+from fastapi import Request, Response
+
+# Revalidate on every poll; the 304 saves the recomputation and the body.
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(request: Request, user_id: int | None, version: int | str, variant: str = "") -> str:
+    """Strong ETag over (route, user, data version, query params, UTC day).
+
+    The day is included because several panels (challenges, phase windows,
+    habit streaks) roll over at midnight without any write. ``variant`` covers
+    representations negotiated outside the query string, such as Accept.
+    """
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    source = f"{request.url.path}|{user_id}|{version}|{params}|{variant}|{datetime.utcnow().date().isoformat()}"
+    return f'"{hashlib.sha256(source.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str, vary: str | None = None) -> Response:
+    """304 for a matching ETag; ``vary`` must repeat the 200's Vary so caches key both alike."""
+    headers = {"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL}
+    if vary:
+        headers["Vary"] = vary
+    return Response(status_code=304, headers=headers)
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CONDITIONAL_CACHE_CONTROL
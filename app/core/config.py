@@ -14,12 +14,47 @@ class Settings(BaseSettings):
     database_url: str = Field(
         default="postgresql+psycopg2://metabolic:metabolic@db:5432/metabolic"
     )
+    db_pool_recycle_seconds: int = 1800
+    db_pool_timeout_seconds: int = 10
+    db_api_pool_size: int = 10
+    db_api_max_overflow: int = 10
+    db_api_statement_timeout_ms: int = 15000
+    db_scheduler_pool_size: int = 2
+    db_scheduler_max_overflow: int = 2
+    db_scheduler_statement_timeout_ms: int = 60000
+    db_worker_pool_size: int = 2
+    db_worker_max_overflow: int = 0
+    db_worker_statement_timeout_ms: int = 300000
     openai_api_key: str | None = None
     openai_model: str = "gpt-4o-mini"
+    openai_api_base_url: str = "https://api.openai.com/v1"
+    llm_admission_max_concurrency: int = 8
+    llm_admission_max_queue: int = 16
+    llm_admission_retry_after_seconds: int = 5
     llm_cache_ttl_seconds: int = 900
+    llm_timeout_seconds: float = 20.0
+    llm_extraction_deadline_seconds: float = 0.0
+    llm_extraction_hedge_workers: int = 8
+    llm_vision_timeout_seconds: float = 30.0
+    llm_gateway_max_connections: int = 20
+    llm_gateway_max_retries: int = 2
+    llm_gateway_backoff_seconds: float = 0.25
+    llm_gateway_queue_wait_seconds: float = 5.0
+    llm_gateway_requests_per_second: float = 5.0
+    llm_gateway_burst: int = 10
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_seconds: float = 30.0
+    llm_meal_text_prompt_token_budget: int = 1000
+    llm_copilot_prompt_token_budget: int = 3000
+    llm_summary_prompt_token_budget: int = 1500
+    single_flight_redis_url: str = ""
+    single_flight_lock_ttl_seconds: float = 60.0
+    copilot_snapshot_redis_url: str = ""
+    copilot_snapshot_ttl_seconds: int = 300
     max_food_image_bytes: int = 5_000_000
     food_image_upload_dir: str = "app/data/uploads"
     food_image_public_base_url: str = "https://s3.local/myhealthtracker/food-images"
+    celery_metrics_port: int = 9808
     log_level: str = "INFO"
     log_dir: str = "logs"
     cors_allowed_origins: str = "http://localhost:3000"
@@ -29,19 +64,38 @@ class Settings(BaseSettings):
     llm_requests_per_day: int = 300
     llm_max_input_chars: int = 1200
     llm_max_tokens: int = 500
+    llm_input_cost_per_1k_tokens: float = 0.00015
+    llm_output_cost_per_1k_tokens: float = 0.0006
     jwt_secret: str = "CHANGE_ME"
     jwt_algorithm: str = "HS256"
     jwt_expiration_minutes: int = 15
     refresh_token_expiration_days: int = 90
     require_https: bool = False
     auth_bcrypt_rounds: int = 12
+    auth_kdf_workers: int = 2
+    auth_kdf_max_queue: int = 8
+    auth_kdf_retry_after_seconds: int = 2
+    login_attempt_flush_batch_size: int = 100
+    login_attempt_flush_interval_seconds: float = 2.0
     login_rate_limit_attempts: int = 10
     login_rate_limit_window_seconds: int = 60
+    auth_claims_cache_size: int = 4096
+    auth_deny_list_redis_url: str = ""
     admin_user_ids: str = "1"
     admin_email: str = "admin@example.com"
     admin_password: str = "ChangeMe123!"
     password_reset_token_ttl_minutes: int = 30
     health_sync_rate_limit_per_hour: int = 10
+    sync_batch_max_operations: int = 500
+    sync_changes_max_sequences: int = 1000
+    daily_summary_range_max_days: int = 92
+    gzip_minimum_size_bytes: int = 1024
+    live_events_redis_url: str = ""
+    live_events_max_connections: int = 5000
+    live_events_max_connections_per_user: int = 5
+    live_events_heartbeat_seconds: int = 15
+    live_events_queue_size: int = 100
+    live_events_ws_auth_timeout_seconds: int = 10
     health_sync_signature_ttl_seconds: int = 300
     health_sync_signing_secret: str = "CHANGE_ME_HEALTH_SYNC"
     vapid_public_key: str = ""
@@ -0,0 +1,108 @@
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.monitoring import ADMISSION_IN_FLIGHT, ADMISSION_REJECTED
+from app.core.security import hash_password, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class KDFPool:
+    """Bounded process pool for bcrypt hashing and verification.
+
+    Password work would otherwise burn CPU on the AnyIO threadpool that serves
+    every sync route. Here it runs in ``max_workers`` separate processes. Once
+    ``max_workers + max_queue`` calls are admitted, further logins are refused
+    with 429 instead of queueing behind a credential-stuffing burst.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, retry_after_seconds: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+        self._lock = Lock()
+
+    def hash_password(self, plain_password: str) -> str:
+        return self._run(hash_password, plain_password, settings.auth_bcrypt_rounds)
+
+    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(verify_password, plain_password, hashed_password)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the API process holds DB sockets and threads a fork would copy.
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def _try_admit(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                return False
+            self._in_flight += 1
+            ADMISSION_IN_FLIGHT.labels(pool=self.name).set(self._in_flight)
+            return True
+
+    def _release(self, _future: Future | None = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            ADMISSION_IN_FLIGHT.labels(pool=self.name).set(self._in_flight)
+
+    def _run(self, fn, *args):
+        if not self._try_admit():
+            ADMISSION_REJECTED.labels(pool=self.name).inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many sign-in attempts in progress. Please retry shortly.",
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release()
+            raise self._replace_broken(executor)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            raise self._replace_broken(executor)
+
+    def _replace_broken(self, executor: ProcessPoolExecutor) -> HTTPException:
+        # A worker died (OOM kill, segfault) and took the executor with it; the next call starts a fresh one.
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.error("%s process pool broke; replacing it", self.name)
+        return HTTPException(
+            status_code=503,
+            detail="Sign-in is temporarily unavailable. Please retry shortly.",
+            headers={"Retry-After": str(self.retry_after_seconds)},
+        )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+kdf_pool = KDFPool(
+    "kdf",
+    max_workers=settings.auth_kdf_workers,
+    max_queue=settings.auth_kdf_max_queue,
+    retry_after_seconds=settings.auth_kdf_retry_after_seconds,
+)
@@ -0,0 +1,383 @@
+import json
+import logging
+import random
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import BoundedSemaphore, Lock
+from time import monotonic, perf_counter
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+from app.core.monitoring import (
+    LLM_CALL_TOKENS,
+    LLM_CIRCUIT_OPEN,
+    LLM_ERRORS,
+    LLM_PROMPT_OVER_BUDGET,
+    LLM_REQUEST_LATENCY,
+    LLM_TOKENS,
+)
+from app.core.prompt_budget import estimate_chat_tokens
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMGatewayError(RuntimeError):
+    """The provider could not produce a usable response; callers use their deterministic fallback."""
+
+
+class LLMUnavailableError(LLMGatewayError):
+    """Rejected without calling the provider: circuit open, rate limited or saturated."""
+
+
+class LLMTimeoutError(LLMGatewayError, TimeoutError):
+    pass
+
+
+@dataclass(frozen=True)
+class LLMPurpose:
+    name: str
+    max_concurrency: int
+    timeout_seconds: float
+    prompt_token_budget: int | None = None
+
+
+class LLMSlot:
+    """A purpose concurrency slot taken before its call starts; ``release`` may be called more than once."""
+
+    def __init__(self, semaphore: BoundedSemaphore):
+        self._semaphore = semaphore
+        self._held = True
+        self._lock = Lock()
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._held:
+                return
+            self._held = False
+        self._semaphore.release()
+
+
+def default_purposes() -> dict[str, LLMPurpose]:
+    # Interactive paths get most of the slots; background summaries cannot starve them.
+    return {
+        "meal_text": LLMPurpose("meal_text", 8, settings.llm_timeout_seconds, settings.llm_meal_text_prompt_token_budget),
+        "copilot": LLMPurpose("copilot", 8, settings.llm_timeout_seconds, settings.llm_copilot_prompt_token_budget),
+        "vision": LLMPurpose("vision", 4, settings.llm_vision_timeout_seconds),
+        "lab_report": LLMPurpose("lab_report", 2, settings.llm_vision_timeout_seconds),
+        "summary": LLMPurpose("summary", 2, settings.llm_timeout_seconds, settings.llm_summary_prompt_token_budget),
+    }
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    def acquire(self, timeout: float) -> bool:
+        """Take one token, waiting up to ``timeout`` seconds for a refill."""
+        deadline = monotonic() + timeout
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate_per_second
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures, then lets one probe through per ``reset_seconds``."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._probing = True
+            return True
+
+    def abandon_probe(self) -> None:
+        """The admitted call never reached the provider; let the next one probe instead."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+        LLM_CIRCUIT_OPEN.set(0)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = monotonic()
+                self._probing = False
+        if self._opened_at is not None:
+            LLM_CIRCUIT_OPEN.set(1)
+
+
+class LLMGateway:
+    """The one path to the OpenAI-compatible API.
+
+    Every caller shares a keep-alive connection pool, a provider-wide token
+    bucket and circuit breaker, and a concurrency cap for its purpose.
+    Retryable failures are retried with jittered exponential backoff inside the
+    purpose's time budget. While the circuit is open, calls fail immediately
+    with ``LLMUnavailableError`` so callers drop straight to their fallbacks.
+    """
+
+    def __init__(
+        self,
+        purposes: dict[str, LLMPurpose],
+        *,
+        max_connections: int,
+        max_retries: int,
+        backoff_seconds: float,
+        queue_wait_seconds: float,
+        rate_limiter: TokenBucket,
+        circuit_breaker: CircuitBreaker,
+    ):
+        self.purposes = purposes
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.queue_wait_seconds = queue_wait_seconds
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self._semaphores = {name: BoundedSemaphore(purpose.max_concurrency) for name, purpose in purposes.items()}
+        self._client: httpx.Client | None = None
+        self._lock = Lock()
+
+    def _get_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                )
+            return self._client
+
+    def try_reserve(self, purpose: str) -> LLMSlot | None:
+        """Take a concurrency slot for ``purpose`` without waiting, or ``None`` when every slot is busy.
+
+        Pass the slot to the call it was taken for; the caller still releases it
+        in case that call never runs.
+        """
+        semaphore = self._semaphores[purpose]
+        if not semaphore.acquire(blocking=False):
+            LLM_ERRORS.labels(purpose=purpose, reason="llm_saturated").inc()
+            return None
+        return LLMSlot(semaphore)
+
+    def chat_completion(self, purpose: str, body: dict[str, Any], *, api_key: str | None) -> dict[str, Any]:
+        """POST ``body`` to ``/chat/completions`` and return the decoded response."""
+        with self._admitted(purpose) as config:
+            self._check_prompt_budget(config, body)
+            payload = self._call_with_retries(config, body, api_key)
+        self._record_usage(purpose, payload.get("usage"))
+        return payload
+
+    def stream_chat_completion(
+        self, purpose: str, body: dict[str, Any], *, api_key: str | None, slot: LLMSlot | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the decoded chunks of a streamed chat completion.
+
+        Streams are not retried. Once tokens have reached the caller, a replay
+        would repeat them, so a failure surfaces as ``LLMGatewayError`` for the
+        caller's fallback. The final chunk carries ``usage``. A ``slot`` from
+        ``try_reserve`` is used instead of waiting for one.
+        """
+        with self._admitted(purpose, slot) as config:
+            self._check_prompt_budget(config, body)
+            if not self.rate_limiter.acquire(timeout=self.queue_wait_seconds):
+                raise LLMUnavailableError("llm_rate_limited")
+            streamed_body = body | {"stream": True, "stream_options": {"include_usage": True}}
+            try:
+                with self._get_client().stream(
+                    "POST",
+                    f"{settings.openai_api_base_url}/chat/completions",
+                    content=json.dumps(streamed_body),
+                    headers={"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"},
+                    timeout=config.timeout_seconds,
+                ) as response:
+                    if response.status_code >= 400:
+                        response.read()
+                        if response.status_code in RETRYABLE_STATUS_CODES:
+                            self._record_failure(config, f"http_{response.status_code}")
+                        else:
+                            self.circuit_breaker.record_success()
+                            LLM_ERRORS.labels(purpose=purpose, reason=f"http_{response.status_code}").inc()
+                        raise LLMGatewayError(f"llm_http_{response.status_code}")
+                    self.circuit_breaker.record_success()
+                    for line in response.iter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line.removeprefix("data:").strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        self._record_usage(purpose, chunk.get("usage"))
+                        yield chunk
+            except httpx.TimeoutException as exc:
+                self._record_failure(config, "timeout")
+                raise LLMTimeoutError("llm_timeout") from exc
+            except httpx.TransportError as exc:
+                self._record_failure(config, "transport")
+                raise LLMGatewayError("llm_call_failed") from exc
+            except json.JSONDecodeError as exc:
+                LLM_ERRORS.labels(purpose=purpose, reason="invalid_json").inc()
+                raise LLMGatewayError("llm_invalid_json") from exc
+
+    @contextmanager
+    def _admitted(self, purpose: str, slot: LLMSlot | None = None) -> Iterator[LLMPurpose]:
+        """Circuit check, purpose concurrency slot and latency metric around one provider call."""
+        config = self.purposes[purpose]
+        started = perf_counter()
+        outcome = "error"
+        try:
+            if not self.circuit_breaker.allow():
+                raise LLMUnavailableError("llm_circuit_open")
+            if slot is None:
+                semaphore = self._semaphores[purpose]
+                if not semaphore.acquire(timeout=self.queue_wait_seconds):
+                    raise LLMUnavailableError("llm_saturated")
+                slot = LLMSlot(semaphore)
+            try:
+                yield config
+            finally:
+                slot.release()
+            outcome = "ok"
+        except LLMTimeoutError:
+            outcome = "timeout"
+            raise
+        except LLMUnavailableError as exc:
+            outcome = str(exc).removeprefix("llm_")
+            if outcome != "circuit_open":
+                self.circuit_breaker.abandon_probe()
+            LLM_ERRORS.labels(purpose=purpose, reason=str(exc)).inc()
+            raise
+        finally:
+            LLM_REQUEST_LATENCY.labels(purpose=purpose, outcome=outcome).observe(perf_counter() - started)
+
+    @staticmethod
+    def _check_prompt_budget(config: LLMPurpose, body: dict[str, Any]) -> None:
+        """Count calls whose callers did not compact their prompt under the purpose budget; they are still sent."""
+        if config.prompt_token_budget is None:
+            return
+        estimated = estimate_chat_tokens(body.get("messages", []))
+        if estimated > config.prompt_token_budget:
+            LLM_PROMPT_OVER_BUDGET.labels(purpose=config.name).inc()
+            logger.warning("%s prompt of ~%s tokens exceeds its %s token budget", config.name, estimated, config.prompt_token_budget)
+
+    @staticmethod
+    def _record_usage(purpose: str, usage: dict[str, Any] | None) -> None:
+        if not usage:
+            return
+        for kind in ("prompt", "completion"):
+            tokens = usage.get(f"{kind}_tokens", 0) or 0
+            LLM_TOKENS.labels(purpose=purpose, kind=kind).inc(tokens)
+            LLM_CALL_TOKENS.labels(purpose=purpose, kind=kind).observe(tokens)
+
+    def _call_with_retries(self, config: LLMPurpose, body: dict[str, Any], api_key: str | None) -> dict[str, Any]:
+        deadline = monotonic() + config.timeout_seconds
+        url = f"{settings.openai_api_base_url}/chat/completions"
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
+        for attempt in range(self.max_retries + 1):
+            if not self.rate_limiter.acquire(timeout=max(0.0, deadline - monotonic())):
+                raise LLMUnavailableError("llm_rate_limited")
+            retry_after: float | None = None
+            try:
+                response = self._get_client().post(
+                    url, content=json.dumps(body), headers=headers, timeout=max(0.01, deadline - monotonic())
+                )
+            except httpx.TimeoutException as exc:
+                self._record_failure(config, "timeout")
+                raise LLMTimeoutError("llm_timeout") from exc
+            except httpx.TransportError:
+                self._record_failure(config, "transport")
+            else:
+                if response.status_code < 400:
+                    self.circuit_breaker.record_success()
+                    try:
+                        return response.json()
+                    except json.JSONDecodeError as exc:
+                        LLM_ERRORS.labels(purpose=config.name, reason="invalid_json").inc()
+                        raise LLMGatewayError("llm_invalid_json") from exc
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    # The provider answered; the request itself is wrong, so retrying cannot help.
+                    self.circuit_breaker.record_success()
+                    LLM_ERRORS.labels(purpose=config.name, reason=f"http_{response.status_code}").inc()
+                    raise LLMGatewayError(f"llm_http_{response.status_code}")
+                self._record_failure(config, f"http_{response.status_code}")
+                retry_after = _parse_retry_after(response.headers.get("retry-after"))
+
+            if attempt == self.max_retries or self.circuit_breaker.is_open:
+                break
+            backoff = retry_after if retry_after is not None else random.uniform(0, self.backoff_seconds * 2**attempt)
+            if monotonic() + backoff >= deadline:
+                break
+            time.sleep(backoff)
+        raise LLMGatewayError("llm_call_failed")
+
+    def _record_failure(self, config: LLMPurpose, reason: str) -> None:
+        LLM_ERRORS.labels(purpose=config.name, reason=reason).inc()
+        self.circuit_breaker.record_failure()
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def message_content(payload: dict[str, Any]) -> str:
+    return payload.get("choices", [{}])[0].get("message", {}).get("content", "") or ""
+
+
+llm_gateway = LLMGateway(
+    default_purposes(),
+    max_connections=settings.llm_gateway_max_connections,
+    max_retries=settings.llm_gateway_max_retries,
+    backoff_seconds=settings.llm_gateway_backoff_seconds,
+    queue_wait_seconds=settings.llm_gateway_queue_wait_seconds,
+    rate_limiter=TokenBucket(settings.llm_gateway_requests_per_second, settings.llm_gateway_burst),
+    circuit_breaker=CircuitBreaker(settings.llm_circuit_failure_threshold, settings.llm_circuit_reset_seconds),
+)
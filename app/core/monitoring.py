@@ -1,5 +1,8 @@
 import logging
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+import os
+from pathlib import Path
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
@@ -14,6 +17,104 @@ REQUEST_LATENCY = Histogram(
     "HTTP request latency in seconds",
     ["method", "path"],
 )
+DB_POOL_CHECKED_OUT = Gauge(
+    "myhealthtracker_db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+    ["role"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "myhealthtracker_db_pool_overflow",
+    "Database connections open beyond the configured pool size",
+    ["role"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "myhealthtracker_db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["role"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "myhealthtracker_db_pool_timeouts_total",
+    "Connection checkouts that gave up after pool_timeout",
+    ["role"],
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "myhealthtracker_admission_in_flight",
+    "Requests admitted to an isolated executor, running or queued",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_REJECTED = Counter(
+    "myhealthtracker_admission_rejected_total",
+    "Requests shed with 503 (429 for password hashing) because the executor queue was full",
+    ["pool"],
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "myhealthtracker_admission_queue_wait_seconds",
+    "Time an admitted request waited for a free executor thread",
+    ["pool"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+LLM_REQUEST_LATENCY = Histogram(
+    "myhealthtracker_llm_request_duration_seconds",
+    "LLM gateway call latency including retries, by purpose and outcome",
+    ["purpose", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0),
+)
+LLM_TOKENS = Counter(
+    "myhealthtracker_llm_tokens_total",
+    "Tokens reported by the LLM provider",
+    ["purpose", "kind"],
+)
+LLM_CALL_TOKENS = Histogram(
+    "myhealthtracker_llm_call_tokens",
+    "Prompt and completion tokens per LLM call as reported by the provider",
+    ["purpose", "kind"],
+    buckets=(50, 100, 250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 16000),
+)
+LLM_PROMPT_OVER_BUDGET = Counter(
+    "myhealthtracker_llm_prompt_over_budget_total",
+    "LLM calls sent with an estimated prompt above the purpose's token budget",
+    ["purpose"],
+)
+LLM_ERRORS = Counter(
+    "myhealthtracker_llm_errors_total",
+    "Failed LLM attempts and rejected calls by reason",
+    ["purpose", "reason"],
+)
+LLM_CIRCUIT_OPEN = Gauge(
+    "myhealthtracker_llm_circuit_open",
+    "1 while the LLM circuit breaker is failing calls fast",
+    multiprocess_mode="max",
+)
+COPILOT_TIME_TO_FIRST_TOKEN = Histogram(
+    "myhealthtracker_copilot_time_to_first_token_seconds",
+    "Time from a streamed copilot request arriving to the first reply text sent",
+    buckets=(0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 20.0),
+)
+LLM_HEDGED_EXTRACTIONS = Counter(
+    "myhealthtracker_llm_hedged_extractions_total",
+    "Deadline-hedged meal extractions by which result was returned",
+    ["outcome"],
+)
+SINGLE_FLIGHT_COALESCED = Counter(
+    "myhealthtracker_single_flight_coalesced_total",
+    "Calls answered by an identical in-flight call instead of running again",
+    ["name", "scope"],
+)
+CELERY_TASK_DURATION = Histogram(
+    "myhealthtracker_celery_task_duration_seconds",
+    "Celery task run time by final state",
+    ["task", "state"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0),
+)
+CELERY_TASK_RETRIES = Counter(
+    "myhealthtracker_celery_task_retries_total",
+    "Celery task retries requested",
+    ["task"],
+)
 
 
 logger = logging.getLogger("app.request")
@@ -30,5 +131,54 @@ class MetricsMiddleware(BaseHTTPMiddleware):
         return response
 
 
+def multiprocess_dir() -> str | None:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+
+
+def build_registry() -> CollectorRegistry:
+    """Registry to expose: the whole deployment in multiprocess mode, this process otherwise."""
+    if not multiprocess_dir():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def clear_multiprocess_dir() -> None:
+    """Drop every sample file; only safe before any worker process has started."""
+    directory = multiprocess_dir()
+    if not directory:
+        return
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for sample_file in path.glob("*.db"):
+        sample_file.unlink(missing_ok=True)
+
+
+def mark_process_dead(pid: int | None = None) -> None:
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def reap_dead_process_files() -> None:
+    """Remove live-gauge files left by workers that exited without running their shutdown hook."""
+    directory = multiprocess_dir()
+    if not directory:
+        return
+    pids: set[int] = set()
+    for sample_file in Path(directory).glob("gauge_live*_*.db"):
+        try:
+            pids.add(int(sample_file.stem.rsplit("_", 1)[1]))
+        except ValueError:
+            continue
+    for pid in pids:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            multiprocess.mark_process_dead(pid)
+        except PermissionError:
+            continue
+
+
 def metrics_response() -> Response:
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(build_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,39 @@
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{sort_value.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        sort_value, row_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def page_before(statement: Select, sort_column, id_column, cursor: str | None, limit: int) -> Select:
+    """Newest-first keyset page on ``(sort_column, id)``, starting after ``cursor``.
+
+    One extra row is fetched so ``finish_page`` can tell whether another page exists.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        statement = statement.where(or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < row_id)))
+    return statement.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def finish_page(rows: list, limit: int, response: Response, sort_key: str = "created_at") -> list:
+    """Drop the look-ahead row and advertise the next page's cursor in ``X-Next-Cursor``."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(rows[-1], sort_key), rows[-1].id)
+    return rows
@@ -0,0 +1,79 @@
+import json
+import math
+import re
+from typing import Any
+
+# Pre-tokenization close to the one OpenAI's byte-pair encoders use. Each piece
+# is then charged by length: most words of up to six letters are one token,
+# digits come in groups of three, and punctuation merges in pairs.
+_PIECES = re.compile(r"'(?:s|t|re|ve|m|ll|d)| ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+")
+
+# Chat framing the provider adds around each message and before the reply.
+_MESSAGE_OVERHEAD_TOKENS = 4
+_REPLY_PRIMING_TOKENS = 3
+
+_LIST_CAPS = (None, 7, 3, 1)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the provider's token count for ``text`` without a tokenizer download."""
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        stripped = piece.strip()
+        if not stripped:
+            tokens += 1
+        elif stripped[0].isalpha():
+            tokens += math.ceil(len(stripped) / 6)
+        elif stripped[0].isdigit():
+            tokens += 1
+        else:
+            tokens += math.ceil(len(stripped) / 2)
+    return tokens
+
+
+def estimate_chat_tokens(messages: list[dict[str, Any]]) -> int:
+    """Estimated prompt tokens for a chat-completions ``messages`` list; image parts are not counted."""
+    total = _REPLY_PRIMING_TOKENS
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if part.get("type") == "text")
+        total += _MESSAGE_OVERHEAD_TOKENS + estimate_tokens(str(content))
+    return total
+
+
+def compact(value: Any, *, key_aliases: dict[str, str] | None = None, float_digits: int = 2, max_list_items: int | None = None) -> Any:
+    """Drop nulls and empty containers, round floats, rename keys and keep the last ``max_list_items`` of each list.
+
+    Series in this codebase are ordered oldest first, so capping keeps the most
+    recent entries.
+    """
+    aliases = key_aliases or {}
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            item = compact(item, key_aliases=aliases, float_digits=float_digits, max_list_items=max_list_items)
+            if item is None or item == {} or item == []:
+                continue
+            compacted[aliases.get(key, key)] = item
+        return compacted
+    if isinstance(value, (list, tuple)):
+        items = list(value)[-max_list_items:] if max_list_items else list(value)
+        return [compact(item, key_aliases=aliases, float_digits=float_digits, max_list_items=max_list_items) for item in items]
+    if isinstance(value, float):
+        rounded = round(value, float_digits)
+        return int(rounded) if rounded.is_integer() else rounded
+    return value
+
+
+def compact_json(value: Any, *, token_budget: int | None = None, key_aliases: dict[str, str] | None = None) -> str:
+    """Minified JSON of ``compact(value)``, capping lists harder until it fits ``token_budget``.
+
+    Returns the smallest form tried when even one item per list is over budget.
+    """
+    text = ""
+    for cap in _LIST_CAPS:
+        text = json.dumps(compact(value, key_aliases=key_aliases, max_list_items=cap), separators=(",", ":"), default=str)
+        if token_budget is None or estimate_tokens(text) <= token_budget:
+            break
+    return text
@@ -18,6 +18,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 
 from app.core.config import settings
+from app.core.token_claims import token_claims_cache, token_deny_list
 
 SCRIPT_PATTERN = re.compile(r"<\s*script", flags=re.IGNORECASE)
 JS_URI_PATTERN = re.compile(r"javascript:\s*", flags=re.IGNORECASE)
@@ -142,19 +143,21 @@ class AuthRequiredMiddleware(BaseHTTPMiddleware):
 
         token = authorization.replace("Bearer ", "", 1).strip()
         try:
-            claims = decode_token(token)
+            claims = decode_access_token(token)
         except HTTPException as exc:
             return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
-        if claims.get("type") != "access":
-            return JSONResponse(status_code=401, content={"detail": "Access token required"})
-
         request.state.token_claims = claims
         return await call_next(request)
 
 
 class InputSanitizationMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
+        # Event streams keep the original receive(): the replacement below answers
+        # every call with http.request, which breaks their disconnect listener.
+        if "text/event-stream" in request.headers.get("accept", ""):
+            return await call_next(request)
+
         async def receive() -> dict[str, Any]:
             return {"type": "http.request", "body": body, "more_body": False}
 
@@ -253,8 +256,8 @@ def _sanitize_payload(payload: Any) -> Any:
     return payload
 
 
-def hash_password(plain_password: str) -> str:
-    rounds = max(4, settings.auth_bcrypt_rounds)
+def hash_password(plain_password: str, rounds: int | None = None) -> str:
+    rounds = max(4, settings.auth_bcrypt_rounds if rounds is None else rounds)
     return bcrypt.hashpw(plain_password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
 
 
@@ -311,13 +314,40 @@ def decode_token(token: str) -> dict[str, Any]:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token") from exc
 
 
-def get_current_token_claims(authorization: str = Header(default="")) -> dict[str, Any]:
+def decode_access_token(token: str) -> dict[str, Any]:
+    """Verified access-token claims, from the claims cache when this token was seen before.
+
+    Raises 401 for invalid, expired, non-access or revoked tokens.
+    """
+    token_hash = hash_token(token)
+    claims = token_claims_cache.get(token_hash)
+    if claims is None:
+        claims = decode_token(token)
+        if claims.get("type") != "access":
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Access token required")
+        token_claims_cache.put(token_hash, claims)
+    if token_deny_list.is_denied(claims.get("jti")):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return claims
+
+
+def revoke_access_token(claims: dict[str, Any]) -> None:
+    """Deny the token behind ``claims`` in every worker until it expires."""
+    if claims.get("jti"):
+        token_deny_list.deny(claims["jti"], float(claims.get("exp", 0)))
+
+
+def get_current_token_claims(request: Request, authorization: str = Header(default="")) -> dict[str, Any]:
+    # AuthRequiredMiddleware has already verified the token when it is installed.
+    claims = getattr(request.state, "token_claims", None)
+    if claims is not None:
+        if token_deny_list.is_denied(claims.get("jti")):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+        return claims
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Bearer token required")
-    token = authorization.replace("Bearer ", "", 1).strip()
-    claims = decode_token(token)
-    if claims.get("type") != "access":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Access token required")
+    claims = decode_access_token(authorization.replace("Bearer ", "", 1).strip())
+    request.state.token_claims = claims
     return claims
 
 
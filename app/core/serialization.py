@@ -0,0 +1,18 @@
+from typing import Literal
+
+from fastapi import Request
+
+SeriesFormat = Literal["points", "columnar"]
+
+# Accept-header alternative to ?series_format=columnar for clients that negotiate by media type.
+COLUMNAR_MEDIA_TYPE = "application/vnd.metabolic.columnar+json"
+
+
+def negotiate_series_format(request: Request, series_format: SeriesFormat | None) -> SeriesFormat:
+    """An explicit query parameter wins; otherwise the Accept header decides."""
+    if series_format is not None:
+        return series_format
+    accept = request.headers.get("accept", "")
+    if any(part.split(";")[0].strip() == COLUMNAR_MEDIA_TYPE for part in accept.split(",")):
+        return "columnar"
+    return "points"
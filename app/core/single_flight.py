@@ -0,0 +1,111 @@
+import json
+import logging
+import time
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Callable
+
+from app.core.config import settings
+from app.core.monitoring import SINGLE_FLIGHT_COALESCED
+
+logger = logging.getLogger(__name__)
+
+# Headroom over the coalesced call's own timeout for the work around it (parsing, storage).
+LOCK_TTL_MARGIN_SECONDS = 5.0
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one execution.
+
+    In-process callers that arrive while a key is in flight wait on the
+    leader's future and get its result (or its exception). With
+    ``single_flight_redis_url`` set, leaders in other workers are found through
+    a ``SET NX`` lock, and followers poll for the result key the leader writes.
+    If that lock expires without a result, the follower runs the call itself.
+    Results must be JSON-serializable to be shared across workers.
+    """
+
+    def __init__(self, name: str, redis_url: str = "", lock_ttl_seconds: float = 60.0, result_ttl_seconds: float = 60.0):
+        self.name = name
+        self.redis_url = redis_url
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self.poll_interval_seconds = 0.1
+        self._calls: dict[str, Future] = {}
+        self._lock = Lock()
+        self._redis = None
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            SINGLE_FLIGHT_COALESCED.labels(name=self.name, scope="local").inc()
+            return future.result()
+
+        try:
+            result = self._run_shared(key, fn) if self.redis_url else fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def _run_shared(self, key: str, fn: Callable[[], Any]) -> Any:
+        lock_key, result_key = f"single_flight:{self.name}:{key}:lock", f"single_flight:{self.name}:{key}:result"
+        try:
+            client = self._redis_client()
+            deadline = time.monotonic() + self.lock_ttl_seconds
+            while True:
+                # The leader publishes its result before releasing the lock, so look for a result
+                # before every attempt at the lock and once more after taking it.
+                cached = client.get(result_key)
+                if cached is None and client.set(lock_key, "1", nx=True, px=int(self.lock_ttl_seconds * 1000)):
+                    cached = client.get(result_key)
+                    if cached is None:
+                        break
+                    client.delete(lock_key)
+                if cached is not None:
+                    SINGLE_FLIGHT_COALESCED.labels(name=self.name, scope="redis").inc()
+                    return json.loads(cached)
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(self.poll_interval_seconds)
+        except Exception:
+            logger.warning("single-flight redis unavailable for %s; running locally", self.name, exc_info=True)
+            return fn()
+
+        try:
+            result = fn()
+            try:
+                client.set(result_key, json.dumps(result, default=str), px=int(self.result_ttl_seconds * 1000))
+            except Exception:
+                logger.warning("single-flight result for %s not shared", self.name, exc_info=True)
+            return result
+        finally:
+            # Release at once on failure too, so followers retry instead of polling out the TTL.
+            try:
+                client.delete(lock_key)
+            except Exception:
+                logger.warning("single-flight lock for %s not released", self.name, exc_info=True)
+
+    def _redis_client(self):
+        if self._redis is None:
+            import redis
+
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+
+def single_flight(name: str, timeout_seconds: float | None = None) -> SingleFlight:
+    """Shared flight for ``name``; the Redis lock outlives ``timeout_seconds`` (the call's own bound) by a margin."""
+    lock_ttl_seconds = settings.single_flight_lock_ttl_seconds
+    if timeout_seconds is not None:
+        lock_ttl_seconds = timeout_seconds + LOCK_TTL_MARGIN_SECONDS
+    return SingleFlight(name, redis_url=settings.single_flight_redis_url, lock_ttl_seconds=lock_ttl_seconds)
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DENY_KEY_PREFIX = "auth_deny:"
+DENY_CHANNEL = "auth_deny"
+LISTENER_RETRY_INITIAL_SECONDS = 0.5
+LISTENER_RETRY_MAX_SECONDS = 30.0
+
+
+class TokenClaimsCache:
+    """Bounded LRU of verified access-token claims, keyed by token hash.
+
+    An entry lives until the token's own ``exp``, so a hit never outlives a
+    token that ``jwt.decode`` would reject. Revocation is checked separately
+    against the deny-list on every lookup.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token_hash: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[token_hash]
+                return None
+            self._entries.move_to_end(token_hash)
+            return entry[1]
+
+    def put(self, token_hash: str, claims: dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[token_hash] = (float(claims.get("exp", 0)), claims)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenDenyList:
+    """Revoked access-token ids (``jti``) until the token would have expired anyway.
+
+    Lookups are local. With ``auth_deny_list_redis_url`` set, a denial is
+    also stored as ``auth_deny:<jti>`` with the token's remaining lifetime and
+    published, so every worker's listener adds it to its own set; existing
+    keys are loaded whenever the listener (re)connects.
+    """
+
+    def __init__(self, redis_url: str = ""):
+        self.redis_url = redis_url
+        self._denied: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener: threading.Thread | None = None
+
+    def deny(self, jti: str, expires_at: float) -> None:
+        self._add(jti, expires_at)
+        if not self.redis_url:
+            return
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return
+        try:
+            client = self._redis_client()
+            client.set(f"{DENY_KEY_PREFIX}{jti}", "1", ex=ttl)
+            client.publish(DENY_CHANNEL, f"{jti}:{expires_at}")
+        except Exception:
+            logger.warning("token deny-list redis unavailable; revocation is local to this worker", exc_info=True)
+
+    def is_denied(self, jti: str | None) -> bool:
+        if self.redis_url:
+            self._ensure_listener()
+        if not jti:
+            return False
+        with self._lock:
+            expires_at = self._denied.get(jti)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._denied[jti]
+                return False
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._denied.clear()
+
+    def _add(self, jti: str, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._denied[jti] = expires_at
+            # Denials are rare, so pruning on write keeps the set to live tokens only.
+            for stale in [key for key, expiry in self._denied.items() if expiry <= now]:
+                del self._denied[stale]
+
+    def _redis_client(self):
+        if self._redis is None:
+            import redis
+
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(target=self._listen, name="auth-deny-list-redis", daemon=True)
+            self._listener.start()
+
+    def _listen(self) -> None:
+        # Started once and never exits: a dropped connection is retried with backoff, and the
+        # stored denials are reloaded on every connect to cover whatever was published meanwhile.
+        delay = LISTENER_RETRY_INITIAL_SECONDS
+        while True:
+            pubsub = None
+            try:
+                client = self._redis_client()
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(DENY_CHANNEL)
+                self._load_stored_denials(client)
+                delay = LISTENER_RETRY_INITIAL_SECONDS
+                for message in pubsub.listen():
+                    data = message["data"].decode() if isinstance(message["data"], bytes) else message["data"]
+                    jti, _, expires_at = data.rpartition(":")
+                    self._add(jti, float(expires_at))
+            except Exception:
+                logger.warning("token deny-list listener lost redis; reconnecting in %.1fs", delay, exc_info=True)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(delay)
+            delay = min(delay * 2, LISTENER_RETRY_MAX_SECONDS)
+
+    def _load_stored_denials(self, client) -> None:
+        for key in client.scan_iter(match=f"{DENY_KEY_PREFIX}*"):
+            ttl = client.ttl(key)
+            if ttl and ttl > 0:
+                name = key.decode() if isinstance(key, bytes) else key
+                self._add(name.removeprefix(DENY_KEY_PREFIX), time.time() + ttl)
+
+token_claims_cache = TokenClaimsCache(max_entries=settings.auth_claims_cache_size)
+token_deny_list = TokenDenyList(redis_url=settings.auth_deny_list_redis_url)
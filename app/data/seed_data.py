@@ -1,6 +1,9 @@
+from datetime import date, timedelta
+
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.db.upsert import insert_ignore
 from app.models import FoodItem, HabitChallengeType, HabitCheckin, HabitDefinition, MetabolicAgentState, MetabolicProfile, NotificationSettings, Recipe, User
 
 
@@ -160,90 +163,68 @@ DEFAULT_METABOLIC_PROFILE = {
 }
 
 
-def seed_initial_data(db: Session) -> None:
-    user = db.scalar(select(User).order_by(User.id.asc()).limit(1))
-
-    if user:
-        profile_exists = db.scalar(select(MetabolicProfile.id).where(MetabolicProfile.user_id == user.id))
-        if not profile_exists:
-            db.add(MetabolicProfile(user_id=user.id, **DEFAULT_METABOLIC_PROFILE))
-
-        notification_settings_exists = db.scalar(select(NotificationSettings.id).where(NotificationSettings.user_id == user.id))
-        if not notification_settings_exists:
-            db.add(NotificationSettings(user_id=user.id))
-
-        agent_state_exists = db.scalar(select(MetabolicAgentState.user_id).where(MetabolicAgentState.user_id == user.id))
-        if not agent_state_exists:
-            db.add(
-                MetabolicAgentState(
-                    user_id=user.id,
-                    carb_ceiling_current=user.carb_ceiling,
-                    protein_target_current=user.protein_target_min,
-                    fruit_allowance_current=1,
-                    fruit_allowance_weekly=7,
-                    notes="Initialized from seed defaults.",
-                )
+def _seed_habit_history(user_id: int, habits: list[HabitDefinition]) -> list[dict]:
+    start = date.today() - timedelta(days=29)
+    rows: list[dict] = []
+    for offset in range(30):
+        current_day = start + timedelta(days=offset)
+        is_sunday = current_day.weekday() == 6
+        for habit in habits:
+            failure_reason = None
+            success = True
+            if habit.code == "no_carb_dinner" and is_sunday:
+                success = False
+                failure_reason = "Social dinner carb spike"
+            elif habit.code == "sleep_over_7h" and current_day.weekday() in {0, 1}:
+                success = False
+                failure_reason = "Late-night work carried into sleep"
+            elif habit.code == "post_meal_walk" and current_day.weekday() == 5:
+                success = False
+                failure_reason = "Weekend schedule drift"
+
+            rows.append(
+                {
+                    "user_id": user_id,
+                    "habit_id": habit.id,
+                    "habit_date": current_day,
+                    "success": success,
+                    "failure_reason": failure_reason,
+                    "challenge_type_used": habit.challenge_type,
+                }
             )
+    return rows
 
-    existing_food_names = set(db.scalars(select(FoodItem.name)).all())
-    for food in FOOD_ITEMS:
-        if food["name"] not in existing_food_names:
-            db.add(FoodItem(**food))
-
-    existing_recipe_names = set(db.scalars(select(Recipe.name)).all())
-    for recipe in RECIPES:
-        if recipe["name"] not in existing_recipe_names:
-            db.add(Recipe(**recipe))
 
-    existing_habit_codes = set(db.scalars(select(HabitDefinition.code)).all())
-    for habit in HABIT_DEFINITIONS:
-        if habit["code"] not in existing_habit_codes:
-            db.add(HabitDefinition(**habit))
+def seed_initial_data(db: Session) -> None:
+    """Idempotent, set-based seed; safe to run from several workers starting at once."""
+    user = db.scalar(select(User).order_by(User.id.asc()).limit(1))
 
-    db.flush()
+    if user:
+        insert_ignore(db, MetabolicProfile, [{"user_id": user.id, **DEFAULT_METABOLIC_PROFILE}], ["user_id"])
+        insert_ignore(db, NotificationSettings, [{"user_id": user.id}], ["user_id"])
+        insert_ignore(
+            db,
+            MetabolicAgentState,
+            [
+                {
+                    "user_id": user.id,
+                    "carb_ceiling_current": user.carb_ceiling,
+                    "protein_target_current": user.protein_target_min,
+                    "fruit_allowance_current": 1,
+                    "fruit_allowance_weekly": 7,
+                    "notes": "Initialized from seed defaults.",
+                }
+            ],
+            ["user_id"],
+        )
+
+    insert_ignore(db, FoodItem, FOOD_ITEMS, ["name"])
+    insert_ignore(db, Recipe, RECIPES, ["name"])
+    insert_ignore(db, HabitDefinition, HABIT_DEFINITIONS, ["code"])
 
     # Seed a lightweight history so behavior analytics can render immediately.
-    habits = db.scalars(select(HabitDefinition).where(HabitDefinition.active.is_(True))).all()
-    if habits:
-        from datetime import date, timedelta
-
-        start = date.today() - timedelta(days=29)
-        for offset in range(30):
-            current_day = start + timedelta(days=offset)
-            is_sunday = current_day.weekday() == 6
-            for habit in habits:
-                exists = db.scalar(
-                    select(HabitCheckin.id).where(
-                        HabitCheckin.user_id == user.id,
-                        HabitCheckin.habit_id == habit.id,
-                        HabitCheckin.habit_date == current_day,
-                    )
-                )
-                if exists:
-                    continue
-
-                failure_reason = None
-                success = True
-                if habit.code == "no_carb_dinner" and is_sunday:
-                    success = False
-                    failure_reason = "Social dinner carb spike"
-                elif habit.code == "sleep_over_7h" and current_day.weekday() in {0, 1}:
-                    success = False
-                    failure_reason = "Late-night work carried into sleep"
-                elif habit.code == "post_meal_walk" and current_day.weekday() == 5:
-                    success = False
-                    failure_reason = "Weekend schedule drift"
-
-                db.add(
-                    HabitCheckin(
-                        user_id=user.id,
-                        habit_id=habit.id,
-                        habit_date=current_day,
-                        success=success,
-                        failure_reason=failure_reason,
-                        challenge_type_used=habit.challenge_type,
-                    )
-                )
-
+    if user:
+        habits = db.scalars(select(HabitDefinition).where(HabitDefinition.active.is_(True))).all()
+        insert_ignore(db, HabitCheckin, _seed_habit_history(user.id, habits), ["user_id", "habit_id", "habit_date"])
 
     db.commit()
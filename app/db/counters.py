@@ -0,0 +1,32 @@
+from typing import Any
+
+from sqlalchemy import inspect, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+def increment(db: Session, instance: Any, deltas: dict[str, Any], values: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Add ``deltas`` to ``instance``'s columns with one ``UPDATE ... RETURNING``.
+
+    The arithmetic happens in the database, so concurrent callers cannot lose
+    each other's increments. ``values`` sets extra columns in the same statement
+    and may reference the pre-update column values. The returned values are
+    also written back onto ``instance`` without marking it dirty.
+    """
+    model = type(instance)
+    mapper = inspect(model)
+    columns = [*deltas, *(values or {})]
+    assignments = {column: getattr(model, column) + amount for column, amount in deltas.items()}
+    assignments.update(values or {})
+    statement = (
+        update(model)
+        .where(*[column == getattr(instance, column.key) for column in mapper.primary_key])
+        .values(assignments)
+        .returning(*[getattr(model, column) for column in columns])
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(statement).one()
+    result = dict(zip(columns, row))
+    for column, value in result.items():
+        set_committed_value(instance, column, value)
+    return result
@@ -0,0 +1,44 @@
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def warn_if_revision_drift(engine) -> None:
+    """Compare the database revision with the code's Alembic head and log any drift.
+
+    Alembic is imported here rather than at module level: the API only needs it
+    for this one check, and the entrypoint runs it once per release.
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    try:
+        with engine.connect() as connection:
+            context = MigrationContext.configure(connection)
+            db_revision = context.get_current_revision()
+
+        alembic_cfg = Config("alembic.ini")
+        alembic_cfg.set_main_option("sqlalchemy.url", settings.database_url)
+        script = ScriptDirectory.from_config(alembic_cfg)
+        heads = script.get_heads()
+        code_head = heads[0] if heads else None
+
+        if db_revision != code_head:
+            logger.warning(
+                "Alembic revision drift detected: db_revision=%s code_head=%s",
+                db_revision,
+                code_head,
+            )
+    except Exception as exc:  # pragma: no cover - defensive startup logging
+        logger.warning("Unable to verify Alembic revision state: %s", exc)
+
+
+if __name__ == "__main__":
+    from app.core.logging_config import configure_logging
+    from app.db.session import create_db_engine
+
+    configure_logging()
+    warn_if_revision_drift(create_db_engine("migration"))
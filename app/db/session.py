@@ -1,11 +1,139 @@
-from sqlalchemy import create_engine
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 
 from app.core.config import settings
+from app.core.monitoring import DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW, DB_POOL_TIMEOUTS, DB_POOL_WAIT
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    pool_size: int
+    max_overflow: int
+    statement_timeout_ms: int
+    pooled: bool = True
+
+
+ENGINE_PROFILES = {
+    "api": EngineProfile(
+        pool_size=settings.db_api_pool_size,
+        max_overflow=settings.db_api_max_overflow,
+        statement_timeout_ms=settings.db_api_statement_timeout_ms,
+    ),
+    "scheduler": EngineProfile(
+        pool_size=settings.db_scheduler_pool_size,
+        max_overflow=settings.db_scheduler_max_overflow,
+        statement_timeout_ms=settings.db_scheduler_statement_timeout_ms,
+    ),
+    "worker": EngineProfile(
+        pool_size=settings.db_worker_pool_size,
+        max_overflow=settings.db_worker_max_overflow,
+        statement_timeout_ms=settings.db_worker_statement_timeout_ms,
+    ),
+    # Alembic runs once per deploy; holding idle connections afterwards is pure waste.
+    "migration": EngineProfile(pool_size=0, max_overflow=0, statement_timeout_ms=0, pooled=False),
+}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long callers wait for a connection."""
+
+    role = "api"
+
+    def connect(self):
+        started = perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(role=self.role).inc()
+            raise
+        finally:
+            DB_POOL_WAIT.labels(role=self.role).observe(perf_counter() - started)
+
+
+def _track_pool_usage(engine: Engine, role: str) -> None:
+    pool = engine.pool
+
+    def _refresh_overflow(*_args) -> None:
+        DB_POOL_OVERFLOW.labels(role=role).set(max(0, pool.overflow()))
+
+    def _checked_out(*_args) -> None:
+        DB_POOL_CHECKED_OUT.labels(role=role).inc()
+        _refresh_overflow()
+
+    def _checked_in(*_args) -> None:
+        # "checkin" fires before the connection is back in the queue, so pool.checkedout() would still count it.
+        DB_POOL_CHECKED_OUT.labels(role=role).dec()
+
+    event.listen(pool, "connect", _refresh_overflow)
+    event.listen(pool, "checkout", _checked_out)
+    event.listen(pool, "checkin", _checked_in)
+
+
+def create_db_engine(role: str, database_url: str | None = None) -> Engine:
+    profile = ENGINE_PROFILES[role]
+    url = make_url(database_url or settings.database_url)
+    kwargs: dict = {"future": True, "pool_pre_ping": True}
+
+    if url.get_backend_name() == "postgresql" and profile.statement_timeout_ms > 0:
+        kwargs["connect_args"] = {
+            "options": f"-c statement_timeout={profile.statement_timeout_ms}",
+            "application_name": f"myhealthtracker-{role}",
+        }
+
+    if not profile.pooled:
+        kwargs["poolclass"] = NullPool
+    elif url.get_backend_name() != "sqlite":
+        pool_class = type(f"{role.title()}QueuePool", (InstrumentedQueuePool,), {"role": role})
+        kwargs.update(
+            poolclass=pool_class,
+            pool_size=profile.pool_size,
+            max_overflow=profile.max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            pool_recycle=settings.db_pool_recycle_seconds,
+        )
+
+    engine = create_engine(url, **kwargs)
+    if profile.pooled:
+        _track_pool_usage(engine, role)
+    return engine
+
+
+_engines: dict[str, Engine] = {}
+_sessionmakers: dict[str, sessionmaker] = {}
+_engines_lock = Lock()
+
+
+def get_engine(role: str = "api") -> Engine:
+    with _engines_lock:
+        if role not in _engines:
+            _engines[role] = create_db_engine(role)
+        return _engines[role]
+
+
+def get_sessionmaker(role: str = "api") -> sessionmaker:
+    engine_for_role = get_engine(role)
+    with _engines_lock:
+        if role not in _sessionmakers:
+            _sessionmakers[role] = sessionmaker(autocommit=False, autoflush=False, bind=engine_for_role)
+        return _sessionmakers[role]
+
+
+def dispose_engines(close: bool = True) -> None:
+    """Drop pooled connections, e.g. in a forked child that must not reuse the parent's sockets."""
+    with _engines_lock:
+        for engine_for_role in _engines.values():
+            engine_for_role.dispose(close=close)
 
 
-engine = create_engine(settings.database_url, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = get_engine("api")
+SessionLocal = get_sessionmaker("api")
 
 
 def get_db():
@@ -0,0 +1,55 @@
+from typing import Any, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+def dialect_insert(db: Session, model: type):
+    """Dialect-specific INSERT so callers can use ON CONFLICT on both Postgres and SQLite."""
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(model)
+    if dialect_name == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"ON CONFLICT inserts are not supported for dialect {dialect_name!r}")
+
+
+def insert_ignore(db: Session, model: type, rows: list[dict[str, Any]], conflict_columns: list[str]) -> None:
+    """Insert rows in one statement, skipping any that already exist on ``conflict_columns``."""
+    if not rows:
+        return
+    statement = dialect_insert(db, model).on_conflict_do_nothing(index_elements=conflict_columns)
+    # render_nulls keeps rows that differ only by NULL columns in the same multi-row batch.
+    db.execute(statement, rows, execution_options={"render_nulls": True})
+
+
+def get_or_create(db: Session, model: type[T], lookup: dict[str, Any], defaults: dict[str, Any] | None = None) -> T:
+    """Race-free get-or-create for rows with a unique constraint on ``lookup``'s columns.
+
+    A plain SELECT-then-INSERT lets two concurrent requests both miss and then
+    one of them fails on the constraint. Here the INSERT skips on conflict and
+    returns nothing, and the follow-up SELECT picks up the row the other
+    transaction wrote.
+    """
+    existing = db.scalar(select(model).filter_by(**lookup))
+    if existing is not None:
+        return existing
+
+    # Imported here because the change feed builds its own upserts from this module.
+    from app.models.change_feed import insert_stamp
+
+    values = {**lookup, **(defaults or {})}
+    values.update(insert_stamp(db, model, values))
+    statement = (
+        dialect_insert(db, model)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=list(lookup))
+        .returning(model)
+    )
+    created = db.scalars(statement).first()
+    if created is not None:
+        return created
+    return db.scalars(select(model).filter_by(**lookup).execution_options(populate_existing=True)).one()
@@ -1,14 +1,16 @@
 import logging
-from alembic.config import Config
-from alembic.runtime.migration import MigrationContext
-from alembic.script import ScriptDirectory
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import text
 
+from app.core.admission import llm_admission
+from app.core.compression import StreamAwareGZipMiddleware
 from app.core.config import settings
+from app.core.kdf_pool import kdf_pool
+from app.core.llm_gateway import llm_gateway
 from app.core.logging_config import configure_logging
-from app.core.monitoring import MetricsMiddleware, metrics_response
+from app.core.monitoring import MetricsMiddleware, mark_process_dead, metrics_response, reap_dead_process_files
 from app.core.security import (
     CSRFMiddleware,
     HTTPSRedirectEnforcementMiddleware,
@@ -18,16 +20,19 @@ from app.core.security import (
     SecurityHeadersMiddleware,
 )
 from app.data.seed_data import seed_initial_data
+from app.db.revision_check import warn_if_revision_drift
 from app.db.session import SessionLocal, engine
 from app.routers import router
 from app.services.coaching_scheduler import coaching_scheduler
+from app.services.llm_service import llm_service
+from app.services.login_attempts import login_attempt_buffer
 from app.services.metabolic_advisor_scheduler import metabolic_advisor_scheduler
 from app.services.startup_service import create_admin_user_if_empty
 
 configure_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, default_response_class=ORJSONResponse)
 allow_origins = [origin.strip() for origin in settings.cors_allowed_origins.split(",") if origin.strip()]
 app.add_middleware(
     CORSMiddleware,
@@ -35,7 +40,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=settings.gzip_minimum_size_bytes)
 if settings.environment == "production":
     app.add_middleware(HTTPSRedirectEnforcementMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
@@ -52,31 +59,12 @@ app.add_middleware(MetricsMiddleware)
 app.include_router(router)
 
 
-def _warn_if_revision_drift() -> None:
-    try:
-        with engine.connect() as connection:
-            context = MigrationContext.configure(connection)
-            db_revision = context.get_current_revision()
-
-        alembic_cfg = Config("alembic.ini")
-        alembic_cfg.set_main_option("sqlalchemy.url", settings.database_url)
-        script = ScriptDirectory.from_config(alembic_cfg)
-        heads = script.get_heads()
-        code_head = heads[0] if heads else None
-
-        if db_revision != code_head and settings.environment != "production":
-            logger.warning(
-                "Alembic revision drift detected: db_revision=%s code_head=%s",
-                db_revision,
-                code_head,
-            )
-    except Exception as exc:  # pragma: no cover - defensive startup logging
-        logger.warning("Unable to verify Alembic revision state: %s", exc)
-
-
 @app.on_event("startup")
 def startup_event():
-    _warn_if_revision_drift()
+    reap_dead_process_files()
+    if settings.environment != "production":
+        # Production runs this once per release from entrypoint.sh instead of in every worker.
+        warn_if_revision_drift(engine)
     db = SessionLocal()
     try:
         create_admin_user_if_empty(db)
@@ -92,6 +80,12 @@ def startup_event():
 def shutdown_event():
     coaching_scheduler.shutdown()
     metabolic_advisor_scheduler.shutdown()
+    llm_admission.shutdown()
+    kdf_pool.shutdown()
+    login_attempt_buffer.shutdown()
+    llm_service.shutdown()
+    llm_gateway.close()
+    mark_process_dead()
     logger.info("Application shutdown complete")
 
 
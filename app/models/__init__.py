@@ -34,9 +34,13 @@ from app.models.models import (
     Recipe,
     Report,
     ReportParameter,
+    SyncOperation,
+    SyncTombstone,
     User,
+    UserChangeCounter,
     VitalsEntry,
 )
+from app.models.change_feed import CHANGE_FEED_MODELS, VERSIONED_MODELS, data_version, next_change_seq
 
 __all__ = [
     "User",
@@ -76,4 +80,11 @@ __all__ = [
     "AIConversation",
     "AIMessage",
     "AIActionLog",
+    "SyncOperation",
+    "SyncTombstone",
+    "UserChangeCounter",
+    "CHANGE_FEED_MODELS",
+    "VERSIONED_MODELS",
+    "data_version",
+    "next_change_seq",
 ]
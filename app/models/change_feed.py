@@ -0,0 +1,134 @@
+from collections import defaultdict
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import dialect_insert
+from app.models.models import (
+    ChallengeAssignment,
+    ChallengeStreak,
+    DailyLog,
+    ExerciseEntry,
+    HabitCheckin,
+    InsulinScore,
+    MealEntry,
+    MetabolicAgentState,
+    MetabolicProfile,
+    MetabolicRecommendationLog,
+    NotificationSettings,
+    PendingRecommendation,
+    SyncTombstone,
+    UserChangeCounter,
+    VitalsEntry,
+)
+
+# Entity names exposed by /sync/changes, mapped to the models whose writes are stamped.
+CHANGE_FEED_MODELS: dict[str, type] = {
+    "daily_logs": DailyLog,
+    "meal_entries": MealEntry,
+    "vitals": VitalsEntry,
+    "exercise": ExerciseEntry,
+    "habit_checkins": HabitCheckin,
+    "recommendations": MetabolicRecommendationLog,
+    "pending_recommendations": PendingRecommendation,
+}
+_ENTITY_BY_MODEL = {model: entity for entity, model in CHANGE_FEED_MODELS.items()}
+
+# Per-user rows outside the feed whose writes still change what dashboard panels
+# show; they advance the user's sequence (the data version behind ETags) unstamped.
+VERSIONED_MODELS: tuple[type, ...] = (
+    ChallengeAssignment,
+    ChallengeStreak,
+    InsulinScore,
+    MetabolicAgentState,
+    MetabolicProfile,
+    NotificationSettings,
+)
+
+
+def next_change_seq(db: Session, user_id: int) -> int:
+    """Advance and return the user's change sequence.
+
+    The upsert holds the counter row's lock until the transaction ends, so
+    writers for one user commit in sequence order and a client cursor never
+    skips a row that commits late.
+    """
+    statement = (
+        dialect_insert(db, UserChangeCounter)
+        .values(user_id=user_id, last_seq=1)
+        .on_conflict_do_update(index_elements=["user_id"], set_={"last_seq": UserChangeCounter.last_seq + 1})
+        .returning(UserChangeCounter.last_seq)
+    )
+    return db.execute(statement).scalar_one()
+
+
+def insert_stamp(db: Session, model: type, values: dict) -> dict:
+    """Extra columns for a Core INSERT of ``model``, which ``before_flush`` never sees.
+
+    Feed rows get a fresh ``change_seq``; ``VERSIONED_MODELS`` only advance the sequence.
+    """
+    user_id = values.get("user_id")
+    if user_id is None:
+        return {}
+    if model in _ENTITY_BY_MODEL:
+        return {"change_seq": next_change_seq(db, user_id)}
+    if model in VERSIONED_MODELS:
+        next_change_seq(db, user_id)
+    return {}
+
+
+def data_version(db: Session, user_id: int) -> int:
+    """The user's current change sequence, 0 before their first tracked write."""
+    return db.scalar(select(UserChangeCounter.last_seq).where(UserChangeCounter.user_id == user_id)) or 0
+
+
+def _owner_id(session: Session, instance) -> int | None:
+    if isinstance(instance, (MealEntry, InsulinScore)):
+        if instance.daily_log_id is None:
+            return None
+        daily_log = session.get(DailyLog, instance.daily_log_id)
+        return daily_log.user_id if daily_log else None
+    return instance.user_id
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_change_seq(session: Session, _flush_context, _instances) -> None:
+    """Stamp tracked rows written through the ORM; deletions leave a tombstone.
+
+    Writes to ``VERSIONED_MODELS`` only advance the sequence.
+    """
+    changed: dict[int, list] = defaultdict(list)
+    deleted: dict[int, list] = defaultdict(list)
+    versioned: set[int] = set()
+    with session.no_autoflush:
+        for instance in session.new:
+            if type(instance) in _ENTITY_BY_MODEL and (user_id := _owner_id(session, instance)) is not None:
+                changed[user_id].append(instance)
+            elif isinstance(instance, VERSIONED_MODELS) and (user_id := _owner_id(session, instance)) is not None:
+                versioned.add(user_id)
+        for instance in session.dirty:
+            if not session.is_modified(instance, include_collections=False):
+                continue
+            if type(instance) in _ENTITY_BY_MODEL and (user_id := _owner_id(session, instance)) is not None:
+                changed[user_id].append(instance)
+            elif isinstance(instance, VERSIONED_MODELS) and (user_id := _owner_id(session, instance)) is not None:
+                versioned.add(user_id)
+        for instance in session.deleted:
+            if type(instance) in _ENTITY_BY_MODEL and (user_id := _owner_id(session, instance)) is not None:
+                deleted[user_id].append(instance)
+            elif isinstance(instance, VERSIONED_MODELS) and (user_id := _owner_id(session, instance)) is not None:
+                versioned.add(user_id)
+
+        for user_id in changed.keys() | deleted.keys() | versioned:
+            seq = next_change_seq(session, user_id)
+            for instance in changed[user_id]:
+                instance.change_seq = seq
+            for instance in deleted[user_id]:
+                session.add(
+                    SyncTombstone(
+                        user_id=user_id,
+                        entity=_ENTITY_BY_MODEL[type(instance)],
+                        entity_id=inspect(instance).identity[0],
+                        change_seq=seq,
+                    )
+                )
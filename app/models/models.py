@@ -1,7 +1,7 @@
 from datetime import date, datetime, timedelta
 from enum import Enum
 
-from sqlalchemy import JSON, Boolean, Date, DateTime, Enum as SqlEnum, Float, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import JSON, BigInteger, Boolean, Date, DateTime, Enum as SqlEnum, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -184,11 +184,15 @@ class LLMUsageDaily(Base):
 
 class AIConversation(Base):
     __tablename__ = "ai_conversations"
+    __table_args__ = (Index("ix_ai_conversations_user_updated", "user_id", "updated_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     title: Mapped[str | None] = mapped_column(String(255), nullable=True)
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    summarized_through_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    total_tokens: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_cost: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -199,6 +203,7 @@ class AIConversation(Base):
 
 class AIMessage(Base):
     __tablename__ = "ai_messages"
+    __table_args__ = (Index("ix_ai_messages_conversation_created", "conversation_id", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     conversation_id: Mapped[int] = mapped_column(ForeignKey("ai_conversations.id"), nullable=False, index=True)
@@ -320,7 +325,10 @@ class Recipe(Base):
 
 class DailyLog(Base):
     __tablename__ = "daily_logs"
-    __table_args__ = (UniqueConstraint("user_id", "log_date", name="uq_user_log_date"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "log_date", name="uq_user_log_date"),
+        Index("ix_daily_logs_user_change_seq", "user_id", "change_seq"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -333,6 +341,8 @@ class DailyLog(Base):
     total_hdl_support: Mapped[float] = mapped_column(Float, default=0.0)
     total_triglyceride_risk: Mapped[float] = mapped_column(Float, default=0.0)
     total_hidden_oil: Mapped[float] = mapped_column(Float, default=0.0)
+    fruit_servings: Mapped[float] = mapped_column(Float, default=0.0)
+    nut_servings: Mapped[float] = mapped_column(Float, default=0.0)
     water_ml: Mapped[int] = mapped_column(Integer, default=0)
     hydration_score: Mapped[float] = mapped_column(Float, default=0.0)
     dinner_meal: Mapped[dict | None] = mapped_column(JSON, nullable=True)
@@ -340,6 +350,7 @@ class DailyLog(Base):
     dinner_logged_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     dinner_insulin_impact: Mapped[float] = mapped_column(Float, default=0.0)
     evening_insulin_spike_risk: Mapped[bool] = mapped_column(Boolean, default=False)
+    change_seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     user: Mapped["User"] = relationship(back_populates="daily_logs")
     meal_entries: Mapped[list["MealEntry"]] = relationship(back_populates="daily_log")
@@ -348,6 +359,7 @@ class DailyLog(Base):
 
 class MealEntry(Base):
     __tablename__ = "meal_entries"
+    __table_args__ = (Index("ix_meal_entries_daily_log_change_seq", "daily_log_id", "change_seq"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     daily_log_id: Mapped[int] = mapped_column(ForeignKey("daily_logs.id"), nullable=False)
@@ -358,6 +370,7 @@ class MealEntry(Base):
     vision_confidence: Mapped[float | None] = mapped_column(Float, nullable=True)
     manual_adjustment_flag: Mapped[bool] = mapped_column(Boolean, default=False)
     portion_scale_factor: Mapped[float | None] = mapped_column(Float, nullable=True)
+    change_seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     daily_log: Mapped["DailyLog"] = relationship(back_populates="meal_entries")
     food_item: Mapped["FoodItem"] = relationship(back_populates="meal_entries")
@@ -385,6 +398,7 @@ class HealthSyncSummary(Base):
 
 class VitalsEntry(Base):
     __tablename__ = "vitals_entries"
+    __table_args__ = (Index("ix_vitals_entries_user_change_seq", "user_id", "change_seq"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -406,12 +420,14 @@ class VitalsEntry(Base):
     hr_zone_5_minutes: Mapped[int] = mapped_column(Integer, default=0)
     steps_total: Mapped[int] = mapped_column(Integer, default=0)
     body_fat_percentage: Mapped[float | None] = mapped_column(Float, nullable=True)
+    change_seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     user: Mapped["User"] = relationship(back_populates="vitals_entries")
 
 
 class ExerciseEntry(Base):
     __tablename__ = "exercise_entries"
+    __table_args__ = (Index("ix_exercise_entries_user_change_seq", "user_id", "change_seq"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -439,6 +455,7 @@ class ExerciseEntry(Base):
     calories_estimate: Mapped[float | None] = mapped_column(Float, nullable=True)
     post_meal_walk: Mapped[bool] = mapped_column(Boolean, default=False)
     performed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    change_seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     user: Mapped["User"] = relationship(back_populates="exercise_entries")
 
@@ -457,6 +474,7 @@ class InsulinScore(Base):
 
 class MetabolicRecommendationLog(Base):
     __tablename__ = "metabolic_recommendation_logs"
+    __table_args__ = (Index("ix_metabolic_recommendation_logs_user_change_seq", "user_id", "change_seq"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -473,6 +491,7 @@ class MetabolicRecommendationLog(Base):
     recommendations: Mapped[str] = mapped_column(Text, nullable=False)
     advisor_report: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    change_seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     user: Mapped["User"] = relationship(back_populates="metabolic_recommendation_logs")
 
@@ -505,6 +524,7 @@ class MetabolicAgentState(Base):
 
 class PendingRecommendation(Base):
     __tablename__ = "pending_recommendations"
+    __table_args__ = (Index("ix_pending_recommendations_user_change_seq", "user_id", "change_seq"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -523,12 +543,14 @@ class PendingRecommendation(Base):
     llm_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     reviewed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    change_seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     user: Mapped["User"] = relationship(back_populates="pending_recommendations")
 
 
 class ChallengeAssignment(Base):
     __tablename__ = "challenge_assignments"
+    __table_args__ = (UniqueConstraint("user_id", "frequency", "period_start", name="uq_user_challenge_period"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -589,7 +611,10 @@ class HabitDefinition(Base):
 
 class HabitCheckin(Base):
     __tablename__ = "habit_checkins"
-    __table_args__ = (UniqueConstraint("user_id", "habit_id", "habit_date", name="uq_user_habit_date"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "habit_id", "habit_date", name="uq_user_habit_date"),
+        Index("ix_habit_checkins_user_change_seq", "user_id", "change_seq"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -603,6 +628,7 @@ class HabitCheckin(Base):
     )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     user: Mapped["User"] = relationship(back_populates="habit_checkins")
     habit: Mapped["HabitDefinition"] = relationship(back_populates="checkins")
@@ -633,3 +659,36 @@ class ReportParameter(Base):
     reference_range: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     report: Mapped["Report"] = relationship(back_populates="parameters")
+
+
+class SyncOperation(Base):
+    __tablename__ = "sync_operations"
+    __table_args__ = (UniqueConstraint("user_id", "client_op_id", name="uq_sync_operation_user_client_op"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    client_op_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    op_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+    entity_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    detail: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class UserChangeCounter(Base):
+    __tablename__ = "user_change_counters"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    last_seq: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+class SyncTombstone(Base):
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (Index("ix_sync_tombstones_user_change_seq", "user_id", "change_seq"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    entity: Mapped[str] = mapped_column(String(40), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
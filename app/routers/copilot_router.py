@@ -1,12 +1,21 @@
+import json
+import logging
 from datetime import date, datetime
+from time import perf_counter
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Engine, func, select, update
 from sqlalchemy.orm import Session
 
+from app.core.admission import llm_admission
 from app.core.config import settings
+from app.core.llm_gateway import LLMSlot, llm_gateway
+from app.core.monitoring import COPILOT_TIME_TO_FIRST_TOKEN
+from app.core.pagination import finish_page, page_before
 from app.core.security import get_current_token_claims, llm_usage_limiter
 from app.db.session import get_db
+from app.db.upsert import get_or_create
 from app.models import AIConversation, AIMessage, LLMUsageDaily, User
 from app.schemas.schemas import (
     CopilotConversationDetailResponse,
@@ -15,19 +24,28 @@ from app.schemas.schemas import (
     CopilotConversationMessageResponse,
 )
 from app.services.audit_service import audit_service
-from app.services.metabolic_copilot_service import metabolic_copilot_service
+from app.services.metabolic_copilot_service import CopilotTurn, metabolic_copilot_service
+
+logger = logging.getLogger(__name__)
+
+# List items carry a preview; the full rolling summary is on the conversation detail.
+LIST_SUMMARY_PREVIEW_CHARS = 280
 
 copilot_router = APIRouter(prefix="/copilot", tags=["copilot"], dependencies=[Depends(get_current_token_claims)])
 
 
 def _increment_llm_daily_usage(db: Session, user_id: int, route: str, ip_address: str) -> bool:
-    usage = db.scalar(select(LLMUsageDaily).where(LLMUsageDaily.user_id == user_id, LLMUsageDaily.usage_date == date.today()))
-    if not usage:
-        usage = LLMUsageDaily(user_id=user_id, usage_date=date.today(), request_count=0)
-        db.add(usage)
-        db.flush()
+    usage = get_or_create(db, LLMUsageDaily, {"user_id": user_id, "usage_date": date.today()}, {"request_count": 0})
+    # Check and increment in one statement so concurrent calls cannot both take the last slot.
+    incremented = db.execute(
+        update(LLMUsageDaily)
+        .where(LLMUsageDaily.id == usage.id, LLMUsageDaily.request_count < settings.llm_requests_per_day)
+        .values(request_count=LLMUsageDaily.request_count + 1, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
 
-    if usage.request_count >= settings.llm_requests_per_day:
+    if not incremented:
+        daily_count = db.scalar(select(LLMUsageDaily.request_count).where(LLMUsageDaily.id == usage.id))
         audit_service.log_event(
             db,
             event_type="excess_llm_calls",
@@ -35,36 +53,42 @@ def _increment_llm_daily_usage(db: Session, user_id: int, route: str, ip_address
             user_id=user_id,
             ip_address=ip_address,
             route=route,
-            details={"daily_count": usage.request_count, "daily_limit": settings.llm_requests_per_day},
+            details={"daily_count": daily_count, "daily_limit": settings.llm_requests_per_day},
         )
         return False
-
-    usage.request_count += 1
-    usage.updated_at = datetime.utcnow()
     return True
 
 
-@copilot_router.post("/message", response_model=CopilotConversationMessageResponse)
-async def copilot_message(
-    payload: CopilotConversationMessageRequest,
-    request: Request,
-    claims: dict = Depends(get_current_token_claims),
-    db: Session = Depends(get_db),
-):
-    user_id = int(claims["sub"])
+def _admit_llm_turn(db: Session, request: Request, user_id: int) -> None:
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     client_ip = request.client.host if request.client else "unknown"
-    if not llm_usage_limiter.is_allowed(f"copilot:{user_id}"):
+    if not llm_usage_limiter.check_and_increment(user_id, settings.llm_requests_per_hour):
         raise HTTPException(status_code=429, detail="Hourly LLM usage limit reached")
-    if not _increment_llm_daily_usage(db, user_id, "/copilot/message", client_ip):
+    if not _increment_llm_daily_usage(db, user_id, request.url.path, client_ip):
         db.commit()
         raise HTTPException(status_code=429, detail="Daily LLM usage limit reached")
 
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@copilot_router.post("/message", response_model=CopilotConversationMessageResponse)
+@llm_admission.guard
+def copilot_message(
+    payload: CopilotConversationMessageRequest,
+    request: Request,
+    claims: dict = Depends(get_current_token_claims),
+    db: Session = Depends(get_db),
+):
+    user_id = int(claims["sub"])
+    _admit_llm_turn(db, request, user_id)
+
     try:
-        result = await metabolic_copilot_service.process_message(
+        result = metabolic_copilot_service.process_message(
             db=db,
             user_id=user_id,
             user_message=payload.message,
@@ -78,15 +102,109 @@ async def copilot_message(
     return CopilotConversationMessageResponse(**result)
 
 
+@copilot_router.post("/message/stream")
+async def copilot_message_stream(
+    payload: CopilotConversationMessageRequest,
+    request: Request,
+    claims: dict = Depends(get_current_token_claims),
+    db: Session = Depends(get_db),
+):
+    """``/copilot/message`` as server-sent events.
+
+    ``delta`` events carry reply text as the model writes it. A final ``done``
+    event carries the same body ``/copilot/message`` returns, after any logged
+    meal is committed, so its ``assistant_message`` is authoritative.
+
+    A copilot slot is reserved before anything is stored, so a saturated
+    provider answers 503 at once. The reply streams from the LLM admission
+    executor and never occupies the shared threadpool.
+    """
+    received_at = perf_counter()
+    slot = llm_gateway.try_reserve("copilot")
+    if slot is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Copilot is busy, please retry shortly",
+            headers={"Retry-After": str(settings.llm_admission_retry_after_seconds)},
+        )
+    try:
+        turn = await _start_stream_turn(db, request, int(claims["sub"]), payload)
+        events = llm_admission.stream(lambda: _copilot_turn_events(db.get_bind(), turn, received_at, slot))
+    except BaseException:
+        slot.release()
+        raise
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@llm_admission.guard
+def _start_stream_turn(db: Session, request: Request, user_id: int, payload: CopilotConversationMessageRequest) -> CopilotTurn:
+    _admit_llm_turn(db, request, user_id)
+    try:
+        turn = metabolic_copilot_service.start_turn(db, user_id, payload.message, payload.conversation_id)
+    except ValueError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    db.commit()
+    return turn
+
+
+def _copilot_turn_events(bind: Engine, turn: CopilotTurn, received_at: float, slot: LLMSlot):
+    # Runs on the admission executor after the request's session is closed, so the reply gets its own.
+    first_text_sent = False
+    db = Session(bind=bind, autoflush=False)
+    try:
+        parsed = None
+        if turn.safe_reply is None:
+            for kind, value in metabolic_copilot_service.stream_turn(turn, slot):
+                if kind == "parsed":
+                    parsed = value
+                    continue
+                if not first_text_sent:
+                    COPILOT_TIME_TO_FIRST_TOKEN.observe(perf_counter() - received_at)
+                    first_text_sent = True
+                yield _sse("delta", {"text": value})
+            result = metabolic_copilot_service.complete_turn(db, turn, parsed)
+            db.commit()
+        else:
+            result = {"conversation_id": turn.conversation_id, "assistant_message": turn.safe_reply, "actions_executed": []}
+        if not first_text_sent:
+            COPILOT_TIME_TO_FIRST_TOKEN.observe(perf_counter() - received_at)
+        yield _sse("done", CopilotConversationMessageResponse(**result).model_dump(mode="json"))
+    except Exception:
+        db.rollback()
+        logger.exception("copilot stream failed for conversation %s", turn.conversation_id)
+        yield _sse("error", {"detail": "Copilot could not finish this reply. Please retry."})
+    finally:
+        slot.release()
+        db.close()
+
+
 @copilot_router.get("/conversations", response_model=list[CopilotConversationListItem])
 def list_conversations(
+    response: Response,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
     claims: dict = Depends(get_current_token_claims),
     db: Session = Depends(get_db),
 ):
+    """Most recently active conversations first; pass ``X-Next-Cursor`` back as ``cursor`` for older ones.
+
+    A conversation that gets a new message while a client is paging moves to
+    the top, so it shows up on the client's next first-page load.
+    """
     user_id = int(claims["sub"])
-    rows = db.scalars(
-        select(AIConversation).where(AIConversation.user_id == user_id).order_by(AIConversation.updated_at.desc(), AIConversation.id.desc())
-    ).all()
+    statement = select(
+        AIConversation.id,
+        AIConversation.title,
+        func.substr(AIConversation.summary, 1, LIST_SUMMARY_PREVIEW_CHARS).label("summary"),
+        AIConversation.created_at,
+        AIConversation.updated_at,
+    ).where(AIConversation.user_id == user_id)
+    rows = db.execute(page_before(statement, AIConversation.updated_at, AIConversation.id, cursor, limit)).all()
     return [
         CopilotConversationListItem(
             id=row.id,
@@ -95,31 +213,45 @@ def list_conversations(
             created_at=row.created_at,
             updated_at=row.updated_at,
         )
-        for row in rows
+        for row in finish_page(rows, limit, response, sort_key="updated_at")
     ]
 
 
 @copilot_router.get("/conversations/{conversation_id}", response_model=CopilotConversationDetailResponse)
 def get_conversation(
     conversation_id: int,
+    response: Response,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
     claims: dict = Depends(get_current_token_claims),
     db: Session = Depends(get_db),
 ):
+    """The conversation with its latest ``limit`` messages, oldest first.
+
+    ``X-Next-Cursor`` pages further back through the history.
+    """
     user_id = int(claims["sub"])
-    conversation = db.scalar(
-        select(AIConversation).where(AIConversation.id == conversation_id, AIConversation.user_id == user_id)
-    )
+    conversation = db.execute(
+        select(
+            AIConversation.id,
+            AIConversation.title,
+            AIConversation.summary,
+            AIConversation.created_at,
+            AIConversation.updated_at,
+        ).where(AIConversation.id == conversation_id, AIConversation.user_id == user_id)
+    ).first()
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    messages = db.scalars(
-        select(AIMessage).where(AIMessage.conversation_id == conversation.id).order_by(AIMessage.created_at.asc(), AIMessage.id.asc())
-    ).all()
+    statement = select(AIMessage.id, AIMessage.role, AIMessage.content, AIMessage.created_at).where(
+        AIMessage.conversation_id == conversation.id
+    )
+    messages = finish_page(db.execute(page_before(statement, AIMessage.created_at, AIMessage.id, cursor, limit)).all(), limit, response)
     return CopilotConversationDetailResponse(
         id=conversation.id,
         title=conversation.title,
         summary=conversation.summary,
         created_at=conversation.created_at,
         updated_at=conversation.updated_at,
-        messages=[{"role": item.role.value, "content": item.content, "created_at": item.created_at} for item in messages],
+        messages=[{"role": item.role.value, "content": item.content, "created_at": item.created_at} for item in reversed(messages)],
     )
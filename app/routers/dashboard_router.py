@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+
+from app.core.conditional import compute_etag, etag_matches, not_modified, set_etag
+from app.core.security import get_current_token_claims
+from app.db.session import get_db
+from app.models import User, data_version
+from app.schemas.schemas import DashboardBootstrapResponse
+from app.services.dashboard_service import DASHBOARD_PANELS, dashboard_service
+from app.services.recipe_service import RECIPE_CATALOG_VERSION
+
+dashboard_router = APIRouter(prefix="/dashboard", tags=["dashboard"], dependencies=[Depends(get_current_token_claims)])
+
+
+def _requested_panels(fields: str | None) -> tuple[str, ...]:
+    if not fields:
+        return DASHBOARD_PANELS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = sorted(requested - set(DASHBOARD_PANELS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown dashboard fields: {', '.join(unknown)}")
+    return tuple(panel for panel in DASHBOARD_PANELS if panel in requested)
+
+
+def _bootstrap_etag(request: Request, db: Session, user_id: int) -> str:
+    # The recipes panels also depend on the shared catalog.
+    return compute_etag(request, user_id, f"{data_version(db, user_id)}:{RECIPE_CATALOG_VERSION}")
+
+
+@dashboard_router.get(
+    "/bootstrap",
+    response_model=DashboardBootstrapResponse,
+    response_model_exclude_unset=True,
+)
+def dashboard_bootstrap(
+    request: Request,
+    response: Response,
+    user_id: int = Query(default=1),
+    fields: str | None = Query(default=None, description="Comma-separated panels to include; all panels when omitted"),
+    db: Session = Depends(get_db),
+):
+    panels = _requested_panels(fields)
+    etag = _bootstrap_etag(request, db, user_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    user = db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    payload = dashboard_service.build(db, user, panels)
+    db.commit()
+    set_etag(response, _bootstrap_etag(request, db, user_id))
+    return DashboardBootstrapResponse(user_id=user_id, **payload)
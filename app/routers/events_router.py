@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.security import decode_access_token, get_current_token_claims
+from app.services.live_events import LiveEventLimitError, Subscription, live_event_bus
+
+events_router = APIRouter(prefix="/events", tags=["events"])
+
+# Clients reconnect after this many milliseconds if the stream drops.
+SSE_RETRY_MS = 5000
+
+
+def _subscribe(user_id: int) -> Subscription:
+    try:
+        return live_event_bus.subscribe(user_id)
+    except LiveEventLimitError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(SSE_RETRY_MS // 1000)},
+        ) from exc
+
+
+async def _sse_frames(subscription: Subscription):
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            live_event = await subscription.next(settings.live_events_heartbeat_seconds)
+            if live_event is None:
+                # Comment frame: keeps proxies from closing an idle connection.
+                yield ": ping\n\n"
+            else:
+                yield f"event: {live_event.type}\ndata: {live_event.to_json()}\n\n"
+    finally:
+        subscription.close()
+
+
+@events_router.get("/stream")
+async def stream_events(claims: dict[str, Any] = Depends(get_current_token_claims)):
+    """Server-sent change events for the caller: daily totals, insulin score, movement alerts, recommendations.
+
+    Each event is a hint to refetch the matching panel; the stream holds no
+    database session, so idle connections cost only a small queue.
+    """
+    subscription = _subscribe(int(claims["sub"]))
+    return StreamingResponse(
+        _sse_frames(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _authenticate_websocket(websocket: WebSocket) -> int | None:
+    # Browsers cannot set headers on a WebSocket, so the token arrives as the first message.
+    try:
+        message = await asyncio.wait_for(websocket.receive_json(), settings.live_events_ws_auth_timeout_seconds)
+        claims = decode_access_token(str(message.get("access_token", "")))
+    except (asyncio.TimeoutError, HTTPException, ValueError, AttributeError):
+        return None
+    return int(claims["sub"])
+
+
+@events_router.websocket("/ws")
+async def websocket_events(websocket: WebSocket):
+    await websocket.accept()
+    user_id = await _authenticate_websocket(websocket)
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        subscription = live_event_bus.subscribe(user_id)
+    except LiveEventLimitError:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    # Anything the client sends (or its disconnect) ends the receive task.
+    receiver = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            next_event = asyncio.create_task(subscription.next(settings.live_events_heartbeat_seconds))
+            done, _ = await asyncio.wait({receiver, next_event}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                next_event.cancel()
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.create_task(websocket.receive())
+                continue
+            live_event = next_event.result()
+            if live_event is None:
+                await websocket.send_json({"type": "ping"})
+            else:
+                await websocket.send_text(live_event.to_json())
+    except WebSocketDisconnect:
+        return
+    finally:
+        receiver.cancel()
+        subscription.close()
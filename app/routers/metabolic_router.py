@@ -2,9 +2,15 @@ from fastapi import APIRouter
 
 from app.api.routes import router as core_router
 from app.routers.copilot_router import copilot_router
+from app.routers.dashboard_router import dashboard_router
+from app.routers.events_router import events_router
+from app.routers.sync_router import sync_router
 
 router = APIRouter()
 router.include_router(core_router)
 router.include_router(copilot_router)
+router.include_router(dashboard_router)
+router.include_router(events_router)
+router.include_router(sync_router)
 
 __all__ = ["router"]
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import get_current_token_claims
+from app.db.session import get_db
+from app.models import User
+from app.schemas.schemas import SyncBatchRequest, SyncBatchResponse, SyncChangesResponse
+from app.services.sync_service import sync_service
+
+sync_router = APIRouter(prefix="/sync", tags=["sync"], dependencies=[Depends(get_current_token_claims)])
+
+
+@sync_router.post("/batch", response_model=SyncBatchResponse)
+def sync_batch(payload: SyncBatchRequest, db: Session = Depends(get_db)):
+    if len(payload.operations) > settings.sync_batch_max_operations:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.sync_batch_max_operations} operations; split it into smaller batches",
+        )
+    user = db.get(User, payload.user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    results, days = sync_service.apply_batch(db, user, payload.operations)
+    db.commit()
+    return SyncBatchResponse(
+        applied=sum(result.status == "applied" for result in results),
+        duplicates=sum(result.status == "duplicate" for result in results),
+        rejected=sum(result.status == "rejected" for result in results),
+        results=results,
+        days=days,
+    )
+
+
+@sync_router.get("/changes", response_model=SyncChangesResponse)
+def sync_changes(
+    since: int = Query(default=0, ge=0),
+    user_id: int = Query(default=1),
+    db: Session = Depends(get_db),
+):
+    return sync_service.changes_since(db, user_id, since)
@@ -1,4 +1,6 @@
 from datetime import date, datetime
+from typing import Annotated, Any, Literal
+from uuid import UUID
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
@@ -130,6 +132,7 @@ class LLMAnalyzeResponse(BaseModel):
     portion: str
     estimated_macros: dict[str, float]
     source: str
+    provisional: bool = False
 
 
 
@@ -304,6 +307,31 @@ class DailySummaryResponse(BaseModel):
     evening_insulin_spike_risk: bool = False
 
 
+class DailySummaryRangeResponse(BaseModel):
+    """Column-oriented per-day summaries; index ``i`` of every list describes ``dates[i]``."""
+
+    user_id: int
+    start: date
+    end: date
+    dates: list[date]
+    total_protein: list[float]
+    total_carbs: list[float]
+    total_fats: list[float]
+    total_sugar: list[float]
+    total_fiber: list[float]
+    total_hidden_oil: list[float]
+    fruit_servings: list[float]
+    nut_servings: list[float]
+    water_ml: list[int]
+    hydration_score: list[float]
+    hydration_target_achieved: list[bool]
+    insulin_load_score: list[float | None]
+    insulin_status: list[str | None]
+    meal_count: list[int]
+    protein_compliance: list[bool]
+    carb_compliance: list[bool]
+    oil_compliance: list[bool]
+
 
 class WeeklySummaryResponse(BaseModel):
     days_logged: int
@@ -429,6 +457,38 @@ class AdvancedAnalyticsResponse(BaseModel):
     metabolic_momentum: MetabolicMomentumResponse
 
 
+class ColumnarTrendSeriesResponse(BaseModel):
+    key: str
+    label: str
+    trend: str
+    improving: bool
+    dates: list[date]
+    values: list[float]
+
+
+class AdvancedAnalyticsColumnarResponse(BaseModel):
+    start_date: date
+    end_date: date
+    insulin_load_trend: ColumnarTrendSeriesResponse
+    fruit_frequency_trend: ColumnarTrendSeriesResponse
+    nut_frequency_trend: ColumnarTrendSeriesResponse
+    sugar_load_trend: ColumnarTrendSeriesResponse
+    hdl_support_trend: ColumnarTrendSeriesResponse
+    walk_vs_insulin_correlation: ColumnarTrendSeriesResponse
+    waist_trend: ColumnarTrendSeriesResponse
+    weight_trend: ColumnarTrendSeriesResponse
+    protein_intake_consistency: ColumnarTrendSeriesResponse
+    carb_intake_pattern: ColumnarTrendSeriesResponse
+    oil_usage_pattern: ColumnarTrendSeriesResponse
+    strength_score_trend: ColumnarTrendSeriesResponse
+    grip_strength_trend: ColumnarTrendSeriesResponse
+    sleep_trend: ColumnarTrendSeriesResponse
+    resting_heart_rate_trend: ColumnarTrendSeriesResponse
+    habit_compliance_trend: ColumnarTrendSeriesResponse
+    clean_streak_trend: ColumnarTrendSeriesResponse
+    metabolic_momentum: MetabolicMomentumResponse
+
+
 class PhaseRuleResponse(BaseModel):
     carb_ceiling: str
     rice_rule: str
@@ -670,6 +730,19 @@ class HabitIntelligenceResponse(BaseModel):
     overall_success_rate: float
 
 
+class HabitHeatmapColumnsResponse(BaseModel):
+    dates: list[date]
+    intensity: list[float]
+    count: list[int]
+
+
+class HabitIntelligenceColumnarResponse(BaseModel):
+    habits: list[HabitStatsResponse]
+    heatmap: HabitHeatmapColumnsResponse
+    insights: list[str]
+    overall_success_rate: float
+
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str = Field(min_length=8)
@@ -719,3 +792,90 @@ class ReportConfirmRequest(BaseModel):
     file_token: str
     report_date: date | None = None
     parameters: list[ReportParameterPayload]
+
+
+class SyncMealOperation(BaseModel):
+    op_id: UUID
+    type: Literal["meal"]
+    data: LogFoodRequest
+
+
+class SyncVitalsOperation(BaseModel):
+    op_id: UUID
+    type: Literal["vitals"]
+    data: LogVitalsRequest
+
+
+class SyncExerciseOperation(BaseModel):
+    op_id: UUID
+    type: Literal["exercise"]
+    data: LogExerciseRequest
+
+
+class SyncHydrationOperation(BaseModel):
+    op_id: UUID
+    type: Literal["hydration"]
+    data: HydrationLogRequest
+
+
+SyncOperationPayload = Annotated[
+    SyncMealOperation | SyncVitalsOperation | SyncExerciseOperation | SyncHydrationOperation,
+    Field(discriminator="type"),
+]
+
+
+class SyncBatchRequest(BaseModel):
+    user_id: int = 1
+    operations: list[SyncOperationPayload] = Field(min_length=1)
+
+
+class SyncOperationResult(BaseModel):
+    op_id: UUID
+    type: str
+    status: Literal["applied", "duplicate", "rejected"]
+    entity_id: int | None = None
+    detail: str | None = None
+
+
+class SyncDayResult(BaseModel):
+    date: date
+    insulin_load_score: float
+    alerts: int
+
+
+class SyncBatchResponse(BaseModel):
+    applied: int
+    duplicates: int
+    rejected: int
+    results: list[SyncOperationResult]
+    days: list[SyncDayResult]
+
+
+class SyncTombstoneItem(BaseModel):
+    entity: str
+    entity_id: int
+    change_seq: int
+
+
+class SyncChangesResponse(BaseModel):
+    cursor: int
+    has_more: bool
+    changes: dict[str, list[dict[str, Any]]]
+    tombstones: list[SyncTombstoneItem]
+
+
+class DashboardBootstrapResponse(BaseModel):
+    user_id: int
+    daily_summary: DailySummaryResponse | None = None
+    movement_panel: MovementPanelResponse | None = None
+    challenge: ChallengeResponse | None = None
+    monthly_challenge: ChallengeResponse | None = None
+    profile: ProfileResponse | None = None
+    vitals_summary: VitalsSummaryResponse | None = None
+    exercise_summary: ExerciseSummaryResponse | None = None
+    analytics: AdvancedAnalyticsResponse | None = None
+    performance_view: MetabolicPhasePerformanceResponse | None = None
+    habit_intelligence: HabitIntelligenceResponse | None = None
+    recipes: list[RecipeResponse] | None = None
+    recipe_suggestions: RecipeSuggestionResponse | None = None
+    notification_settings: NotificationSettingsResponse | None = None
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
 
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
-from app.models import DailyLog, ExerciseEntry, FoodItem, InsulinScore, MealEntry, User, VitalsEntry
+from app.models import DailyLog, ExerciseEntry, InsulinScore, MealEntry, User, VitalsEntry
 from app.services.strength_engine import compute_strength_score
 
 
@@ -38,7 +38,20 @@ class AnalyticsEngine:
             "points": points,
         }
 
-    def build_advanced_analytics(self, db: Session, user_id: int, days: int = 30):
+    def build_advanced_analytics(
+        self,
+        db: Session,
+        user_id: int,
+        days: int = 30,
+        vitals: list[VitalsEntry] | None = None,
+        exercise_entries: list[ExerciseEntry] | None = None,
+    ):
+        """Build trend series for the window ending today.
+
+        Callers that already hold the user's vitals or exercise history (the
+        dashboard bootstrap) pass it in and it is filtered to the window here
+        instead of being queried again.
+        """
         end_date = date.today()
         start_date = end_date - timedelta(days=max(6, days - 1))
 
@@ -51,16 +64,29 @@ class AnalyticsEngine:
             .where(DailyLog.user_id == user_id, DailyLog.log_date >= start_date, DailyLog.log_date <= end_date)
             .order_by(DailyLog.log_date.asc())
         ).all()
-        vitals = db.scalars(
-            select(VitalsEntry)
-            .where(VitalsEntry.user_id == user_id, VitalsEntry.recorded_at >= start_date, VitalsEntry.recorded_at <= end_date + timedelta(days=1))
-            .order_by(VitalsEntry.recorded_at.asc())
-        ).all()
-        exercise_entries = db.scalars(
-            select(ExerciseEntry)
-            .where(ExerciseEntry.user_id == user_id, ExerciseEntry.performed_at >= start_date, ExerciseEntry.performed_at <= end_date + timedelta(days=1))
-            .order_by(ExerciseEntry.performed_at.asc())
-        ).all()
+        window_start = datetime.combine(start_date, time.min)
+        window_end = datetime.combine(end_date + timedelta(days=1), time.min)
+        if vitals is None:
+            vitals = db.scalars(
+                select(VitalsEntry)
+                .where(VitalsEntry.user_id == user_id, VitalsEntry.recorded_at >= start_date, VitalsEntry.recorded_at <= end_date + timedelta(days=1))
+                .order_by(VitalsEntry.recorded_at.asc())
+            ).all()
+        else:
+            vitals = sorted(
+                (row for row in vitals if window_start <= row.recorded_at <= window_end), key=lambda row: row.recorded_at
+            )
+        if exercise_entries is None:
+            exercise_entries = db.scalars(
+                select(ExerciseEntry)
+                .where(ExerciseEntry.user_id == user_id, ExerciseEntry.performed_at >= start_date, ExerciseEntry.performed_at <= end_date + timedelta(days=1))
+                .order_by(ExerciseEntry.performed_at.asc())
+            ).all()
+        else:
+            exercise_entries = sorted(
+                (row for row in exercise_entries if window_start <= row.performed_at <= window_end),
+                key=lambda row: row.performed_at,
+            )
 
         score_rows = db.execute(
             select(DailyLog.log_date, InsulinScore.score)
@@ -81,6 +107,17 @@ class AnalyticsEngine:
         for row in exercise_entries:
             exercise_by_day.setdefault(row.performed_at.date(), []).append(row)
 
+        # One query for every meal in the window rather than one per logged day.
+        meals_by_log: dict[int, list[MealEntry]] = {}
+        if daily_logs:
+            window_meals = db.scalars(
+                select(MealEntry)
+                .options(joinedload(MealEntry.food_item))
+                .where(MealEntry.daily_log_id.in_([log.id for log in daily_logs]))
+            ).all()
+            for entry in window_meals:
+                meals_by_log.setdefault(entry.daily_log_id, []).append(entry)
+
         clean_streak = 0
         clean_streak_points: list[tuple[date, float]] = []
         compliance_points: list[tuple[date, float]] = []
@@ -123,7 +160,7 @@ class AnalyticsEngine:
             else:
                 clean_streak = 0
 
-            strength_score = compute_strength_score(day_exercises) if day_exercises else 0.0
+            strength_score = compute_strength_score(day_exercises)["strength_index"] if day_exercises else 0.0
             walk_minutes = float(sum(e.duration_minutes for e in day_exercises if e.exercise_category.value == "WALK")) if day_exercises else 0.0
             avg_grip = 0.0
             if day_exercises:
@@ -146,11 +183,7 @@ class AnalyticsEngine:
             fruit_servings = 0.0
             nut_servings = 0.0
             if log:
-                day_entries = db.scalars(
-                    select(MealEntry)
-                    .join(FoodItem, FoodItem.id == MealEntry.food_item_id)
-                    .where(MealEntry.daily_log_id == log.id)
-                ).all()
+                day_entries = meals_by_log.get(log.id, [])
                 fruit_servings = sum(entry.servings for entry in day_entries if entry.food_item.food_group == "fruit")
                 nut_servings = sum(
                     entry.servings for entry in day_entries if entry.food_item.food_group == "nut" and not entry.food_item.nut_seed_exception
@@ -215,5 +248,17 @@ class AnalyticsEngine:
             },
         }
 
+    def to_columnar(self, analytics: dict) -> dict:
+        """Replace each series' ``points`` with parallel ``dates``/``values`` lists."""
+        columnar = {}
+        for key, value in analytics.items():
+            if isinstance(value, dict) and "points" in value:
+                series = {name: item for name, item in value.items() if name != "points"}
+                series["dates"] = [point["date"] for point in value["points"]]
+                series["values"] = [point["value"] for point in value["points"]]
+                value = series
+            columnar[key] = value
+        return columnar
+
 
 analytics_engine = AnalyticsEngine()
@@ -4,6 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
 
 from app.models import DailyLog, ExerciseEntry, InsulinScore, User, VitalsEntry
+from app.services.daily_totals import get_or_create_daily_log
 from app.services.exercise_engine import infer_workout_category
 from app.services.rule_engine import evaluate_daily_status, get_or_create_metabolic_profile
 
@@ -38,11 +39,7 @@ class AppleHealthService:
         for workout in parsed.get("workouts", []):
             performed_at = self._as_datetime(workout.get("performed_at"), parsed["recorded_at"])
             log_date = performed_at.date()
-            daily_log = self.db.query(DailyLog).filter_by(user_id=user.id, log_date=log_date).one_or_none()
-            if not daily_log:
-                daily_log = DailyLog(user_id=user.id, log_date=log_date)
-                self.db.add(daily_log)
-                self.db.flush()
+            daily_log = get_or_create_daily_log(self.db, user.id, log_date)
 
             activity_type = workout.get("activity_type", workout.get("workout_type", workout.get("movement_type", "apple_workout")))
             movement_type = workout.get("movement_type", activity_type)
@@ -5,16 +5,16 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.kdf_pool import kdf_pool
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    hash_password,
     hash_token,
     validate_password_policy,
-    verify_password,
 )
-from app.models import AuthLoginAttempt, PasswordResetToken, RefreshToken, User
+from app.models import PasswordResetToken, RefreshToken, User
 from app.services.audit_service import audit_service
+from app.services.login_attempts import login_attempt_buffer
 
 
 class AuthService:
@@ -24,30 +24,28 @@ class AuthService:
         now = datetime.utcnow()
 
         if not user:
-            db.add(AuthLoginAttempt(email=normalized_email, ip_address=ip_address, success=False))
-            db.commit()
+            login_attempt_buffer.record(db, email=normalized_email, ip_address=ip_address, success=False)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
         if not user.is_active:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account is disabled")
 
         if user.locked_until and user.locked_until > now:
-            db.add(AuthLoginAttempt(user_id=user.id, email=user.email, ip_address=ip_address, success=False))
-            db.commit()
+            login_attempt_buffer.record(db, user_id=user.id, email=user.email, ip_address=ip_address, success=False)
             raise HTTPException(status_code=status.HTTP_423_LOCKED, detail="Account temporarily locked")
 
-        if not verify_password(password, user.hashed_password):
+        if not kdf_pool.verify_password(password, user.hashed_password):
             user.failed_attempts += 1
             if user.failed_attempts >= 5:
                 user.locked_until = now + timedelta(minutes=15)
-            db.add(AuthLoginAttempt(user_id=user.id, email=user.email, ip_address=ip_address, success=False))
             db.commit()
+            login_attempt_buffer.record(db, user_id=user.id, email=user.email, ip_address=ip_address, success=False)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
         user.failed_attempts = 0
         user.locked_until = None
         user.last_login = now
-        db.add(AuthLoginAttempt(user_id=user.id, email=user.email, ip_address=ip_address, success=True))
+        login_attempt_buffer.record(db, user_id=user.id, email=user.email, ip_address=ip_address, success=True)
         token_bundle = self._issue_token_pair(db, user.id)
         audit_service.log_event(
             db,
@@ -67,7 +65,7 @@ class AuthService:
         if existing_user:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered")
 
-        user = User(email=normalized_email, hashed_password=hash_password(password))
+        user = User(email=normalized_email, hashed_password=kdf_pool.hash_password(password))
         db.add(user)
         db.flush()
         token_bundle = self._issue_token_pair(db, user.id)
@@ -160,7 +158,7 @@ class AuthService:
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-        user.hashed_password = hash_password(new_password)
+        user.hashed_password = kdf_pool.hash_password(new_password)
         stored.used_at = now
         db.commit()
 
@@ -7,6 +7,7 @@ from random import choices
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.db.upsert import get_or_create
 from app.models import ChallengeAssignment, ChallengeFrequency, ChallengeStreak, DailyLog, ExerciseCategory, ExerciseEntry, User, VitalsEntry
 from app.services.rule_engine import get_or_create_metabolic_profile
 
@@ -122,43 +123,34 @@ class ChallengeEngine:
             period_start = today.replace(day=1)
             next_month = (period_start.replace(day=28) + timedelta(days=4)).replace(day=1)
             period_end = next_month - timedelta(days=1)
-            existing = self.db.scalar(
-                select(ChallengeAssignment).where(
-                    ChallengeAssignment.user_id == user.id,
-                    ChallengeAssignment.frequency == frequency,
-                    ChallengeAssignment.period_start == period_start,
-                )
-            )
-            if existing:
-                return existing
         else:
             period_start = period_end = today
-            existing = self.db.scalar(
-                select(ChallengeAssignment).where(
-                    ChallengeAssignment.user_id == user.id,
-                    ChallengeAssignment.frequency == frequency,
-                    ChallengeAssignment.challenge_date == today,
-                )
+
+        existing = self.db.scalar(
+            select(ChallengeAssignment).where(
+                ChallengeAssignment.user_id == user.id,
+                ChallengeAssignment.frequency == frequency,
+                ChallengeAssignment.period_start == period_start,
             )
-            if existing:
-                return existing
+        )
+        if existing:
+            return existing
 
         template = self._select_template(user, frequency)
-        assignment = ChallengeAssignment(
-            user_id=user.id,
-            frequency=frequency,
-            challenge_date=today,
-            period_start=period_start,
-            period_end=period_end,
-            challenge_code=template.code,
-            challenge_name=template.name,
-            challenge_description=template.description,
-            goal_metric=template.metric,
-            goal_target=template.target_value,
+        return get_or_create(
+            self.db,
+            ChallengeAssignment,
+            {"user_id": user.id, "frequency": frequency, "period_start": period_start},
+            {
+                "challenge_date": today,
+                "period_end": period_end,
+                "challenge_code": template.code,
+                "challenge_name": template.name,
+                "challenge_description": template.description,
+                "goal_metric": template.metric,
+                "goal_target": template.target_value,
+            },
         )
-        self.db.add(assignment)
-        self.db.flush()
-        return assignment
 
     def mark_completed(self, assignment: ChallengeAssignment) -> ChallengeStreak:
         if assignment.completed:
@@ -228,13 +220,4 @@ class ChallengeEngine:
         return base_weights
 
     def get_or_create_streak(self, user_id: int, frequency: ChallengeFrequency) -> ChallengeStreak:
-        streak = self.db.scalar(
-            select(ChallengeStreak).where(ChallengeStreak.user_id == user_id, ChallengeStreak.frequency == frequency)
-        )
-        if streak:
-            return streak
-
-        streak = ChallengeStreak(user_id=user_id, frequency=frequency)
-        self.db.add(streak)
-        self.db.flush()
-        return streak
+        return get_or_create(self.db, ChallengeStreak, {"user_id": user_id, "frequency": frequency})
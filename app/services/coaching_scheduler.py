@@ -3,10 +3,12 @@ from datetime import date, datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy import select
 
-from app.db.session import SessionLocal
+from app.db.session import get_sessionmaker
 from app.models import DailyLog, ExerciseEntry, InsulinScore, User
 from app.services.notification_service import notification_service
 
+SchedulerSessionLocal = get_sessionmaker("scheduler")
+
 
 class CoachingScheduler:
     def __init__(self):
@@ -14,7 +16,7 @@ class CoachingScheduler:
         self.started = False
 
     def _send_coaching_message(self, user_id: int, title: str, body: str, category_toggle: str | None = None):
-        db = SessionLocal()
+        db = SchedulerSessionLocal()
         try:
             settings = notification_service.get_or_create_settings(db, user_id)
             if category_toggle and not getattr(settings, category_toggle, True):
@@ -32,7 +34,7 @@ class CoachingScheduler:
             db.close()
 
     def _send_all_users(self, title: str, body: str, category_toggle: str | None = None):
-        db = SessionLocal()
+        db = SchedulerSessionLocal()
         try:
             user_ids = db.scalars(select(User.id)).all()
         finally:
@@ -41,7 +43,7 @@ class CoachingScheduler:
             self._send_coaching_message(user_id=user_id, title=title, body=body, category_toggle=category_toggle)
 
     def _check_dynamic_alerts(self):
-        db = SessionLocal()
+        db = SchedulerSessionLocal()
         try:
             users = db.scalars(select(User)).all()
             today = date.today()
@@ -0,0 +1,188 @@
+import logging
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.db.upsert import get_or_create
+from app.models import DailyLog, FoodItem, InsulinScore, MealEntry, next_change_seq
+from app.services.live_events import queue_daily_totals
+
+logger = logging.getLogger(__name__)
+
+# DailyLog columns maintained by adding each new meal entry's contribution.
+DELTA_COLUMNS = (
+    "total_protein",
+    "total_carbs",
+    "total_fats",
+    "total_sugar",
+    "total_fiber",
+    "total_hdl_support",
+    "total_triglyceride_risk",
+    "total_hidden_oil",
+    "fruit_servings",
+    "nut_servings",
+)
+
+CONSISTENCY_TOLERANCE = 0.05
+
+
+def get_or_create_daily_log(db: Session, user_id: int, log_date: date) -> DailyLog:
+    return get_or_create(db, DailyLog, {"user_id": user_id, "log_date": log_date})
+
+
+def meal_contribution(food: FoodItem, servings: float) -> dict[str, float]:
+    is_counted_nut = food.food_group == "nut" and not food.nut_seed_exception
+    return {
+        "total_protein": food.protein * servings,
+        "total_carbs": food.carbs * servings,
+        "total_fats": food.fats * servings,
+        "total_sugar": (food.sugar or 0.0) * servings,
+        "total_fiber": (food.fiber or 0.0) * servings,
+        "total_hdl_support": (food.hdl_support_score or 0.0) * servings,
+        "total_triglyceride_risk": (food.triglyceride_risk_weight or 0.0) * servings,
+        "total_hidden_oil": food.hidden_oil_estimate * servings,
+        "fruit_servings": servings if food.food_group == "fruit" else 0.0,
+        "nut_servings": servings if is_counted_nut else 0.0,
+    }
+
+
+def apply_meal_deltas(db: Session, daily_log: DailyLog, contributions: Iterable[dict[str, float]]) -> None:
+    """Add new meal entries to the day's totals with one atomic UPDATE.
+
+    The increment happens in the database, so concurrent logs for the same day
+    cannot overwrite each other, and the cost does not grow with the number of
+    meals already logged.
+    """
+    delta = dict.fromkeys(DELTA_COLUMNS, 0.0)
+    for contribution in contributions:
+        for column, amount in contribution.items():
+            delta[column] += amount
+
+    db.execute(
+        update(DailyLog)
+        .where(DailyLog.id == daily_log.id)
+        .values({column: getattr(DailyLog, column) + amount for column, amount in delta.items()})
+        .values(change_seq=next_change_seq(db, daily_log.user_id))
+        .execution_options(synchronize_session=False)
+    )
+    db.refresh(daily_log, attribute_names=list(DELTA_COLUMNS))
+    queue_daily_totals(db, daily_log)
+
+
+def record_dinner(
+    daily_log: DailyLog, contributions: list[dict[str, float]], consumed_at: datetime, dinner_mode: str | None
+) -> None:
+    # Entries sharing the same timestamp form one dinner, so extend it rather than replace it.
+    previous = (daily_log.dinner_meal or {}) if daily_log.dinner_logged_at == consumed_at else {}
+    daily_log.dinner_meal = {
+        "carbs": round(float(previous.get("carbs", 0.0)) + sum(item["total_carbs"] for item in contributions), 2),
+        "protein": round(float(previous.get("protein", 0.0)) + sum(item["total_protein"] for item in contributions), 2),
+    }
+    daily_log.dinner_mode = dinner_mode
+    daily_log.dinner_logged_at = consumed_at
+
+
+def compute_totals_from_entries(db: Session, daily_log_id: int) -> dict[str, float]:
+    servings = MealEntry.servings
+    is_counted_nut = (FoodItem.food_group == "nut") & FoodItem.nut_seed_exception.is_not(True)
+    sums = {
+        "total_protein": FoodItem.protein * servings,
+        "total_carbs": FoodItem.carbs * servings,
+        "total_fats": FoodItem.fats * servings,
+        "total_sugar": func.coalesce(FoodItem.sugar, 0.0) * servings,
+        "total_fiber": func.coalesce(FoodItem.fiber, 0.0) * servings,
+        "total_hdl_support": func.coalesce(FoodItem.hdl_support_score, 0.0) * servings,
+        "total_triglyceride_risk": func.coalesce(FoodItem.triglyceride_risk_weight, 0.0) * servings,
+        "total_hidden_oil": FoodItem.hidden_oil_estimate * servings,
+        "fruit_servings": case((FoodItem.food_group == "fruit", servings), else_=0.0),
+        "nut_servings": case((is_counted_nut, servings), else_=0.0),
+    }
+    row = db.execute(
+        select(*[func.coalesce(func.sum(expression), 0.0).label(column) for column, expression in sums.items()])
+        .select_from(MealEntry)
+        .join(FoodItem, FoodItem.id == MealEntry.food_item_id)
+        .where(MealEntry.daily_log_id == daily_log_id)
+    ).one()
+    return {column: round(float(value), 2) for column, value in row._mapping.items()}
+
+
+RANGE_COLUMNS = (
+    "total_protein",
+    "total_carbs",
+    "total_fats",
+    "total_sugar",
+    "total_fiber",
+    "total_hidden_oil",
+    "fruit_servings",
+    "nut_servings",
+    "water_ml",
+    "hydration_score",
+)
+
+
+def summarize_range(db: Session, user_id: int, start: date, end: date) -> list:
+    """Per-day totals, latest insulin score and meal count for every logged day in [start, end].
+
+    One statement regardless of the range length. Meal count and latest score
+    are correlated subqueries, so they only touch the days in range.
+    """
+    meal_count = (
+        select(func.count(MealEntry.id))
+        .where(MealEntry.daily_log_id == DailyLog.id)
+        .correlate(DailyLog)
+        .scalar_subquery()
+    )
+    latest_score = (
+        select(InsulinScore.score)
+        .where(InsulinScore.daily_log_id == DailyLog.id)
+        .order_by(InsulinScore.calculated_at.desc(), InsulinScore.id.desc())
+        .limit(1)
+        .correlate(DailyLog)
+        .scalar_subquery()
+    )
+    return db.execute(
+        select(
+            DailyLog.log_date,
+            *[getattr(DailyLog, column) for column in RANGE_COLUMNS],
+            latest_score.label("insulin_load_score"),
+            meal_count.label("meal_count"),
+        )
+        .where(DailyLog.user_id == user_id, DailyLog.log_date >= start, DailyLog.log_date <= end)
+        .order_by(DailyLog.log_date.asc())
+    ).all()
+
+
+def find_drift(db: Session, daily_log: DailyLog) -> dict[str, tuple[float, float]]:
+    """Columns whose stored total differs from the sum of the raw meal entries, as (stored, expected)."""
+    expected = compute_totals_from_entries(db, daily_log.id)
+    drift: dict[str, tuple[float, float]] = {}
+    for column, value in expected.items():
+        stored = float(getattr(daily_log, column) or 0.0)
+        if abs(stored - value) > CONSISTENCY_TOLERANCE:
+            drift[column] = (stored, value)
+    return drift
+
+
+def rebuild_daily_totals(db: Session, daily_log: DailyLog) -> None:
+    for column, value in compute_totals_from_entries(db, daily_log.id).items():
+        setattr(daily_log, column, value)
+    db.flush()
+
+
+def verify_recent_daily_totals(db: Session, days: int = 2, repair: bool = True) -> int:
+    """Check the last ``days`` of daily logs against their meal entries; returns how many drifted."""
+    since = date.today() - timedelta(days=days)
+    drifted = 0
+    for daily_log in db.scalars(select(DailyLog).where(DailyLog.log_date >= since)).all():
+        drift = find_drift(db, daily_log)
+        if not drift:
+            continue
+        drifted += 1
+        logger.warning("Daily totals drift daily_log_id=%s columns=%s", daily_log.id, drift)
+        if repair:
+            rebuild_daily_totals(db, daily_log)
+    if repair:
+        db.commit()
+    return drifted
@@ -0,0 +1,426 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    ChallengeAssignment,
+    ChallengeFrequency,
+    DailyLog,
+    ExerciseCategory,
+    ExerciseEntry,
+    FoodItem,
+    InsulinScore,
+    MealEntry,
+    MetabolicProfile,
+    Recipe,
+    User,
+    VitalsEntry,
+)
+from app.schemas.schemas import (
+    AdvancedAnalyticsResponse,
+    ChallengeResponse,
+    DailySummaryResponse,
+    ExerciseSummaryResponse,
+    HabitIntelligenceResponse,
+    MetabolicPhasePerformanceResponse,
+    MovementPanelResponse,
+    NotificationSettingsResponse,
+    ProfileResponse,
+    RecipeResponse,
+    RecipeSuggestionResponse,
+    VitalsSummaryResponse,
+)
+from app.services.analytics_engine import analytics_engine
+from app.services.challenge_engine import ChallengeEngine
+from app.services.habit_intelligence_engine import habit_intelligence_engine
+from app.services.hydration_engine import HYDRATION_TARGET_MAX_ML, HYDRATION_TARGET_MIN_ML
+from app.services.metabolic_phase_service import metabolic_phase_service
+from app.services.movement_engine import movement_engine
+from app.services.notification_service import notification_service
+from app.services.recipe_service import recipe_service
+from app.services.rule_engine import (
+    get_or_create_metabolic_profile,
+    validate_carb_limit,
+    validate_oil_limit,
+    validate_protein_minimum,
+)
+from app.services.strength_engine import (
+    compute_grip_improvement_percent,
+    compute_monkey_bar_progress,
+    compute_strength_score,
+    compute_weekly_strength_graph,
+    metabolic_strength_signals,
+    strength_index,
+)
+from app.services.vitals_engine import calculate_vitals_risk_score
+
+# Panels served by /dashboard/bootstrap, in the order they are built.
+DASHBOARD_PANELS = (
+    "profile",
+    "daily_summary",
+    "movement_panel",
+    "challenge",
+    "monthly_challenge",
+    "vitals_summary",
+    "exercise_summary",
+    "analytics",
+    "performance_view",
+    "habit_intelligence",
+    "recipes",
+    "recipe_suggestions",
+    "notification_settings",
+)
+
+
+def profile_response(user: User, profile: MetabolicProfile) -> ProfileResponse:
+    return ProfileResponse(
+        user_id=user.id,
+        protein_target_min=profile.protein_target_min,
+        protein_target_max=profile.protein_target_max,
+        carb_ceiling=profile.carb_ceiling,
+        oil_limit_tsp=profile.oil_limit_tsp,
+        fasting_start_time=profile.fasting_start_time,
+        fasting_end_time=profile.fasting_end_time,
+        max_chapati_per_day=profile.max_chapati_per_day,
+        allow_rice=profile.allow_rice,
+        chocolate_limit_per_day=profile.chocolate_limit_per_day,
+        insulin_score_green_threshold=profile.insulin_score_green_threshold,
+        insulin_score_yellow_threshold=profile.insulin_score_yellow_threshold,
+    )
+
+
+def daily_summary_response(db: Session, daily_log: DailyLog, profile: MetabolicProfile) -> DailySummaryResponse:
+    latest_score = db.scalar(
+        select(InsulinScore.score)
+        .where(InsulinScore.daily_log_id == daily_log.id)
+        .order_by(InsulinScore.calculated_at.desc())
+        .limit(1)
+    )
+
+    validations = {
+        "carb_limit": validate_carb_limit(daily_log.total_carbs, profile.carb_ceiling),
+        "oil_limit": validate_oil_limit(daily_log.total_hidden_oil, profile.oil_limit_tsp),
+        "protein_minimum": validate_protein_minimum(daily_log.total_protein, profile.protein_target_min),
+    }
+
+    had_banana = db.scalar(
+        select(MealEntry.id)
+        .join(FoodItem, FoodItem.id == MealEntry.food_item_id)
+        .where(MealEntry.daily_log_id == daily_log.id, func.lower(FoodItem.name) == "banana")
+        .limit(1)
+    )
+    warnings = []
+    if had_banana:
+        warnings.append("High insulin fruit for current triglyceride level.")
+
+    return DailySummaryResponse(
+        date=daily_log.log_date,
+        total_protein=daily_log.total_protein,
+        total_carbs=daily_log.total_carbs,
+        total_fats=daily_log.total_fats,
+        total_sugar=daily_log.total_sugar,
+        total_fiber=daily_log.total_fiber,
+        total_hidden_oil=daily_log.total_hidden_oil,
+        insulin_load_score=latest_score,
+        fruit_servings=daily_log.fruit_servings,
+        fruit_budget=1.0,
+        nuts_servings=daily_log.nut_servings,
+        nuts_budget=1.0,
+        remaining_carb_budget=max(0.0, round(profile.carb_ceiling - daily_log.total_carbs, 2)),
+        warnings=warnings,
+        water_ml=daily_log.water_ml,
+        hydration_score=daily_log.hydration_score,
+        hydration_target_min_ml=HYDRATION_TARGET_MIN_ML,
+        hydration_target_max_ml=HYDRATION_TARGET_MAX_ML,
+        hydration_target_achieved=daily_log.water_ml >= HYDRATION_TARGET_MIN_ML,
+        validations=validations,
+        dinner_logged=bool(daily_log.dinner_meal),
+        dinner_carbs=float((daily_log.dinner_meal or {}).get("carbs", 0.0)),
+        dinner_protein=float((daily_log.dinner_meal or {}).get("protein", 0.0)),
+        dinner_mode=daily_log.dinner_mode,
+        dinner_insulin_impact=daily_log.dinner_insulin_impact,
+        evening_insulin_spike_risk=daily_log.evening_insulin_spike_risk,
+    )
+
+
+@dataclass
+class ExerciseTotals:
+    """All-time exercise figures, so the summary does not need every entry in memory."""
+
+    sessions: int
+    duration_minutes: int
+    steps: int
+    strength_index: float
+    monkey_bar_progress: dict[str, int]
+
+    @classmethod
+    def from_entries(cls, entries: list[ExerciseEntry]) -> "ExerciseTotals":
+        return cls(
+            sessions=len(entries),
+            duration_minutes=sum(entry.duration_minutes for entry in entries),
+            steps=sum(entry.step_count or 0 for entry in entries),
+            strength_index=float(compute_strength_score(entries)["strength_index"]),
+            monkey_bar_progress=compute_monkey_bar_progress(entries),
+        )
+
+
+def exercise_totals(db: Session, user_id: int) -> ExerciseTotals:
+    """``ExerciseTotals`` for the user's whole history in one aggregate query."""
+
+    def reps_of(movement: str):
+        return case(
+            (ExerciseEntry.movement_type == movement, func.coalesce(ExerciseEntry.reps, 0) * func.coalesce(ExerciseEntry.sets, 1)),
+            else_=0,
+        )
+
+    def monkey_bar_max(column):
+        return func.coalesce(func.max(case((ExerciseEntry.exercise_category == ExerciseCategory.MONKEY_BAR, column))), 0)
+
+    row = db.execute(
+        select(
+            func.count(ExerciseEntry.id),
+            func.coalesce(func.sum(ExerciseEntry.duration_minutes), 0),
+            func.coalesce(func.sum(ExerciseEntry.step_count), 0),
+            func.coalesce(func.sum(reps_of("pushups")), 0),
+            func.coalesce(func.sum(ExerciseEntry.pull_up_count), 0),
+            func.coalesce(func.sum(ExerciseEntry.dead_hang_duration_seconds), 0),
+            func.coalesce(func.sum(reps_of("squats")), 0),
+            monkey_bar_max(ExerciseEntry.dead_hang_duration_seconds),
+            monkey_bar_max(ExerciseEntry.pull_up_count),
+            monkey_bar_max(ExerciseEntry.assisted_pull_up_reps),
+            monkey_bar_max(ExerciseEntry.grip_endurance_seconds),
+        ).where(ExerciseEntry.user_id == user_id)
+    ).one()
+    sessions, duration, steps, pushups, pullups, dead_hang, squats, hang_max, pull_max, assisted_max, grip_max = row
+    return ExerciseTotals(
+        sessions=int(sessions),
+        duration_minutes=int(duration),
+        steps=int(steps),
+        strength_index=float(strength_index(int(pushups), int(pullups), int(dead_hang), int(squats))),
+        monkey_bar_progress={
+            "dead_hang_duration_seconds": int(hang_max),
+            "pull_up_count": int(pull_max),
+            "assisted_pull_up_reps": int(assisted_max),
+            "grip_endurance_seconds": int(grip_max),
+        },
+    )
+
+
+def exercise_summary_response(
+    user_id: int, entries: list[ExerciseEntry], totals: ExerciseTotals | None = None
+) -> ExerciseSummaryResponse:
+    """Summarise exercise; ``entries`` must cover the last three weeks when ``totals`` is given."""
+    totals = totals or ExerciseTotals.from_entries(entries)
+    metabolic_signals = metabolic_strength_signals(entries)
+    return ExerciseSummaryResponse(
+        user_id=user_id,
+        total_sessions=totals.sessions,
+        total_duration_minutes=totals.duration_minutes,
+        total_steps=totals.steps,
+        strength_index=totals.strength_index,
+        grip_strength_improvement_pct=compute_grip_improvement_percent(entries),
+        hdl_improvement_mode=bool(metabolic_signals["hdl_improvement_mode"]),
+        muscle_stimulus_reduced=bool(metabolic_signals["muscle_stimulus_reduced"]),
+        metabolic_message=str(metabolic_signals["metabolic_message"]),
+        monkey_bar_progress=totals.monkey_bar_progress,
+        weekly_strength_graph=compute_weekly_strength_graph(entries),
+    )
+
+
+def vitals_summary_response(user_id: int, vitals_entries: list[VitalsEntry]) -> VitalsSummaryResponse | None:
+    """Summarise vitals ordered oldest first; ``None`` when nothing has been recorded."""
+    if not vitals_entries:
+        return None
+    latest = vitals_entries[-1]
+    risk = calculate_vitals_risk_score(vitals_entries)
+    return VitalsSummaryResponse(
+        user_id=user_id,
+        latest_steps_total=latest.steps_total,
+        latest_resting_hr=latest.resting_hr,
+        latest_sleep_hours=latest.sleep_hours,
+        risk_flag=risk["flag"],
+    )
+
+
+def notification_settings_response(user_id: int, settings) -> NotificationSettingsResponse:
+    return NotificationSettingsResponse(
+        user_id=user_id,
+        whatsapp_enabled=settings.whatsapp_enabled,
+        push_enabled=settings.push_enabled,
+        email_enabled=settings.email_enabled,
+        silent_mode=settings.silent_mode,
+        protein_reminders_enabled=settings.protein_reminders_enabled,
+        fasting_alerts_enabled=settings.fasting_alerts_enabled,
+        hydration_alerts_enabled=settings.hydration_alerts_enabled,
+        insulin_alerts_enabled=settings.insulin_alerts_enabled,
+        strength_reminders_enabled=settings.strength_reminders_enabled,
+        quiet_hours_start=settings.quiet_hours_start,
+        quiet_hours_end=settings.quiet_hours_end,
+        movement_reminder_delay_minutes=settings.movement_reminder_delay_minutes,
+        movement_sensitivity=settings.movement_sensitivity,
+    )
+
+
+def challenge_response(challenge: ChallengeAssignment, current_streak: int, longest_streak: int) -> ChallengeResponse:
+    return ChallengeResponse(
+        challenge_id=challenge.id,
+        frequency=challenge.frequency.value,
+        title=challenge.challenge_name,
+        description=challenge.challenge_description,
+        goal_metric=challenge.goal_metric,
+        goal_target=challenge.goal_target,
+        completed=challenge.completed,
+        current_streak=current_streak,
+        longest_streak=longest_streak,
+        banner_title="7 Day Insulin Control Challenge",
+    )
+
+
+def recipe_response(recipe: Recipe) -> RecipeResponse:
+    links = [link for link in [recipe.external_link_primary, recipe.external_link_secondary] if link]
+    return RecipeResponse(
+        id=recipe.id,
+        name=recipe.name,
+        ingredients=recipe.ingredients,
+        macros={"protein": recipe.protein, "carbs": recipe.carbs, "fats": recipe.fats},
+        cooking_time_minutes=recipe.cooking_time_minutes,
+        oil_usage_tsp=recipe.oil_usage_tsp,
+        insulin_score_impact=recipe.insulin_score_impact,
+        external_links=links,
+    )
+
+
+@dataclass
+class DashboardContext:
+    """Rows every dashboard panel reads, loaded once per bootstrap request."""
+
+    user: User
+    profile: MetabolicProfile
+    today: date
+    today_log: DailyLog | None
+    vitals: list[VitalsEntry]
+    exercises: list[ExerciseEntry]
+    exercise_totals: ExerciseTotals
+    recipes: list[Recipe] | None = None
+
+
+class DashboardService:
+    # The longest lookback any panel renders (the walk streak); covers analytics' 30 days
+    # and the strength signals' three weeks.
+    HISTORY_WINDOW_DAYS = movement_engine.WALK_STREAK_WINDOW_DAYS
+    # The vitals risk flag reads the last three readings, however old they are.
+    LATEST_VITALS = 3
+
+    def load_context(self, db: Session, user: User, today: date | None = None) -> DashboardContext:
+        """Load the rows the panels read: the history window, plus what lies before it only as aggregates."""
+        target_date = today or datetime.utcnow().date()
+        window_start = datetime.combine(target_date - timedelta(days=self.HISTORY_WINDOW_DAYS - 1), time.min)
+        vitals = {
+            row.id: row
+            for statement in (
+                select(VitalsEntry).where(VitalsEntry.user_id == user.id, VitalsEntry.recorded_at >= window_start),
+                select(VitalsEntry)
+                .where(VitalsEntry.user_id == user.id)
+                .order_by(VitalsEntry.recorded_at.desc())
+                .limit(self.LATEST_VITALS),
+            )
+            for row in db.scalars(statement)
+        }
+        return DashboardContext(
+            user=user,
+            profile=get_or_create_metabolic_profile(db, user),
+            today=target_date,
+            today_log=db.scalar(select(DailyLog).where(DailyLog.user_id == user.id, DailyLog.log_date == target_date)),
+            vitals=sorted(vitals.values(), key=lambda row: row.recorded_at),
+            exercises=list(
+                db.scalars(
+                    select(ExerciseEntry)
+                    .where(ExerciseEntry.user_id == user.id, ExerciseEntry.performed_at >= window_start)
+                    .order_by(ExerciseEntry.performed_at.asc())
+                )
+            ),
+            exercise_totals=exercise_totals(db, user.id),
+        )
+
+    def build(self, db: Session, user: User, panels: tuple[str, ...] = DASHBOARD_PANELS) -> dict:
+        """Build the requested panels from one shared context.
+
+        Panels without data (no log for today, no vitals yet) come back as
+        ``None`` rather than failing the whole bootstrap the way their
+        standalone endpoints return 404.
+        """
+        context = self.load_context(db, user)
+        return {panel: getattr(self, f"_build_{panel}")(db, context) for panel in panels}
+
+    def _build_profile(self, _db: Session, context: DashboardContext) -> ProfileResponse:
+        return profile_response(context.user, context.profile)
+
+    def _build_daily_summary(self, db: Session, context: DashboardContext) -> DailySummaryResponse | None:
+        if context.today_log is None:
+            return None
+        return daily_summary_response(db, context.today_log, context.profile)
+
+    def _build_movement_panel(self, db: Session, context: DashboardContext) -> MovementPanelResponse:
+        return MovementPanelResponse(**movement_engine.build_panel(db, context.user.id, entries=context.exercises))
+
+    def _build_challenge(self, db: Session, context: DashboardContext) -> ChallengeResponse:
+        return self._challenge(db, context.user, ChallengeFrequency.DAILY)
+
+    def _build_monthly_challenge(self, db: Session, context: DashboardContext) -> ChallengeResponse:
+        return self._challenge(db, context.user, ChallengeFrequency.MONTHLY)
+
+    def _challenge(self, db: Session, user: User, frequency: ChallengeFrequency) -> ChallengeResponse:
+        engine = ChallengeEngine(db)
+        challenge = engine.assign_for_today(user, frequency)
+        streak = engine.get_or_create_streak(user.id, frequency)
+        return challenge_response(challenge, streak.current_streak, streak.longest_streak)
+
+    def _build_vitals_summary(self, _db: Session, context: DashboardContext) -> VitalsSummaryResponse | None:
+        return vitals_summary_response(context.user.id, context.vitals)
+
+    def _build_exercise_summary(self, _db: Session, context: DashboardContext) -> ExerciseSummaryResponse:
+        return exercise_summary_response(context.user.id, context.exercises, context.exercise_totals)
+
+    def _build_analytics(self, db: Session, context: DashboardContext) -> AdvancedAnalyticsResponse:
+        analytics = analytics_engine.build_advanced_analytics(
+            db, user_id=context.user.id, vitals=context.vitals, exercise_entries=context.exercises
+        )
+        return AdvancedAnalyticsResponse(**analytics)
+
+    def _build_performance_view(self, db: Session, context: DashboardContext) -> MetabolicPhasePerformanceResponse:
+        return MetabolicPhasePerformanceResponse(**metabolic_phase_service.build_phase_dashboard(db, user_id=context.user.id))
+
+    def _build_habit_intelligence(self, db: Session, context: DashboardContext) -> HabitIntelligenceResponse:
+        return HabitIntelligenceResponse(**habit_intelligence_engine.summarize(db, user_id=context.user.id))
+
+    def _build_recipes(self, db: Session, context: DashboardContext) -> list[RecipeResponse]:
+        return [recipe_response(recipe) for recipe in self._recipes(db, context)]
+
+    def _build_recipe_suggestions(self, db: Session, context: DashboardContext) -> RecipeSuggestionResponse:
+        carb_load_remaining, suggestion, recipes = recipe_service.suggest_recipes(
+            db,
+            context.user.id,
+            context.profile,
+            current_carbs=context.today_log.total_carbs if context.today_log else 0.0,
+            recipes=self._recipes(db, context),
+        )
+        return RecipeSuggestionResponse(
+            user_id=context.user.id,
+            carb_load_remaining=carb_load_remaining,
+            suggestion=suggestion,
+            recipes=[recipe_response(recipe) for recipe in recipes],
+        )
+
+    def _recipes(self, db: Session, context: DashboardContext) -> list[Recipe]:
+        if context.recipes is None:
+            context.recipes = list(recipe_service.list_recipes(db))
+        return context.recipes
+
+    def _build_notification_settings(self, db: Session, context: DashboardContext) -> NotificationSettingsResponse:
+        settings = notification_service.get_or_create_settings(db, context.user.id)
+        return notification_settings_response(context.user.id, settings)
+
+
+dashboard_service = DashboardService()
@@ -1,4 +1,5 @@
 import base64
+import copy
 import hashlib
 import json
 from dataclasses import dataclass
@@ -7,16 +8,17 @@ from pathlib import Path
 from threading import Lock
 from time import time
 from typing import Any
-from urllib import error, request
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.llm_gateway import LLMGatewayError, llm_gateway, message_content
+from app.core.single_flight import single_flight
 from app.models import DailyLog, FoodItem, MealEntry, MetabolicProfile, User
+from app.services.daily_totals import apply_meal_deltas, get_or_create_daily_log, meal_contribution
 from app.services.insulin_engine import calculate_insulin_load_score
 from app.services.rule_engine import (
-    calculate_daily_macros,
     evaluate_daily_status,
     validate_carb_limit,
     validate_fasting_window,
@@ -106,6 +108,7 @@ class FoodImageService:
         self.cache_ttl_seconds = cache_ttl_seconds
         self._cache: dict[str, CachedImageAnalysis] = {}
         self._lock = Lock()
+        self._flight = single_flight("food_image", timeout_seconds=llm_gateway.purposes["vision"].timeout_seconds)
 
     def analyze_food_image(
         self,
@@ -120,8 +123,10 @@ class FoodImageService:
         cache_key = hashlib.sha256(prepared_bytes[:100_000]).hexdigest()
         extracted = self._from_cache(cache_key)
         if extracted is None:
-            extracted = self._extract_with_vision(prepared_bytes, meal_context)
-            self._save_cache(cache_key, extracted)
+            # A double-submit or client retry of the same photo waits for the vision call already running.
+            extracted = self._flight.do(cache_key, lambda: self._extract_and_cache(cache_key, prepared_bytes, meal_context))
+        # Portion scaling below edits foods in place; the cached and shared copies must stay unscaled.
+        extracted = copy.deepcopy(extracted)
 
         scale_factor, portion_confidence = self._calibrate_portion_scale(extracted)
         foods = extracted.get("foods", [])
@@ -172,12 +177,9 @@ class FoodImageService:
         consumed_at: datetime,
     ) -> dict[str, Any]:
         log_date = consumed_at.date()
-        daily_log = db.scalar(select(DailyLog).where(DailyLog.user_id == user.id, DailyLog.log_date == log_date))
-        if not daily_log:
-            daily_log = DailyLog(user_id=user.id, log_date=log_date)
-            db.add(daily_log)
-            db.flush()
+        daily_log = get_or_create_daily_log(db, user.id, log_date)
 
+        contributions: list[dict[str, float]] = []
         for food in foods:
             food_name = food["name"].strip().lower()
             matched = db.scalar(select(FoodItem).where(FoodItem.name.ilike(food_name)).limit(1))
@@ -196,6 +198,7 @@ class FoodImageService:
                 db.flush()
 
             servings = max(0.1, float(food.get("estimated_quantity_grams", 100.0)) / 100.0)
+            contributions.append(meal_contribution(matched, servings))
             db.add(
                 MealEntry(
                     daily_log_id=daily_log.id,
@@ -210,24 +213,13 @@ class FoodImageService:
             )
 
         db.flush()
-        meal_entries = db.scalars(select(MealEntry).where(MealEntry.daily_log_id == daily_log.id)).all()
-        food_map = {f.id: f for f in db.scalars(select(FoodItem).where(FoodItem.id.in_([m.food_item_id for m in meal_entries]))).all()}
-        totals = calculate_daily_macros(
-            [
-                {
-                    "protein": food_map[m.food_item_id].protein,
-                    "carbs": food_map[m.food_item_id].carbs,
-                    "fats": food_map[m.food_item_id].fats,
-                    "hidden_oil_estimate": food_map[m.food_item_id].hidden_oil_estimate,
-                    "servings": m.servings,
-                }
-                for m in meal_entries
-            ]
-        )
-        daily_log.total_protein = totals["protein"]
-        daily_log.total_carbs = totals["carbs"]
-        daily_log.total_fats = totals["fats"]
-        daily_log.total_hidden_oil = totals["hidden_oil"]
+        apply_meal_deltas(db, daily_log, contributions)
+        totals = {
+            "protein": round(daily_log.total_protein, 2),
+            "carbs": round(daily_log.total_carbs, 2),
+            "fats": round(daily_log.total_fats, 2),
+            "hidden_oil": round(daily_log.total_hidden_oil, 2),
+        }
 
         status = evaluate_daily_status(db, daily_log, profile)
         validations = {
@@ -246,6 +238,13 @@ class FoodImageService:
             "validations": validations,
         }
 
+    def _extract_and_cache(self, cache_key: str, image_bytes: bytes, meal_context: str | None) -> dict[str, Any]:
+        extracted = self._from_cache(cache_key)
+        if extracted is None:
+            extracted = self._extract_with_vision(image_bytes, meal_context)
+            self._save_cache(cache_key, extracted)
+        return extracted
+
     def _extract_with_vision(self, image_bytes: bytes, meal_context: str | None) -> dict[str, Any]:
         if not self.api_key:
             return EXAMPLE_ANALYSIS_JSON | {"reference_card": {"detected": False, "width_px": 0, "height_px": 0}}
@@ -267,22 +266,12 @@ class FoodImageService:
             "max_tokens": 900,
         }
 
-        http_request = request.Request(
-            url="https://api.openai.com/v1/chat/completions",
-            data=json.dumps(body).encode("utf-8"),
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}",
-            },
-            method="POST",
-        )
         try:
-            with request.urlopen(http_request, timeout=30) as response:
-                payload = json.loads(response.read().decode("utf-8"))
-        except (error.URLError, TimeoutError, json.JSONDecodeError):
+            payload = llm_gateway.chat_completion("vision", body, api_key=self.api_key)
+        except LLMGatewayError:
             return EXAMPLE_ANALYSIS_JSON | {"reference_card": {"detected": False, "width_px": 0, "height_px": 0}}
 
-        content = payload.get("choices", [{}])[0].get("message", {}).get("content", "")
+        content = message_content(payload)
         if not content:
             return EXAMPLE_ANALYSIS_JSON | {"reference_card": {"detected": False, "width_px": 0, "height_px": 0}}
         try:
@@ -146,5 +146,17 @@ class HabitIntelligenceEngine:
             "overall_success_rate": round((overall_successes / overall_total) if overall_total else 0, 3),
         }
 
+    def to_columnar(self, summary: dict) -> dict:
+        """Pivot the heatmap cells into parallel ``dates``/``intensity``/``count`` lists."""
+        cells = summary["heatmap"]
+        return {
+            **summary,
+            "heatmap": {
+                "dates": [cell["date"] for cell in cells],
+                "intensity": [cell["intensity"] for cell in cells],
+                "count": [cell["count"] for cell in cells],
+            },
+        }
+
 
 habit_intelligence_engine = HabitIntelligenceEngine()
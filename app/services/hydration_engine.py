@@ -1,4 +1,9 @@
-from app.models import DailyLog
+from sqlalchemy import Float, Numeric, case, cast, func
+from sqlalchemy.orm import Session
+
+from app.db.counters import increment
+from app.models import DailyLog, next_change_seq
+from app.services.live_events import queue_daily_totals
 
 HYDRATION_TARGET_MIN_ML = 2500
 HYDRATION_TARGET_MAX_ML = 3000
@@ -16,14 +21,30 @@ def hydration_status_message(water_ml: int) -> str:
     return "Discipline Active: keep hydrating toward target."
 
 
-def apply_hydration_update(daily_log: DailyLog, amount_ml: int):
-    daily_log.water_ml = int((daily_log.water_ml or 0) + amount_ml)
-    daily_log.hydration_score = hydration_score(daily_log.water_ml)
+def _hydration_score_expression(amount_ml: int):
+    """SQL mirror of ``hydration_score`` for the post-increment water total."""
+    water_ml = DailyLog.water_ml + amount_ml
+    score = case(
+        (water_ml >= HYDRATION_TARGET_MIN_ML, 100.0),
+        else_=func.round(cast(water_ml * 100.0 / HYDRATION_TARGET_MIN_ML, Numeric), 1),
+    )
+    return cast(score, Float)
+
+
+def apply_hydration_update(db: Session, daily_log: DailyLog, amount_ml: int):
+    updated = increment(
+        db,
+        daily_log,
+        {"water_ml": amount_ml},
+        {"hydration_score": _hydration_score_expression(amount_ml), "change_seq": next_change_seq(db, daily_log.user_id)},
+    )
+    queue_daily_totals(db, daily_log)
+    water_ml = int(updated["water_ml"])
     return {
-        "water_ml": daily_log.water_ml,
-        "hydration_score": daily_log.hydration_score,
+        "water_ml": water_ml,
+        "hydration_score": updated["hydration_score"],
         "hydration_target_min_ml": HYDRATION_TARGET_MIN_ML,
         "hydration_target_max_ml": HYDRATION_TARGET_MAX_ML,
-        "hydration_target_achieved": daily_log.water_ml >= HYDRATION_TARGET_MIN_ML,
-        "message": hydration_status_message(daily_log.water_ml),
+        "hydration_target_achieved": water_ml >= HYDRATION_TARGET_MIN_ML,
+        "message": hydration_status_message(water_ml),
     }
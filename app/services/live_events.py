@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import DailyLog, ExerciseEntry, InsulinScore, PendingRecommendation
+
+logger = logging.getLogger(__name__)
+
+REDIS_CHANNEL_PREFIX = "live_events:"
+LISTENER_RETRY_INITIAL_SECONDS = 0.5
+LISTENER_RETRY_MAX_SECONDS = 30.0
+_SESSION_KEY = "live_events"
+
+
+class LiveEventLimitError(Exception):
+    pass
+
+
+@dataclass
+class LiveEvent:
+    type: str
+    data: dict
+
+    def to_json(self) -> str:
+        return json.dumps({"type": self.type, "data": self.data}, default=str, separators=(",", ":"))
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One connected client: a bounded queue fed from any thread via the owning loop."""
+
+    bus: "LiveEventBus"
+    user_id: int
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=settings.live_events_queue_size))
+
+    def offer(self, live_event: LiveEvent) -> None:
+        # A client that stops reading loses its oldest events instead of growing memory.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(live_event)
+
+    async def next(self, timeout: float) -> LiveEvent | None:
+        """The next event, or ``None`` when ``timeout`` passes quietly (time for a heartbeat)."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class LiveEventBus:
+    """Per-user fan-out of change events to SSE and WebSocket clients.
+
+    Without ``live_events_redis_url`` events stay in-process, which covers a
+    single API worker. With it, publishers (API workers, Celery, schedulers)
+    publish to Redis and every API worker relays the channel to its own
+    subscribers, so an idle connection costs a queue and no thread or DB session.
+    """
+
+    def __init__(self, redis_url: str, max_connections: int, max_connections_per_user: int):
+        self.redis_url = redis_url
+        self.max_connections = max_connections
+        self.max_connections_per_user = max_connections_per_user
+        self._subscribers: dict[int, set[Subscription]] = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener: threading.Thread | None = None
+
+    @property
+    def connection_count(self) -> int:
+        return self._count
+
+    def subscribe(self, user_id: int) -> Subscription:
+        with self._lock:
+            if self._count >= self.max_connections:
+                raise LiveEventLimitError("Live update capacity reached; retry shortly")
+            if len(self._subscribers[user_id]) >= self.max_connections_per_user:
+                raise LiveEventLimitError("Too many live update connections for this user")
+            subscription = Subscription(bus=self, user_id=user_id, loop=asyncio.get_running_loop())
+            self._subscribers[user_id].add(subscription)
+            self._count += 1
+        if self.redis_url:
+            self._ensure_listener()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+            self._count -= 1
+
+    def publish(self, user_id: int, live_event: LiveEvent) -> None:
+        """Deliver an event from any thread; never raises into the caller's request."""
+        if self.redis_url:
+            try:
+                self._redis_client().publish(f"{REDIS_CHANNEL_PREFIX}{user_id}", live_event.to_json())
+                return
+            except Exception:
+                logger.warning("live event publish to redis failed; delivering locally only", exc_info=True)
+        self._dispatch(user_id, live_event)
+
+    def _dispatch(self, user_id: int, live_event: LiveEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, live_event)
+            except RuntimeError:
+                # The subscriber's loop has shut down; its stream cleanup will unsubscribe it.
+                pass
+
+    def _redis_client(self):
+        if self._redis is None:
+            import redis
+
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name="live-events-redis", daemon=True)
+            self._listener.start()
+
+    def _listen(self) -> None:
+        # Connected clients only ever hear from this thread, so a dropped Redis connection is
+        # retried with backoff rather than ending the relay.
+        delay = LISTENER_RETRY_INITIAL_SECONDS
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{REDIS_CHANNEL_PREFIX}*")
+                delay = LISTENER_RETRY_INITIAL_SECONDS
+                for message in pubsub.listen():
+                    self._relay(message)
+            except Exception:
+                logger.warning("live event listener lost redis; reconnecting in %.1fs", delay, exc_info=True)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(delay)
+            delay = min(delay * 2, LISTENER_RETRY_MAX_SECONDS)
+
+    def _relay(self, message: dict) -> None:
+        try:
+            channel = message["channel"].decode() if isinstance(message["channel"], bytes) else message["channel"]
+            payload = json.loads(message["data"])
+            self._dispatch(int(channel.removeprefix(REDIS_CHANNEL_PREFIX)), LiveEvent(payload["type"], payload["data"]))
+        except Exception:
+            logger.warning("dropping malformed live event from redis", exc_info=True)
+
+live_event_bus = LiveEventBus(
+    redis_url=settings.live_events_redis_url,
+    max_connections=settings.live_events_max_connections,
+    max_connections_per_user=settings.live_events_max_connections_per_user,
+)
+
+
+def queue_live_event(db: Session, user_id: int, event_type: str, data: dict, key: object = None) -> None:
+    """Publish once ``db`` commits; a later event with the same (user, type, key) replaces this one."""
+    db.info.setdefault(_SESSION_KEY, {})[(user_id, event_type, key)] = LiveEvent(event_type, data)
+
+
+def queue_daily_totals(db: Session, daily_log: DailyLog) -> None:
+    queue_live_event(
+        db,
+        daily_log.user_id,
+        "daily_totals",
+        {
+            "date": daily_log.log_date.isoformat(),
+            "total_protein": daily_log.total_protein,
+            "total_carbs": daily_log.total_carbs,
+            "total_fats": daily_log.total_fats,
+            "total_hidden_oil": daily_log.total_hidden_oil,
+            "water_ml": daily_log.water_ml,
+            "hydration_score": daily_log.hydration_score,
+        },
+        key=daily_log.log_date,
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _queue_inserted_events(session: Session, _flush_context) -> None:
+    """Turn newly inserted scores, movement alerts and recommendations into events."""
+    for instance in session.new:
+        if isinstance(instance, InsulinScore):
+            daily_log = session.get(DailyLog, instance.daily_log_id)
+            if daily_log is not None:
+                queue_live_event(
+                    session,
+                    daily_log.user_id,
+                    "insulin_score",
+                    {"date": daily_log.log_date.isoformat(), "score": instance.score},
+                    key=daily_log.log_date,
+                )
+        elif isinstance(instance, ExerciseEntry) and instance.activity_type == "movement_alert":
+            queue_live_event(
+                session,
+                instance.user_id,
+                "movement_alert",
+                {"alert_type": instance.movement_type, "at": instance.performed_at or datetime.utcnow()},
+                key=instance.id,
+            )
+        elif isinstance(instance, PendingRecommendation):
+            queue_live_event(
+                session,
+                instance.user_id,
+                "pending_recommendation",
+                {"id": instance.id, "title": instance.title, "summary": instance.summary},
+                key=instance.id,
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_events(session: Session) -> None:
+    for (user_id, _event_type, _key), live_event in session.info.pop(_SESSION_KEY, {}).items():
+        live_event_bus.publish(user_id, live_event)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted_events(session: Session, transaction) -> None:
+    # Runs after after_commit, so anything left here was rolled back or closed.
+    if transaction.parent is None:
+        session.info.pop(_SESSION_KEY, None)
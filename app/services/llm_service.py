@@ -1,16 +1,21 @@
 import json
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
 from datetime import datetime
 from threading import Lock
 from time import time
 from typing import Any
-from urllib import error, request
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.llm_gateway import LLMGatewayError, llm_gateway, message_content
+from app.core.monitoring import LLM_HEDGED_EXTRACTIONS
+from app.core.prompt_budget import compact_json
+from app.core.single_flight import single_flight
 from app.models import DailyLog, FoodItem, MetabolicProfile, User
 from app.services.insulin_engine import calculate_insulin_load_score
 from app.services.recipe_service import recipe_service
@@ -34,15 +39,15 @@ class LLMService:
         self.cache_ttl_seconds = cache_ttl_seconds
         self._cache: dict[str, CachedLLMResponse] = {}
         self._lock = Lock()
+        self._flight = single_flight("llm_analyze", timeout_seconds=llm_gateway.purposes["meal_text"].timeout_seconds)
+        self._pending_extractions: dict[str, Future] = {}
+        self._hedge_executor: ThreadPoolExecutor | None = None
 
     def analyze(self, db: Session, user: User, profile: MetabolicProfile, text: str, consumed_at: datetime) -> dict[str, Any]:
         cache_key = f"{user.id}:{consumed_at.date().isoformat()}:{text.strip().lower()}"
         extracted = self._from_cache(cache_key)
         if extracted is None:
-            extracted = self._extract_from_llm(text)
-            if extracted is None:
-                extracted = self._fallback_extract(db, text)
-            self._save_cache(cache_key, extracted)
+            extracted = self._flight.do(cache_key, lambda: self._extract_and_cache(db, cache_key, text))
 
         macro_totals = self._calculate_macro_totals(extracted)
         oil_delta = macro_totals["hidden_oil"]
@@ -98,6 +103,7 @@ class LLMService:
             "portion": extracted.get("portion", "unspecified"),
             "estimated_macros": extracted.get("estimated_macros", {"protein": 0.0, "carbs": 0.0, "fats": 0.0, "hidden_oil": 0.0}),
             "source": extracted.get("source", "llm"),
+            "provisional": extracted.get("provisional", False),
         }
 
     def _build_recommendation(
@@ -123,6 +129,69 @@ class LLMService:
             f"and {headroom_oil} tsp hidden oil for today.{recipe_line}"
         )
 
+    def _extract_and_cache(self, db: Session, cache_key: str, text: str) -> dict[str, Any]:
+        extracted = self._from_cache(cache_key)
+        if extracted is not None:
+            return extracted
+        if settings.llm_extraction_deadline_seconds > 0 and self.api_key:
+            return self._extract_hedged(db, cache_key, text, settings.llm_extraction_deadline_seconds)
+        extracted = self._extract_from_llm(text)
+        if extracted is None:
+            extracted = self._fallback_extract(db, text)
+        self._save_cache(cache_key, extracted)
+        return extracted
+
+    def _extract_hedged(self, db: Session, cache_key: str, text: str, deadline_seconds: float) -> dict[str, Any]:
+        """Race the LLM against catalog matching; past the deadline the local result goes out as provisional.
+
+        The LLM call keeps running after the deadline. When it lands, its answer
+        replaces the provisional one in the cache. Repeats of the same text wait
+        on that pending call instead of starting another.
+        """
+        started = time()
+        with self._lock:
+            pending = self._pending_extractions.get(cache_key)
+            started_call = pending is None
+            if started_call:
+                pending = self._get_hedge_executor().submit(self._extract_from_llm, text)
+                self._pending_extractions[cache_key] = pending
+        if started_call:
+            pending.add_done_callback(lambda future: self._finish_pending_extraction(cache_key, future))
+        fallback = self._fallback_extract(db, text)
+
+        try:
+            extracted = pending.result(timeout=max(0.0, deadline_seconds - (time() - started)))
+        except FutureTimeoutError:
+            LLM_HEDGED_EXTRACTIONS.labels(outcome="deadline").inc()
+            return fallback | {"provisional": True}
+        if extracted is None:
+            LLM_HEDGED_EXTRACTIONS.labels(outcome="llm_failed").inc()
+            self._save_cache(cache_key, fallback)
+            return fallback
+        LLM_HEDGED_EXTRACTIONS.labels(outcome="llm").inc()
+        return extracted
+
+    def _finish_pending_extraction(self, cache_key: str, future: Future) -> None:
+        # Cache first, so a repeat arriving in between finds the answer rather than starting a new call.
+        if not future.cancelled() and future.exception() is None and future.result() is not None:
+            self._save_cache(cache_key, future.result())
+        with self._lock:
+            self._pending_extractions.pop(cache_key, None)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._hedge_executor = self._hedge_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        # Called with self._lock held.
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=settings.llm_extraction_hedge_workers, thread_name_prefix="llm-hedge"
+            )
+        return self._hedge_executor
+
     def _from_cache(self, key: str) -> dict[str, Any] | None:
         with self._lock:
             cached = self._cache.get(key)
@@ -182,27 +251,12 @@ class LLMService:
             "max_tokens": settings.llm_max_tokens,
         }
 
-        http_request = request.Request(
-            url="https://api.openai.com/v1/chat/completions",
-            data=json.dumps(body).encode("utf-8"),
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}",
-            },
-            method="POST",
-        )
-
         try:
-            with request.urlopen(http_request, timeout=20) as response:
-                payload = json.loads(response.read().decode("utf-8"))
-        except (error.URLError, TimeoutError, json.JSONDecodeError):
+            payload = llm_gateway.chat_completion("meal_text", body, api_key=self.api_key)
+        except LLMGatewayError:
             return None
 
-        content = (
-            payload.get("choices", [{}])[0]
-            .get("message", {})
-            .get("content", "")
-        )
+        content = message_content(payload)
         if not content:
             return None
 
@@ -305,30 +359,18 @@ class LLMService:
                         "Keep it to 5-8 bullet points and include the title 'Metabolic Advisor Report'."
                     ),
                 },
-                {"role": "user", "content": json.dumps(prompt)},
+                {"role": "user", "content": compact_json(prompt, token_budget=settings.llm_summary_prompt_token_budget)},
             ],
             "temperature": 0.2,
             "max_tokens": settings.llm_max_tokens,
         }
 
-        http_request = request.Request(
-            url="https://api.openai.com/v1/chat/completions",
-            data=json.dumps(body).encode("utf-8"),
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}",
-            },
-            method="POST",
-        )
-
         try:
-            with request.urlopen(http_request, timeout=20) as response:
-                payload = json.loads(response.read().decode("utf-8"))
-        except (error.URLError, TimeoutError, json.JSONDecodeError):
+            payload = llm_gateway.chat_completion("summary", body, api_key=self.api_key)
+        except LLMGatewayError:
             return None
 
-        content = payload.get("choices", [{}])[0].get("message", {}).get("content", "")
-        return content.strip() or None
+        return message_content(payload).strip() or None
 
     def summarize_metabolic_agent_weekly_analysis(self, structured_payload: dict[str, Any]) -> str | None:
         if not self.api_key:
@@ -345,29 +387,17 @@ class LLMService:
                         "Only restate deterministic findings provided in JSON."
                     ),
                 },
-                {"role": "user", "content": json.dumps(structured_payload)},
+                {"role": "user", "content": compact_json(structured_payload, token_budget=settings.llm_summary_prompt_token_budget)},
             ],
             "temperature": 0.2,
         }
 
-        http_request = request.Request(
-            url="https://api.openai.com/v1/chat/completions",
-            data=json.dumps(body).encode("utf-8"),
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}",
-            },
-            method="POST",
-        )
-
         try:
-            with request.urlopen(http_request, timeout=20) as response:
-                payload = json.loads(response.read().decode("utf-8"))
-        except (error.URLError, TimeoutError, json.JSONDecodeError):
+            payload = llm_gateway.chat_completion("summary", body, api_key=self.api_key)
+        except LLMGatewayError:
             return None
 
-        content = payload.get("choices", [{}])[0].get("message", {}).get("content", "")
-        return content.strip() or None
+        return message_content(payload).strip() or None
 
     def _fallback_extract(self, db: Session, text: str) -> dict[str, Any]:
         lowered = text.lower()
@@ -0,0 +1,70 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from threading import Event, Lock, Thread
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import AuthLoginAttempt
+
+logger = logging.getLogger(__name__)
+
+
+class LoginAttemptBuffer:
+    """Collects ``AuthLoginAttempt`` rows and writes them in batched inserts.
+
+    A login flood would otherwise commit one row per failed attempt on the
+    request thread. Rows are kept per engine, so they land in the database of
+    the session that recorded them. They are written when ``batch_size`` rows
+    are pending, every ``flush_interval_seconds``, and on shutdown. Rows still
+    buffered when a process dies are lost; they are an audit trail, and lockout
+    state lives on the user row.
+    """
+
+    def __init__(self, batch_size: int, flush_interval_seconds: float):
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._rows: dict[Engine, list[dict]] = defaultdict(list)
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    def record(self, db: Session, *, email: str, ip_address: str, success: bool, user_id: int | None = None) -> None:
+        row = {"user_id": user_id, "email": email, "ip_address": ip_address, "success": success, "attempted_at": datetime.utcnow()}
+        with self._lock:
+            rows = self._rows[db.get_bind()]
+            rows.append(row)
+            full = len(rows) >= self.batch_size
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="login-attempt-flush", daemon=True)
+                self._thread.start()
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._rows = self._rows, defaultdict(list)
+        for engine, rows in pending.items():
+            try:
+                with Session(bind=engine) as session:
+                    session.execute(insert(AuthLoginAttempt), rows)
+                    session.commit()
+            except Exception:
+                logger.exception("dropped %s buffered login attempts", len(rows))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_seconds):
+            self.flush()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self.flush()
+
+
+login_attempt_buffer = LoginAttemptBuffer(
+    batch_size=settings.login_attempt_flush_batch_size,
+    flush_interval_seconds=settings.login_attempt_flush_interval_seconds,
+)
@@ -1,10 +1,12 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy import select
 
-from app.db.session import SessionLocal
+from app.db.session import get_sessionmaker
 from app.models import User
 from app.services.metabolic_advisor_service import metabolic_advisor_service
 
+SchedulerSessionLocal = get_sessionmaker("scheduler")
+
 
 class MetabolicAdvisorScheduler:
     def __init__(self):
@@ -12,7 +14,7 @@ class MetabolicAdvisorScheduler:
         self.started = False
 
     def _run_weekly(self):
-        db = SessionLocal()
+        db = SchedulerSessionLocal()
         try:
             users = db.scalars(select(User)).all()
             for user in users:
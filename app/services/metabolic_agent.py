@@ -5,6 +5,7 @@ from datetime import date, datetime, time, timedelta
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.db.upsert import get_or_create
 from app.models import (
     AgentRunCadence,
     DailyLog,
@@ -645,36 +646,32 @@ class MetabolicAgentService:
 
     @staticmethod
     def _get_or_create_profile(db: Session, user: User) -> MetabolicProfile:
-        profile = db.scalar(select(MetabolicProfile).where(MetabolicProfile.user_id == user.id))
-        if profile:
-            return profile
-        profile = MetabolicProfile(
-            user_id=user.id,
-            protein_target_min=user.protein_target_min,
-            protein_target_max=user.protein_target_max,
-            carb_ceiling=user.carb_ceiling,
-            oil_limit_tsp=user.oil_limit_tsp,
+        return get_or_create(
+            db,
+            MetabolicProfile,
+            {"user_id": user.id},
+            {
+                "protein_target_min": user.protein_target_min,
+                "protein_target_max": user.protein_target_max,
+                "carb_ceiling": user.carb_ceiling,
+                "oil_limit_tsp": user.oil_limit_tsp,
+            },
         )
-        db.add(profile)
-        db.flush()
-        return profile
 
     @staticmethod
     def _get_or_create_agent_state(db: Session, user: User) -> MetabolicAgentState:
-        state = db.get(MetabolicAgentState, user.id)
-        if state:
-            return state
-        state = MetabolicAgentState(
-            user_id=user.id,
-            carb_ceiling_current=user.carb_ceiling,
-            protein_target_current=user.protein_target_min,
-            fruit_allowance_current=1,
-            fruit_allowance_weekly=7,
-            notes="Initialized on first agent run.",
+        return get_or_create(
+            db,
+            MetabolicAgentState,
+            {"user_id": user.id},
+            {
+                "carb_ceiling_current": user.carb_ceiling,
+                "protein_target_current": user.protein_target_min,
+                "fruit_allowance_current": 1,
+                "fruit_allowance_weekly": 7,
+                "notes": "Initialized on first agent run.",
+            },
         )
-        db.add(state)
-        db.flush()
-        return state
 
 
 metabolic_agent_service = MetabolicAgentService()
@@ -1,17 +1,21 @@
-import asyncio
 import json
+import logging
 import re
-from dataclasses import dataclass
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from threading import Lock
 from time import time
 from typing import Any, Callable
-from urllib import error, request
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.llm_gateway import LLMSlot, llm_gateway, message_content
+from app.core.prompt_budget import compact_json, estimate_chat_tokens
+from app.core.single_flight import single_flight
+from app.db.counters import increment
 from app.models import (
     AIActionLog,
     AIConversation,
@@ -24,49 +28,140 @@ from app.models import (
     MetabolicProfile,
     User,
     VitalsEntry,
+    data_version,
 )
+from app.services.daily_totals import apply_meal_deltas, get_or_create_daily_log, meal_contribution
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_WINDOW_MESSAGES = 10
+
+# Shorter keys for the grounding JSON; still self-describing for the model.
+SNAPSHOT_KEY_ALIASES = {
+    "metabolic_profile": "profile",
+    "protein_target_min": "protein_min",
+    "protein_target_max": "protein_max",
+    "eating_window": "window",
+    "today_macros": "today",
+    "last_7_days_carb_intake": "carbs_7d",
+    "triglycerides": "tg",
+    "strength_index": "strength",
+    "movement_stats": "movement",
+    "steps_last_7_days": "steps_7d",
+}
 
 
 @dataclass
 class CachedSnapshot:
+    version: str
     data: dict[str, Any]
     expires_at: float
 
 
+@dataclass
+class CopilotTurn:
+    conversation_id: int
+    user_id: int
+    user_message: str
+    snapshot: dict[str, Any] | None = None
+    system_prompt: str = ""
+    messages: list[dict[str, str]] = field(default_factory=list)
+    safe_reply: str | None = None
+
+
+class StreamedStringField:
+    """Decodes one top-level string field of a JSON object as its text streams in.
+
+    Escape sequences split across chunks are held back until complete, so each
+    returned piece is exactly the characters ``json.loads`` would produce.
+    """
+
+    def __init__(self, name: str):
+        self._opening = re.compile(rf'"{re.escape(name)}"\s*:\s*"')
+        self._buffer = ""
+        self._position: int | None = None
+        self._closed = False
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        if self._closed:
+            return ""
+        if self._position is None:
+            match = self._opening.search(self._buffer)
+            if not match:
+                return ""
+            self._position = match.end()
+
+        buffer, index, decoded = self._buffer, self._position, []
+        while index < len(buffer):
+            char = buffer[index]
+            if char == '"':
+                self._closed = True
+                break
+            if char != "\\":
+                decoded.append(char)
+                index += 1
+                continue
+            length = 6 if buffer[index + 1 : index + 2] == "u" else 2
+            if length == 6 and 0xD800 <= int(buffer[index + 2 : index + 6] or "0", 16) < 0xDC00:
+                length = 12  # UTF-16 surrogate pair
+            if index + length > len(buffer):
+                break
+            decoded.append(json.loads(f'"{buffer[index : index + length]}"'))
+            index += length
+        self._position = index
+        return "".join(decoded)
+
+
 class MetabolicCopilotService:
-    def __init__(self, api_key: str | None, model: str, snapshot_ttl_seconds: int = 60):
+    def __init__(self, api_key: str | None, model: str, snapshot_ttl_seconds: int = 300, snapshot_redis_url: str = ""):
         self.api_key = api_key
         self.model = model
         self.snapshot_ttl_seconds = snapshot_ttl_seconds
+        self.snapshot_redis_url = snapshot_redis_url
         self._snapshot_cache: dict[int, CachedSnapshot] = {}
+        self._snapshot_flight = single_flight("copilot_snapshot")
         self._lock = Lock()
+        self._redis = None
+
+    def process_message(self, db: Session, user_id: int, user_message: str, conversation_id: int | None = None) -> dict[str, Any]:
+        turn = self.start_turn(db, user_id, user_message, conversation_id)
+        if turn.safe_reply is not None:
+            return {"conversation_id": turn.conversation_id, "assistant_message": turn.safe_reply, "actions_executed": []}
+        parsed = self._call_structured_llm(
+            system_prompt=turn.system_prompt, messages=turn.messages, user_message=turn.user_message
+        )
+        return self.complete_turn(db, turn, parsed)
 
-    async def process_message(self, db: Session, user_id: int, user_message: str, conversation_id: int | None = None) -> dict[str, Any]:
+    def start_turn(self, db: Session, user_id: int, user_message: str, conversation_id: int | None = None) -> CopilotTurn:
+        """Store the user's message and gather the grounding the LLM call needs."""
         clean_message = user_message.strip()[: settings.llm_max_input_chars]
         if not clean_message:
             raise ValueError("Message cannot be empty")
 
         conversation = self._get_or_create_conversation(db, user_id=user_id, conversation_id=conversation_id)
         db.add(AIMessage(conversation_id=conversation.id, role=AIMessageRole.USER, content=clean_message))
+        turn = CopilotTurn(conversation_id=conversation.id, user_id=user_id, user_message=clean_message)
 
         if self._contains_harmful_medical_request(clean_message):
-            safe = (
+            turn.safe_reply = (
                 "I can help with metabolic education, but I can’t provide harmful or unsafe medical guidance. "
                 "Please consult a licensed clinician for treatment-critical decisions."
             )
-            db.add(AIMessage(conversation_id=conversation.id, role=AIMessageRole.ASSISTANT, content=safe))
+            db.add(AIMessage(conversation_id=conversation.id, role=AIMessageRole.ASSISTANT, content=turn.safe_reply))
             db.flush()
-            return {
-                "conversation_id": conversation.id,
-                "assistant_message": safe,
-                "actions_executed": [],
-            }
+            return turn
 
-        snapshot = self._get_grounding_snapshot(db, user_id)
-        messages, summary = self._build_context(db, conversation.id)
-        system_prompt = self._build_system_prompt(snapshot=snapshot, summary=summary)
+        turn.snapshot = self._get_grounding_snapshot(db, user_id)
+        messages, summary = self._build_context(db, conversation)
+        turn.system_prompt, turn.messages = self._fit_prompt(turn.snapshot, summary, messages, clean_message)
+        db.flush()
+        return turn
 
-        parsed = await self._call_structured_llm(system_prompt=system_prompt, messages=messages, user_message=clean_message)
+    def complete_turn(self, db: Session, turn: CopilotTurn, parsed: dict[str, Any]) -> dict[str, Any]:
+        """Run the requested action and persist the assistant's reply."""
+        conversation = db.get(AIConversation, turn.conversation_id)
+        self._record_usage(db, conversation, parsed.pop("usage", None))
         assistant_message = parsed.get("assistant_message", "I could not generate a response.")
         actions_executed: list[dict[str, Any]] = []
 
@@ -74,10 +169,10 @@ class MetabolicCopilotService:
         if isinstance(action, dict) and action.get("action") == "log_meal":
             action_result = self._execute_log_meal_action(
                 db=db,
-                user_id=user_id,
+                user_id=turn.user_id,
                 conversation=conversation,
                 action=action,
-                snapshot=snapshot,
+                snapshot=turn.snapshot,
             )
             actions_executed.append(action_result)
             assistant_message = action_result["confirmation"]
@@ -93,6 +188,38 @@ class MetabolicCopilotService:
             "actions_executed": actions_executed,
         }
 
+    def stream_turn(self, turn: CopilotTurn, slot: LLMSlot | None = None) -> Iterator[tuple[str, Any]]:
+        """Yield ``("delta", text)`` as reply tokens arrive, then ``("parsed", result)`` for ``complete_turn``.
+
+        Holds no database session, so the caller can release its connection
+        for the seconds the model spends generating. ``slot`` is a copilot slot
+        the caller reserved up front.
+        """
+        if not self.api_key:
+            yield "parsed", {"assistant_message": "Copilot is currently unavailable. Please try again later.", "action": None}
+            return
+
+        payload = self._chat_payload(system_prompt=turn.system_prompt, messages=turn.messages, user_message=turn.user_message)
+        reply = StreamedStringField("assistant_message")
+        content: list[str] = []
+        usage = None
+        try:
+            for chunk in llm_gateway.stream_chat_completion("copilot", payload, api_key=self.api_key, slot=slot):
+                usage = chunk.get("usage") or usage
+                for choice in chunk.get("choices") or []:
+                    piece = (choice.get("delta") or {}).get("content") or ""
+                    content.append(piece)
+                    text = reply.feed(piece)
+                    if text:
+                        yield "delta", text
+        except TimeoutError:
+            yield "parsed", {"assistant_message": "Copilot timed out. Please retry.", "action": None, "usage": usage}
+            return
+        except Exception:
+            yield "parsed", {"assistant_message": "Copilot is temporarily unavailable. Please retry.", "action": None, "usage": usage}
+            return
+        yield "parsed", self._parse_structured_content("".join(content), usage)
+
     def _get_or_create_conversation(self, db: Session, *, user_id: int, conversation_id: int | None) -> AIConversation:
         if conversation_id:
             conversation = db.scalar(
@@ -107,37 +234,76 @@ class MetabolicCopilotService:
         db.flush()
         return conversation
 
-    def _build_context(self, db: Session, conversation_id: int) -> tuple[list[dict[str, str]], str]:
-        message_rows = db.scalars(
+    def _record_usage(self, db: Session, conversation: AIConversation, usage: dict[str, Any] | None) -> None:
+        if not usage:
+            return
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        total_tokens = int(usage.get("total_tokens") or prompt_tokens + completion_tokens)
+        cost = (
+            prompt_tokens * settings.llm_input_cost_per_1k_tokens + completion_tokens * settings.llm_output_cost_per_1k_tokens
+        ) / 1000
+        increment(db, conversation, {"total_tokens": total_tokens, "total_cost": cost})
+
+    def _build_context(self, db: Session, conversation: AIConversation) -> tuple[list[dict[str, str]], str]:
+        window = self._context_window(db, conversation.id)
+        self._fold_evicted_messages(db, conversation, window)
+        prompt_messages = [{"role": msg.role.value, "content": msg.content[:2000]} for msg in window]
+        return prompt_messages, (conversation.summary or "")[-2000:]
+
+    def _refresh_summary(self, db: Session, conversation: AIConversation) -> None:
+        self._fold_evicted_messages(db, conversation, self._context_window(db, conversation.id))
+
+    def _context_window(self, db: Session, conversation_id: int) -> list[AIMessage]:
+        rows = db.scalars(
             select(AIMessage)
             .where(AIMessage.conversation_id == conversation_id)
-            .order_by(AIMessage.created_at.asc(), AIMessage.id.asc())
+            .order_by(AIMessage.created_at.desc(), AIMessage.id.desc())
+            .limit(CONTEXT_WINDOW_MESSAGES)
         ).all()
-        summary = ""
-        if len(message_rows) > 10:
-            older = message_rows[:-10]
-            summary = " ".join(f"{m.role.value}: {m.content}" for m in older)[-2000:]
-            message_rows = message_rows[-10:]
+        return list(reversed(rows))
 
-        prompt_messages = [{"role": msg.role.value, "content": msg.content[:2000]} for msg in message_rows]
-        return prompt_messages, summary
+    def _fold_evicted_messages(self, db: Session, conversation: AIConversation, window: list[AIMessage]) -> None:
+        """Append messages that have left the window to the rolling summary.
 
-    def _refresh_summary(self, db: Session, conversation: AIConversation) -> None:
-        message_rows = db.scalars(
-            select(AIMessage)
-            .where(AIMessage.conversation_id == conversation.id)
-            .order_by(AIMessage.created_at.asc(), AIMessage.id.asc())
-        ).all()
-        if len(message_rows) <= 10:
+        ``summarized_through_id`` marks the last message already folded in, so
+        each turn reads only the one or two messages it pushed out. Conversations
+        summarized before the marker existed are rebuilt once.
+        """
+        if len(window) < CONTEXT_WINDOW_MESSAGES:
             return
-        older = message_rows[:-10]
-        conversation.summary = " ".join(f"{m.role.value}: {m.content}" for m in older)[-3000:]
+        query = select(AIMessage).where(AIMessage.conversation_id == conversation.id, AIMessage.id < window[0].id)
+        summary = ""
+        if conversation.summarized_through_id is not None:
+            query = query.where(AIMessage.id > conversation.summarized_through_id)
+            summary = conversation.summary or ""
+        evicted = db.scalars(query.order_by(AIMessage.id.asc())).all()
+        if not evicted:
+            return
+        folded = " ".join(f"{m.role.value}: {m.content}" for m in evicted)
+        conversation.summary = (f"{summary} {folded}" if summary else folded)[-3000:]
+        conversation.summarized_through_id = evicted[-1].id
 
     def _get_grounding_snapshot(self, db: Session, user_id: int) -> dict[str, Any]:
-        cached = self._from_cache(user_id)
-        if cached:
+        """The user's grounding data, recomputed only when their data version or the day changes.
+
+        The version is read before the queries run, so a write that lands in
+        between is at worst included early and never hidden behind a stale key.
+        The TTL bounds drift in the rolling seven-day movement window.
+        """
+        version = f"{date.today().isoformat()}:{data_version(db, user_id)}"
+        cached = self._from_cache(user_id, version)
+        if cached is not None:
             return cached
 
+        def build() -> dict[str, Any]:
+            snapshot = self._build_grounding_snapshot(db, user_id)
+            self._save_cache(user_id, version, snapshot)
+            return snapshot
+
+        return self._snapshot_flight.do(f"{user_id}:{version}", build)
+
+    def _build_grounding_snapshot(self, db: Session, user_id: int) -> dict[str, Any]:
         user = db.get(User, user_id)
         if not user:
             raise ValueError("User not found")
@@ -191,9 +357,31 @@ class MetabolicCopilotService:
                 "steps_last_7_days": int(movement or 0),
             },
         }
-        self._save_cache(user_id, snapshot)
         return snapshot
 
+    def _fit_prompt(
+        self, snapshot: dict[str, Any], summary: str, messages: list[dict[str, str]], user_message: str
+    ) -> tuple[str, list[dict[str, str]]]:
+        """Build the system prompt and trim history until the call fits the copilot token budget.
+
+        The older half of the summary goes first, then the oldest window
+        messages. The grounding data and the new message are always kept.
+        """
+        budget = settings.llm_copilot_prompt_token_budget
+        while True:
+            system_prompt = self._build_system_prompt(snapshot=snapshot, summary=summary)
+            prompt = [{"role": "system", "content": system_prompt}, *messages, {"role": "user", "content": user_message}]
+            if estimate_chat_tokens(prompt) <= budget:
+                return system_prompt, messages
+            if len(summary) > 200:
+                summary = summary[len(summary) // 2 :]
+            elif summary:
+                summary = ""
+            elif messages:
+                messages = messages[1:]
+            else:
+                return system_prompt, messages
+
     def _build_system_prompt(self, *, snapshot: dict[str, Any], summary: str) -> str:
         return (
             "You are Metabolic Copilot, a grounded metabolic assistant. Use only the provided JSON grounding data. "
@@ -201,10 +389,11 @@ class MetabolicCopilotService:
             "For harmful medical requests, provide safe disclaimer guidance only. "
             "If recommending, use sections: Current metabolic status, Impact analysis, Suggestion, Clear yes/no. "
             "If the user clearly states they consumed food, return an action block with action=log_meal, items, estimated_macros, confidence. "
-            f"Conversation summary: {summary or 'none'}. Grounding data: {json.dumps(snapshot)}"
+            f"Conversation summary: {summary or 'none'}. "
+            f"Grounding data: {compact_json(snapshot, token_budget=settings.llm_copilot_prompt_token_budget // 2, key_aliases=SNAPSHOT_KEY_ALIASES)}"
         )
 
-    async def _call_structured_llm(self, *, system_prompt: str, messages: list[dict[str, str]], user_message: str) -> dict[str, Any]:
+    def _chat_payload(self, *, system_prompt: str, messages: list[dict[str, str]], user_message: str) -> dict[str, Any]:
         schema = {
             "type": "object",
             "additionalProperties": False,
@@ -240,7 +429,7 @@ class MetabolicCopilotService:
             "required": ["assistant_message", "action"],
         }
 
-        payload = {
+        return {
             "model": self.model,
             "temperature": 0,
             "max_tokens": min(settings.llm_max_tokens, 500),
@@ -248,46 +437,40 @@ class MetabolicCopilotService:
                 "type": "json_schema",
                 "json_schema": {"name": "metabolic_copilot", "strict": True, "schema": schema},
             },
-            "messages": [{"role": "system", "content": system_prompt}, *messages[-10:], {"role": "user", "content": user_message}],
+            "messages": [{"role": "system", "content": system_prompt}, *messages[-CONTEXT_WINDOW_MESSAGES:], {"role": "user", "content": user_message}],
         }
 
+    def _call_structured_llm(self, *, system_prompt: str, messages: list[dict[str, str]], user_message: str) -> dict[str, Any]:
         if not self.api_key:
             return {"assistant_message": "Copilot is currently unavailable. Please try again later.", "action": None}
 
+        payload = self._chat_payload(system_prompt=system_prompt, messages=messages, user_message=user_message)
         try:
-            raw = await asyncio.wait_for(asyncio.to_thread(self._post_chat_completion, payload), timeout=20)
+            raw = self._post_chat_completion(payload)
         except TimeoutError:
             return {"assistant_message": "Copilot timed out. Please retry.", "action": None}
         except Exception:
             return {"assistant_message": "Copilot is temporarily unavailable. Please retry.", "action": None}
 
-        content = raw.get("choices", [{}])[0].get("message", {}).get("content", "")
+        # Tokens are billed even when the reply cannot be used, so usage rides along on every path.
+        return self._parse_structured_content(message_content(raw), raw.get("usage"))
+
+    def _parse_structured_content(self, content: str, usage: dict[str, Any] | None) -> dict[str, Any]:
         try:
             parsed = json.loads(content)
         except json.JSONDecodeError:
-            return {"assistant_message": "I could not parse a reliable response. Please rephrase.", "action": None}
+            return {"assistant_message": "I could not parse a reliable response. Please rephrase.", "action": None, "usage": usage}
 
         if not isinstance(parsed, dict):
-            return {"assistant_message": "I could not parse a reliable response. Please rephrase.", "action": None}
+            return {"assistant_message": "I could not parse a reliable response. Please rephrase.", "action": None, "usage": usage}
 
         parsed["assistant_message"] = str(parsed.get("assistant_message", "")).strip()[:3000]
+        parsed["usage"] = usage
         return parsed
 
     def _post_chat_completion(self, payload: dict[str, Any]) -> dict[str, Any]:
-        http_request = request.Request(
-            url="https://api.openai.com/v1/chat/completions",
-            data=json.dumps(payload).encode("utf-8"),
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}",
-            },
-            method="POST",
-        )
-        try:
-            with request.urlopen(http_request, timeout=20) as response:
-                return json.loads(response.read().decode("utf-8"))
-        except (error.URLError, json.JSONDecodeError) as exc:
-            raise RuntimeError("llm_call_failed") from exc
+        # LLMTimeoutError is a TimeoutError, so callers keep their timed-out message.
+        return llm_gateway.chat_completion("copilot", payload, api_key=self.api_key)
 
     def _execute_log_meal_action(
         self,
@@ -305,22 +488,13 @@ class MetabolicCopilotService:
 
         now = datetime.utcnow()
         today = now.date()
-        daily_log = db.scalar(select(DailyLog).where(DailyLog.user_id == user_id, DailyLog.log_date == today))
-        if not daily_log:
-            daily_log = DailyLog(user_id=user_id, log_date=today)
-            db.add(daily_log)
-            db.flush()
+        daily_log = get_or_create_daily_log(db, user_id, today)
 
         carbs = float(max(0.0, estimated.get("carbs", 0.0)))
         protein = float(max(0.0, estimated.get("protein", 0.0)))
         fats = float(max(0.0, estimated.get("fats", 0.0)))
         hidden_oil = float(max(0.0, estimated.get("hidden_oil", 0.0)))
 
-        daily_log.total_carbs += carbs
-        daily_log.total_protein += protein
-        daily_log.total_fats += fats
-        daily_log.total_hidden_oil += hidden_oil
-
         per_item = {
             "protein": protein / len(items),
             "carbs": carbs / len(items),
@@ -328,6 +502,7 @@ class MetabolicCopilotService:
             "hidden_oil": hidden_oil / len(items),
         }
 
+        contributions: list[dict[str, float]] = []
         for item in items:
             food = db.scalar(select(FoodItem).where(FoodItem.name == item))
             if not food:
@@ -349,6 +524,10 @@ class MetabolicCopilotService:
                 db.add(food)
                 db.flush()
             db.add(MealEntry(daily_log_id=daily_log.id, food_item_id=food.id, consumed_at=now, servings=1.0, manual_adjustment_flag=True))
+            contributions.append(meal_contribution(food, 1.0))
+
+        db.flush()
+        apply_meal_deltas(db, daily_log, contributions)
 
         outside_window = self._outside_eating_window(snapshot, now)
         payload = {
@@ -389,19 +568,52 @@ class MetabolicCopilotService:
         risky_terms = ("overdose", "self-harm", "stop insulin", "dangerous dose", "harm myself")
         return any(term in lowered for term in risky_terms)
 
-    def _from_cache(self, user_id: int) -> dict[str, Any] | None:
+    def _from_cache(self, user_id: int, version: str) -> dict[str, Any] | None:
         with self._lock:
             snapshot = self._snapshot_cache.get(user_id)
-            if not snapshot:
-                return None
-            if snapshot.expires_at <= time():
-                del self._snapshot_cache[user_id]
-                return None
-            return snapshot.data
-
-    def _save_cache(self, user_id: int, data: dict[str, Any]) -> None:
+            if snapshot and snapshot.version == version and snapshot.expires_at > time():
+                return snapshot.data
+        if not self.snapshot_redis_url:
+            return None
+        try:
+            cached = self._redis_client().get(self._redis_key(user_id, version))
+        except Exception:
+            logger.warning("copilot snapshot cache unavailable; reading from the database", exc_info=True)
+            return None
+        if cached is None:
+            return None
+        data = json.loads(cached)
+        self._remember(user_id, version, data)
+        return data
+
+    def _save_cache(self, user_id: int, version: str, data: dict[str, Any]) -> None:
+        self._remember(user_id, version, data)
+        if not self.snapshot_redis_url:
+            return
+        try:
+            self._redis_client().set(self._redis_key(user_id, version), json.dumps(data), ex=self.snapshot_ttl_seconds)
+        except Exception:
+            logger.warning("copilot snapshot for user %s not shared", user_id, exc_info=True)
+
+    def _remember(self, user_id: int, version: str, data: dict[str, Any]) -> None:
         with self._lock:
-            self._snapshot_cache[user_id] = CachedSnapshot(data=data, expires_at=time() + self.snapshot_ttl_seconds)
+            self._snapshot_cache[user_id] = CachedSnapshot(version=version, data=data, expires_at=time() + self.snapshot_ttl_seconds)
+
+    @staticmethod
+    def _redis_key(user_id: int, version: str) -> str:
+        return f"copilot_snapshot:{user_id}:{version}"
 
+    def _redis_client(self):
+        if self._redis is None:
+            import redis
 
-metabolic_copilot_service = MetabolicCopilotService(api_key=settings.openai_api_key, model=settings.openai_model)
+            self._redis = redis.Redis.from_url(self.snapshot_redis_url)
+        return self._redis
+
+
+metabolic_copilot_service = MetabolicCopilotService(
+    api_key=settings.openai_api_key,
+    model=settings.openai_model,
+    snapshot_ttl_seconds=settings.copilot_snapshot_ttl_seconds,
+    snapshot_redis_url=settings.copilot_snapshot_redis_url,
+)
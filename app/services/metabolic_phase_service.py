@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.db.upsert import get_or_create
 from app.models import (
     DailyLog,
     ExerciseCategory,
@@ -107,13 +108,7 @@ class MetabolicPhaseService:
         }
 
     def _get_or_create_state(self, db: Session, user_id: int) -> MetabolicAgentState:
-        state = db.get(MetabolicAgentState, user_id)
-        if state:
-            return state
-        state = MetabolicAgentState(user_id=user_id)
-        db.add(state)
-        db.flush()
-        return state
+        return get_or_create(db, MetabolicAgentState, {"user_id": user_id})
 
     def _evaluate_phase_transition(self, db: Session, user_id: int, current: MetabolicPhase) -> dict:
         today = datetime.utcnow().date()
@@ -295,7 +290,7 @@ class MetabolicPhaseService:
                 ExerciseEntry.performed_at < datetime.combine(end_day + timedelta(days=1), datetime.min.time()),
             )
         ).all()
-        return float(compute_strength_score(entries).strength_index)
+        return float(compute_strength_score(entries)["strength_index"])
 
     def _avg_rhr(self, db: Session, user_id: int, start_day, end_day) -> float | None:
         vitals = db.scalars(
@@ -8,6 +8,7 @@ from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
 from app.models import DailyLog, ExerciseCategory, ExerciseEntry, InsulinScore, MealEntry
+from app.services.daily_totals import get_or_create_daily_log
 from app.services.notification_service import notification_service
 
 Sensitivity = Literal["strict", "balanced", "relaxed"]
@@ -24,6 +25,7 @@ class MovementSettingsSnapshot:
 
 class MovementEngine:
     HIGH_INSULIN_THRESHOLD = 70
+    WALK_STREAK_WINDOW_DAYS = 60
 
     def get_settings(self, db: Session, user_id: int) -> MovementSettingsSnapshot:
         settings = notification_service.get_or_create_settings(db, user_id)
@@ -290,11 +292,7 @@ class MovementEngine:
         return {"step_surge": surge_delta, "post_meal_walk_bonus": bonus_applied}
 
     def _mark_post_meal_walk_bonus(self, db: Session, user_id: int, at_time: datetime, step_delta: int) -> None:
-        log = db.scalar(select(DailyLog).where(DailyLog.user_id == user_id, DailyLog.log_date == at_time.date()))
-        if not log:
-            log = DailyLog(user_id=user_id, log_date=at_time.date())
-            db.add(log)
-            db.flush()
+        log = get_or_create_daily_log(db, user_id, at_time.date())
         db.add(
             ExerciseEntry(
                 user_id=user_id,
@@ -325,56 +323,51 @@ class MovementEngine:
                 )
             )
 
-    def build_panel(self, db: Session, user_id: int) -> dict:
+    def build_panel(self, db: Session, user_id: int, entries: list[ExerciseEntry] | None = None) -> dict:
+        """Summarise today's movement and the post-meal walk streak.
+
+        The streak window is loaded in one query (or taken from ``entries``
+        when the caller already holds the user's exercise history) and
+        walked in memory.
+        """
         today = datetime.utcnow().date()
-        steps_today = int(
-            db.scalar(
-                select(func.max(ExerciseEntry.step_count)).where(
-                    ExerciseEntry.user_id == user_id,
-                    ExerciseEntry.activity_type == "apple_step_snapshot",
-                    ExerciseEntry.performed_at >= datetime.combine(today, time.min),
-                )
-            )
-            or 0
+        window_start = datetime.combine(today - timedelta(days=self.WALK_STREAK_WINDOW_DAYS - 1), time.min)
+        if entries is None:
+            entries = db.scalars(
+                select(ExerciseEntry).where(ExerciseEntry.user_id == user_id, ExerciseEntry.performed_at >= window_start)
+            ).all()
+
+        today_start = datetime.combine(today, time.min)
+        today_entries = [entry for entry in entries if entry.performed_at >= today_start]
+        steps_today = max(
+            (entry.step_count or 0 for entry in today_entries if entry.activity_type == "apple_step_snapshot"),
+            default=0,
         )
-        post_meal_walks_today = int(
-            db.scalar(
-                select(func.count(ExerciseEntry.id)).where(
-                    ExerciseEntry.user_id == user_id,
-                    ExerciseEntry.performed_at >= datetime.combine(today, time.min),
-                    ExerciseEntry.post_meal_walk.is_(True),
-                )
-            )
-            or 0
+        post_meal_walks_today = sum(1 for entry in today_entries if entry.post_meal_walk)
+        alerts_today = sum(
+            1 for entry in today_entries if entry.activity_type == "movement_alert" and entry.performed_at.date() == today
         )
 
-        streak = self._compute_post_meal_walk_streak(db, user_id=user_id, end_date=today)
+        walk_days = {entry.performed_at.date() for entry in entries if entry.post_meal_walk and entry.performed_at >= window_start}
+        streak = self._compute_post_meal_walk_streak(walk_days, end_date=today)
         badge = "Insulin Control Streak" if streak >= 5 else None
         recovery_prompt = "Resume today." if streak < 5 else "Keep your streak alive."
 
         return {
             "post_meal_walk_status": "done" if post_meal_walks_today > 0 else "pending",
-            "steps_today": steps_today,
+            "steps_today": int(steps_today),
             "walk_streak": streak,
             "recovery_prompt": recovery_prompt,
             "badge": badge,
-            "alerts_remaining": max(0, 3 - self._get_today_alert_count(db, user_id, today)),
+            "alerts_remaining": max(0, 3 - alerts_today),
             "post_meal_walk_bonus": post_meal_walks_today > 0,
         }
 
-    def _compute_post_meal_walk_streak(self, db: Session, user_id: int, end_date: date) -> int:
+    def _compute_post_meal_walk_streak(self, walk_days: set[date], end_date: date) -> int:
         streak = 0
         cursor = end_date
-        for _ in range(60):
-            walks = db.scalar(
-                select(func.count(ExerciseEntry.id)).where(
-                    ExerciseEntry.user_id == user_id,
-                    ExerciseEntry.performed_at >= datetime.combine(cursor, time.min),
-                    ExerciseEntry.performed_at <= datetime.combine(cursor, time.max),
-                    ExerciseEntry.post_meal_walk.is_(True),
-                )
-            )
-            if not walks:
+        for _ in range(self.WALK_STREAK_WINDOW_DAYS):
+            if cursor not in walk_days:
                 break
             streak += 1
             cursor -= timedelta(days=1)
@@ -1,22 +1,15 @@
 from datetime import datetime
 
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.db.upsert import get_or_create
 from app.models import DailyLog, NotificationSettings, User
 from app.services.push_service import push_service
 
 
 class NotificationService:
     def get_or_create_settings(self, db: Session, user_id: int) -> NotificationSettings:
-        settings = db.scalar(select(NotificationSettings).where(NotificationSettings.user_id == user_id))
-        if settings:
-            return settings
-
-        settings = NotificationSettings(user_id=user_id)
-        db.add(settings)
-        db.flush()
-        return settings
+        return get_or_create(db, NotificationSettings, {"user_id": user_id})
 
     def _within_quiet_hours(self, settings: NotificationSettings) -> bool:
         if not settings.quiet_hours_start or not settings.quiet_hours_end:
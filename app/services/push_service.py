@@ -7,11 +7,14 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models import PushSubscription
 
-try:
-    from pywebpush import WebPushException, webpush
-except Exception:  # pragma: no cover - dependency may be unavailable in some envs
-    WebPushException = Exception
-    webpush = None
+
+def _load_webpush():
+    # pywebpush pulls in cryptography and requests; only pay for that when a push is actually sent.
+    try:
+        from pywebpush import WebPushException, webpush
+    except Exception:  # pragma: no cover - dependency may be unavailable in some envs
+        return None, Exception
+    return webpush, WebPushException
 
 
 class PushService:
@@ -54,7 +57,10 @@ class PushService:
         if not rows:
             return {"status": "skipped", "reason": "no_subscription", "sent": 0}
 
-        if not webpush or not settings.vapid_private_key or not settings.vapid_public_key:
+        if not settings.vapid_private_key or not settings.vapid_public_key:
+            return {"status": "skipped", "reason": "webpush_not_configured", "sent": 0}
+        webpush, WebPushException = _load_webpush()
+        if not webpush:
             return {"status": "skipped", "reason": "webpush_not_configured", "sent": 0}
 
         sent = 0
@@ -1,22 +1,37 @@
+import hashlib
+import json
 from datetime import datetime
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.data.seed_data import RECIPES
 from app.models import DailyLog, MetabolicProfile, Recipe
 
+# Recipes are only ever written by the seed, so the catalog changes exactly when RECIPES does.
+RECIPE_CATALOG_VERSION = hashlib.sha256(json.dumps(RECIPES, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
 
 class RecipeService:
     def list_recipes(self, db: Session) -> list[Recipe]:
         return db.scalars(select(Recipe).order_by(Recipe.carbs.asc(), Recipe.name.asc())).all()
 
-    def suggest_recipes(self, db: Session, user_id: int, profile: MetabolicProfile, consumed_at: datetime | None = None) -> tuple[float, str, list[Recipe]]:
-        target_date = (consumed_at or datetime.utcnow()).date()
-        today_log = db.scalar(select(DailyLog).where(DailyLog.user_id == user_id, DailyLog.log_date == target_date))
-        current_carbs = today_log.total_carbs if today_log else 0.0
+    def suggest_recipes(
+        self,
+        db: Session,
+        user_id: int,
+        profile: MetabolicProfile,
+        consumed_at: datetime | None = None,
+        current_carbs: float | None = None,
+        recipes: list[Recipe] | None = None,
+    ) -> tuple[float, str, list[Recipe]]:
+        if current_carbs is None:
+            target_date = (consumed_at or datetime.utcnow()).date()
+            today_log = db.scalar(select(DailyLog).where(DailyLog.user_id == user_id, DailyLog.log_date == target_date))
+            current_carbs = today_log.total_carbs if today_log else 0.0
         carb_remaining = round(max(0.0, profile.carb_ceiling - current_carbs), 2)
 
-        all_recipes = self.list_recipes(db)
+        all_recipes = self.list_recipes(db) if recipes is None else recipes
         in_budget = [recipe for recipe in all_recipes if recipe.carbs <= carb_remaining]
         selected = (in_budget or all_recipes)[:3]
 
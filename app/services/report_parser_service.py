@@ -1,9 +1,9 @@
 import json
 from dataclasses import dataclass
 from typing import Any
-from urllib import error, request
 
 from app.core.config import settings
+from app.core.llm_gateway import LLMGatewayError, llm_gateway, message_content
 
 
 @dataclass
@@ -102,20 +102,15 @@ def parse_lab_report(text: str) -> StructuredReport:
         'max_tokens': 900,
     }
 
+    # Transport retries happen in the gateway; these attempts only re-ask after unusable output.
     for _ in range(3):
-        req = request.Request(
-            url='https://api.openai.com/v1/chat/completions',
-            data=json.dumps(body).encode('utf-8'),
-            headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {settings.openai_api_key}'},
-            method='POST',
-        )
         try:
-            with request.urlopen(req, timeout=30) as response:
-                payload = json.loads(response.read().decode('utf-8'))
-            content = payload.get('choices', [{}])[0].get('message', {}).get('content', '')
-            parsed = json.loads(content)
-            return _validate_payload(parsed)
-        except (error.URLError, TimeoutError, json.JSONDecodeError, ValueError):
+            payload = llm_gateway.chat_completion('lab_report', body, api_key=settings.openai_api_key)
+        except LLMGatewayError as exc:
+            raise ValueError('LLM unavailable for report parsing') from exc
+        try:
+            return _validate_payload(json.loads(message_content(payload)))
+        except (json.JSONDecodeError, ValueError):
             continue
 
     raise ValueError('Invalid LLM output for report parsing')
@@ -1,9 +1,10 @@
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
-from app.models import DailyLog, ExerciseEntry, MetabolicProfile, User, VitalsEntry
+from app.db.upsert import get_or_create
+from app.models import DailyLog, ExerciseEntry, MealEntry, MetabolicProfile, User, VitalsEntry
 from app.services.exercise_engine import calculate_post_meal_walk_bonus
 from app.services.insulin_engine import calculate_dinner_adjustment, calculate_insulin_load_score, classify_insulin_score
 from app.services.vitals_engine import calculate_vitals_risk_score
@@ -25,27 +26,24 @@ def calculate_daily_macros(meal_entries: list[dict]) -> dict[str, float]:
 
 
 def get_or_create_metabolic_profile(db: Session, user: User) -> MetabolicProfile:
-    profile = db.scalar(select(MetabolicProfile).where(MetabolicProfile.user_id == user.id))
-    if profile:
-        return profile
-
-    profile = MetabolicProfile(
-        user_id=user.id,
-        protein_target_min=90,
-        protein_target_max=110,
-        carb_ceiling=90,
-        oil_limit_tsp=3,
-        fasting_start_time="14:00",
-        fasting_end_time="08:00",
-        max_chapati_per_day=2,
-        allow_rice=False,
-        chocolate_limit_per_day=2,
-        insulin_score_green_threshold=40,
-        insulin_score_yellow_threshold=70,
+    return get_or_create(
+        db,
+        MetabolicProfile,
+        {"user_id": user.id},
+        {
+            "protein_target_min": 90,
+            "protein_target_max": 110,
+            "carb_ceiling": 90,
+            "oil_limit_tsp": 3,
+            "fasting_start_time": "14:00",
+            "fasting_end_time": "08:00",
+            "max_chapati_per_day": 2,
+            "allow_rice": False,
+            "chocolate_limit_per_day": 2,
+            "insulin_score_green_threshold": 40,
+            "insulin_score_yellow_threshold": 70,
+        },
     )
-    db.add(profile)
-    db.flush()
-    return profile
 
 
 def validate_fasting_window(consumed_at: datetime, fasting_start_time: str, fasting_end_time: str) -> bool:
@@ -73,24 +71,22 @@ def validate_protein_minimum(total_protein: float, protein_min: float) -> bool:
     return total_protein >= protein_min
 
 
-def calculate_insulin_load_reduction_bonus(daily_log: DailyLog, exercise_entries: list[ExerciseEntry]) -> float:
-    if not daily_log.meal_entries:
+def calculate_insulin_load_reduction_bonus(db: Session, daily_log: DailyLog, exercise_entries: list[ExerciseEntry]) -> float:
+    """1.25 per meal followed by exercise within an hour, counted in SQL rather than over every meal."""
+    windows = [MealEntry.consumed_at.between(exercise.performed_at - timedelta(hours=1), exercise.performed_at) for exercise in exercise_entries]
+    if not windows:
         return 0.0
 
-    bonus = 0.0
-    for meal in daily_log.meal_entries:
-        for exercise in exercise_entries:
-            delta_seconds = (exercise.performed_at - meal.consumed_at).total_seconds()
-            if 0 <= delta_seconds <= 3600:
-                bonus += 1.25
-                break
-    return bonus
+    matched_meals = db.scalar(
+        select(func.count(MealEntry.id)).where(MealEntry.daily_log_id == daily_log.id, or_(*windows))
+    )
+    return 1.25 * (matched_meals or 0)
 
 
 def evaluate_daily_status(db: Session, daily_log: DailyLog, profile: MetabolicProfile) -> dict:
     daily_exercises = db.scalars(select(ExerciseEntry).where(ExerciseEntry.daily_log_id == daily_log.id)).all()
     walk_bonus = calculate_post_meal_walk_bonus(daily_exercises)
-    insulin_load_reduction_bonus = calculate_insulin_load_reduction_bonus(daily_log, daily_exercises)
+    insulin_load_reduction_bonus = calculate_insulin_load_reduction_bonus(db, daily_log, daily_exercises)
     metabolic_bonus = walk_bonus + insulin_load_reduction_bonus
 
     dinner_adjustment = calculate_dinner_adjustment(
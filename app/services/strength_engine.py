@@ -27,17 +27,19 @@ def compute_strength_score(entries: list[ExerciseEntry]) -> dict[str, float | in
     pullups = sum(entry.pull_up_count or 0 for entry in entries)
     squats = _exercise_reps_total(entries, {"squats"})
     dead_hang_seconds = sum(entry.dead_hang_duration_seconds or 0 for entry in entries)
-
-    strength_index = round((pushups * 0.25) + (pullups * 2.0) + (dead_hang_seconds * 0.08) + (squats * 0.2), 2)
     return {
         "pushups": pushups,
         "pullups": pullups,
         "dead_hang_seconds": dead_hang_seconds,
         "squats": squats,
-        "strength_index": strength_index,
+        "strength_index": strength_index(pushups, pullups, dead_hang_seconds, squats),
     }
 
 
+def strength_index(pushups: int, pullups: int, dead_hang_seconds: int, squats: int) -> float:
+    return round((pushups * 0.25) + (pullups * 2.0) + (dead_hang_seconds * 0.08) + (squats * 0.2), 2)
+
+
 def compute_weekly_strength_graph(entries: list[ExerciseEntry], now: datetime | None = None) -> list[float]:
     ref = now or datetime.utcnow()
     series: list[float] = []
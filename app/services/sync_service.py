@@ -0,0 +1,357 @@
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.upsert import dialect_insert, insert_ignore
+from app.models import (
+    CHANGE_FEED_MODELS,
+    DailyLog,
+    ExerciseCategory,
+    ExerciseEntry,
+    FoodItem,
+    InsulinScore,
+    MealEntry,
+    MetabolicProfile,
+    SyncOperation,
+    SyncTombstone,
+    User,
+    UserChangeCounter,
+    VitalsEntry,
+    next_change_seq,
+)
+from app.schemas.schemas import (
+    SyncChangesResponse,
+    SyncDayResult,
+    SyncExerciseOperation,
+    SyncHydrationOperation,
+    SyncMealOperation,
+    SyncOperationPayload,
+    SyncOperationResult,
+    SyncTombstoneItem,
+    SyncVitalsOperation,
+)
+from app.services.daily_totals import apply_meal_deltas, meal_contribution, record_dinner
+from app.services.exercise_engine import is_supported_movement
+from app.services.hydration_engine import apply_hydration_update
+from app.services.movement_engine import movement_engine
+from app.services.notification_service import notification_service
+from app.services.rule_engine import evaluate_daily_status, get_or_create_metabolic_profile, validate_fasting_window
+from app.services.vitals_engine import apply_waist_coaching
+
+RESTRICTED_HIGH_TRIGLYCERIDE_FOODS = {"banana", "mango"}
+
+
+class SyncService:
+    """Replays a queue of offline operations in one transaction.
+
+    Operations are claimed in the idempotency table first, so a retried batch
+    only applies what was not applied before. Entries are inserted in bulk and
+    the daily evaluation, insulin score and alerts run once per touched day
+    rather than once per operation.
+    """
+
+    def apply_batch(self, db: Session, user: User, operations: list[SyncOperationPayload]) -> tuple[list[SyncOperationResult], list[SyncDayResult]]:
+        results: dict[str, SyncOperationResult] = {}
+        claimed_ids = self._claim(db, user.id, operations)
+
+        pending: list[SyncOperationPayload] = []
+        duplicate_ids: list[str] = []
+        for operation in operations:
+            op_id = str(operation.op_id)
+            if op_id in claimed_ids and op_id not in results:
+                results[op_id] = SyncOperationResult(op_id=operation.op_id, type=operation.type, status="applied")
+                pending.append(operation)
+            elif op_id not in results:
+                duplicate_ids.append(op_id)
+                results[op_id] = SyncOperationResult(op_id=operation.op_id, type=operation.type, status="duplicate")
+
+        if duplicate_ids:
+            for stored in db.scalars(
+                select(SyncOperation).where(SyncOperation.user_id == user.id, SyncOperation.client_op_id.in_(duplicate_ids))
+            ):
+                results[stored.client_op_id].entity_id = stored.entity_id
+                results[stored.client_op_id].detail = stored.detail
+
+        days = self._apply(db, user, pending, results) if pending else []
+
+        if pending:
+            db.execute(
+                update(SyncOperation),
+                [
+                    {
+                        "id": claimed_ids[str(operation.op_id)],
+                        "status": results[str(operation.op_id)].status,
+                        "entity_id": results[str(operation.op_id)].entity_id,
+                        "detail": results[str(operation.op_id)].detail,
+                    }
+                    for operation in pending
+                ],
+            )
+        return list(results.values()), days
+
+    def changes_since(self, db: Session, user_id: int, since: int) -> SyncChangesResponse:
+        """Rows stamped after ``since`` plus tombstones; ``since=0`` returns the full current state.
+
+        Pages advance by at most ``sync_changes_max_sequences`` sequence numbers,
+        so a client that was offline for months catches up in bounded steps.
+        """
+        latest = db.scalar(select(UserChangeCounter.last_seq).where(UserChangeCounter.user_id == user_id)) or 0
+        upper = latest if since == 0 else min(latest, since + settings.sync_changes_max_sequences)
+
+        changes: dict[str, list[dict]] = {}
+        for entity, model in CHANGE_FEED_MODELS.items():
+            statement = select(model)
+            if model is MealEntry:
+                statement = statement.join(DailyLog, DailyLog.id == MealEntry.daily_log_id).where(DailyLog.user_id == user_id)
+            else:
+                statement = statement.where(model.user_id == user_id)
+            if since:
+                statement = statement.where(model.change_seq > since, model.change_seq <= upper)
+            columns = inspect(model).column_attrs
+            changes[entity] = [{column.key: getattr(row, column.key) for column in columns} for row in db.scalars(statement.order_by(model.id))]
+
+        tombstones: list[SyncTombstoneItem] = []
+        if since:
+            tombstones = [
+                SyncTombstoneItem(entity=row.entity, entity_id=row.entity_id, change_seq=row.change_seq)
+                for row in db.scalars(
+                    select(SyncTombstone)
+                    .where(SyncTombstone.user_id == user_id, SyncTombstone.change_seq > since, SyncTombstone.change_seq <= upper)
+                    .order_by(SyncTombstone.change_seq, SyncTombstone.id)
+                )
+            ]
+        return SyncChangesResponse(cursor=upper, has_more=upper < latest, changes=changes, tombstones=tombstones)
+
+    def _claim(self, db: Session, user_id: int, operations: list[SyncOperationPayload]) -> dict[str, int]:
+        """Insert every op id that is new for this user and return them mapped to their row ids."""
+        now = datetime.utcnow()
+        rows = {
+            str(operation.op_id): {
+                "user_id": user_id,
+                "client_op_id": str(operation.op_id),
+                "op_type": operation.type,
+                "status": "pending",
+                "created_at": now,
+            }
+            for operation in operations
+        }
+        statement = (
+            dialect_insert(db, SyncOperation)
+            .values(list(rows.values()))
+            .on_conflict_do_nothing(index_elements=["user_id", "client_op_id"])
+            .returning(SyncOperation.id, SyncOperation.client_op_id)
+        )
+        return {client_op_id: row_id for row_id, client_op_id in db.execute(statement)}
+
+    def _apply(
+        self,
+        db: Session,
+        user: User,
+        operations: list[SyncOperationPayload],
+        results: dict[str, SyncOperationResult],
+    ) -> list[SyncDayResult]:
+        profile = get_or_create_metabolic_profile(db, user)
+        meals = [operation for operation in operations if isinstance(operation, SyncMealOperation)]
+        exercises = [operation for operation in operations if isinstance(operation, SyncExerciseOperation)]
+        hydrations = [operation for operation in operations if isinstance(operation, SyncHydrationOperation)]
+        vitals = [operation for operation in operations if isinstance(operation, SyncVitalsOperation)]
+
+        food_ids = {entry.food_item_id for operation in meals for entry in operation.data.entries}
+        food_map = {food.id: food for food in db.scalars(select(FoodItem).where(FoodItem.id.in_(list(food_ids))))} if food_ids else {}
+
+        meals = [operation for operation in meals if self._accept_meal(operation, user, profile, food_map, results)]
+        exercises = [operation for operation in exercises if self._accept_exercise(operation, results)]
+
+        now = datetime.utcnow()
+        touched_dates = {operation.data.consumed_at.date() for operation in meals}
+        touched_dates |= {(operation.data.performed_at or now).date() for operation in exercises}
+        touched_dates |= {operation.data.log_date or date.today() for operation in hydrations}
+        # Bulk inserts bypass the ORM flush hook, so the whole batch shares one explicit change sequence.
+        change_seq = next_change_seq(db, user.id)
+        daily_logs = self._daily_logs(db, user.id, touched_dates, change_seq)
+
+        meal_entries = self._add_meals(db, meals, daily_logs, food_map, change_seq)
+        exercise_entries = self._add_exercises(db, user.id, exercises, daily_logs, now, change_seq)
+        vitals_entries = self._add_vitals(db, user, profile, vitals, now, change_seq)
+
+        for operation, entry_id in [*exercise_entries, *vitals_entries]:
+            results[str(operation.op_id)].entity_id = entry_id
+        for operation in meals:
+            results[str(operation.op_id)].entity_id = daily_logs[operation.data.consumed_at.date()].id
+        for log_date, contributions in meal_entries.items():
+            apply_meal_deltas(db, daily_logs[log_date], contributions)
+
+        water_by_date: dict[date, int] = defaultdict(int)
+        for operation in hydrations:
+            log_date = operation.data.log_date or date.today()
+            water_by_date[log_date] += operation.data.amount_ml
+            results[str(operation.op_id)].entity_id = daily_logs[log_date].id
+        for log_date, amount_ml in water_by_date.items():
+            apply_hydration_update(db, daily_logs[log_date], amount_ml)
+
+        for operation in sorted((meal for meal in meals if meal.data.meal_context.lower().strip() == "dinner"), key=lambda meal: meal.data.consumed_at):
+            contributions = [meal_contribution(food_map[entry.food_item_id], entry.servings) for entry in operation.data.entries]
+            record_dinner(daily_logs[operation.data.consumed_at.date()], contributions, operation.data.consumed_at, operation.data.dinner_mode)
+        db.flush()
+
+        days: list[SyncDayResult] = []
+        for log_date in sorted(touched_dates):
+            daily_log = daily_logs[log_date]
+            status = evaluate_daily_status(db, daily_log, profile)
+            daily_log.dinner_insulin_impact = status.get("dinner_insulin_impact", 0.0)
+            daily_log.evening_insulin_spike_risk = status.get("evening_insulin_spike_risk", False)
+            db.add(InsulinScore(daily_log_id=daily_log.id, score=status["insulin_load_score"], raw_score=status["insulin_load_raw_score"]))
+            alerts = notification_service.evaluate_daily_alerts(db, user.id, daily_log, status["insulin_load_score"])
+            days.append(SyncDayResult(date=log_date, insulin_load_score=status["insulin_load_score"], alerts=len(alerts)))
+
+        activity_times = [operation.data.consumed_at for operation in meals]
+        activity_times += [operation.data.performed_at or now for operation in exercises]
+        if activity_times:
+            movement_engine.evaluate(db, user.id, now=max(activity_times))
+        return days
+
+    def _accept_meal(self, operation: SyncMealOperation, user: User, profile: MetabolicProfile, food_map: dict[int, FoodItem], results: dict[str, SyncOperationResult]) -> bool:
+        data = operation.data
+        detail = None
+        if not validate_fasting_window(data.consumed_at, profile.fasting_start_time, profile.fasting_end_time):
+            detail = "Meal is inside configured fasting window"
+        elif any(entry.food_item_id not in food_map for entry in data.entries):
+            detail = "One or more food items not found"
+        elif user.triglycerides > 300 and any(
+            food_map[entry.food_item_id].name.lower() in RESTRICTED_HIGH_TRIGLYCERIDE_FOODS for entry in data.entries
+        ):
+            detail = "Banana and mango are blocked during reset for high triglycerides."
+        return self._accept(operation, detail, results)
+
+    def _accept_exercise(self, operation: SyncExerciseOperation, results: dict[str, SyncOperationResult]) -> bool:
+        detail = None
+        if not is_supported_movement(operation.data.exercise_category, operation.data.movement_type):
+            detail = "Unsupported movement_type for category"
+        return self._accept(operation, detail, results)
+
+    @staticmethod
+    def _accept(operation: SyncOperationPayload, detail: str | None, results: dict[str, SyncOperationResult]) -> bool:
+        if detail is None:
+            return True
+        results[str(operation.op_id)].status = "rejected"
+        results[str(operation.op_id)].detail = detail
+        return False
+
+    @staticmethod
+    def _daily_logs(db: Session, user_id: int, log_dates: set[date], change_seq: int) -> dict[date, DailyLog]:
+        if not log_dates:
+            return {}
+        insert_ignore(
+            db,
+            DailyLog,
+            [{"user_id": user_id, "log_date": log_date, "change_seq": change_seq} for log_date in log_dates],
+            ["user_id", "log_date"],
+        )
+        return {
+            daily_log.log_date: daily_log
+            for daily_log in db.scalars(select(DailyLog).where(DailyLog.user_id == user_id, DailyLog.log_date.in_(list(log_dates))))
+        }
+
+    @staticmethod
+    def _add_meals(
+        db: Session,
+        meals: list[SyncMealOperation],
+        daily_logs: dict[date, DailyLog],
+        food_map: dict[int, FoodItem],
+        change_seq: int,
+    ) -> dict[date, list[dict[str, float]]]:
+        rows: list[dict] = []
+        contributions: dict[date, list[dict[str, float]]] = defaultdict(list)
+        for operation in meals:
+            log_date = operation.data.consumed_at.date()
+            for entry in operation.data.entries:
+                rows.append(
+                    {
+                        "daily_log_id": daily_logs[log_date].id,
+                        "food_item_id": entry.food_item_id,
+                        "servings": entry.servings,
+                        "consumed_at": operation.data.consumed_at,
+                        "change_seq": change_seq,
+                    }
+                )
+                contributions[log_date].append(meal_contribution(food_map[entry.food_item_id], entry.servings))
+        if rows:
+            db.execute(insert(MealEntry), rows, execution_options={"render_nulls": True})
+        return contributions
+
+    @staticmethod
+    def _add_exercises(
+        db: Session,
+        user_id: int,
+        exercises: list[SyncExerciseOperation],
+        daily_logs: dict[date, DailyLog],
+        now: datetime,
+        change_seq: int,
+    ) -> list[tuple[SyncExerciseOperation, int]]:
+        if not exercises:
+            return []
+        rows: list[dict] = []
+        for operation in exercises:
+            data = operation.data
+            performed_at = data.performed_at or now
+            should_apply_walk_bonus = data.exercise_category == ExerciseCategory.WALK and data.duration_minutes >= 15
+            rows.append(
+                {
+                    **data.model_dump(exclude={"user_id"}),
+                    "user_id": user_id,
+                    "daily_log_id": daily_logs[performed_at.date()].id,
+                    "post_meal_walk": data.post_meal_walk or should_apply_walk_bonus,
+                    "performed_at": performed_at,
+                    "change_seq": change_seq,
+                }
+            )
+        # Ordered RETURNING keeps ids aligned with operations; Postgres still batches it into one INSERT.
+        entry_ids = db.scalars(
+            insert(ExerciseEntry).returning(ExerciseEntry.id, sort_by_parameter_order=True),
+            rows,
+            execution_options={"render_nulls": True},
+        ).all()
+        return list(zip(exercises, entry_ids))
+
+    @staticmethod
+    def _add_vitals(
+        db: Session,
+        user: User,
+        profile: MetabolicProfile,
+        vitals: list[SyncVitalsOperation],
+        now: datetime,
+        change_seq: int,
+    ) -> list[tuple[SyncVitalsOperation, int]]:
+        if not vitals:
+            return []
+        prior_waist = db.scalar(
+            select(VitalsEntry.waist_cm)
+            .where(VitalsEntry.user_id == user.id, VitalsEntry.waist_cm.is_not(None))
+            .order_by(VitalsEntry.recorded_at.desc())
+            .limit(1)
+        )
+        rows = [
+            {
+                **operation.data.model_dump(exclude={"user_id"}),
+                "user_id": user.id,
+                "recorded_at": operation.data.recorded_at or now,
+                "change_seq": change_seq,
+            }
+            for operation in vitals
+        ]
+        entry_ids = db.scalars(
+            insert(VitalsEntry).returning(VitalsEntry.id, sort_by_parameter_order=True),
+            rows,
+            execution_options={"render_nulls": True},
+        ).all()
+
+        # Coach once on the batch's latest waist reading, not once per replayed entry.
+        latest = max((row for row in rows if row["waist_cm"] is not None), key=lambda row: row["recorded_at"], default=None)
+        apply_waist_coaching(user, profile, latest["waist_cm"] if latest else None, prior_waist)
+        return list(zip(vitals, entry_ids))
+
+
+sync_service = SyncService()
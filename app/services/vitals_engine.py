@@ -1,4 +1,4 @@
-from app.models import VitalsEntry
+from app.models import MetabolicProfile, User, VitalsEntry
 
 
 def calculate_vitals_risk_score(vitals_entries: list[VitalsEntry]) -> dict[str, bool | str]:
@@ -21,3 +21,28 @@ def calculate_vitals_risk_score(vitals_entries: list[VitalsEntry]) -> dict[str,
         "metabolic_stress_rising": rising,
         "flag": "Metabolic Stress Rising" if rising else "Normal",
     }
+
+
+def apply_waist_coaching(user: User, profile: MetabolicProfile, waist_cm: float | None, prior_waist: float | None) -> dict:
+    """Coach on the waist change and tighten the carb ceiling by 10g when it went up."""
+    message = "Waist unchanged. Stay consistent with your current plan."
+    waist_change_cm = 0.0
+    carb_ceiling_adjusted = False
+
+    if waist_cm is not None and prior_waist is not None:
+        waist_change_cm = round(waist_cm - prior_waist, 2)
+        if waist_change_cm < 0:
+            message = f"Great work — waist dropped by {abs(waist_change_cm):.2f} cm. Keep the momentum!"
+        elif waist_change_cm > 0:
+            old_ceiling = profile.carb_ceiling
+            profile.carb_ceiling = max(20, profile.carb_ceiling - 10)
+            user.carb_ceiling = profile.carb_ceiling
+            carb_ceiling_adjusted = profile.carb_ceiling != old_ceiling
+            message = f"Waist increased by {waist_change_cm:.2f} cm. Tightening carb ceiling to {profile.carb_ceiling}g for recovery."
+
+    return {
+        "message": message,
+        "waist_change_cm": waist_change_cm,
+        "carb_ceiling_adjusted": carb_ceiling_adjusted,
+        "carb_ceiling": profile.carb_ceiling,
+    }
@@ -25,6 +25,12 @@ PY
 
 echo "Running alembic migrations"
 alembic upgrade head
+python -m app.db.revision_check
+
+if [ -n "${PROMETHEUS_MULTIPROC_DIR:-}" ]; then
+  echo "Resetting Prometheus multiprocess directory"
+  python -c "from app.core.monitoring import clear_multiprocess_dir; clear_multiprocess_dir()"
+fi
 
 echo "Starting API server"
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-1}"
@@ -1,8 +1,8 @@
 'use client';
 
 import { useEffect, useMemo, useRef, useState } from 'react';
-import { Bot, Database, Send } from 'lucide-react';
-import { getCopilotConversation, sendCopilotMessage } from '@/lib/api';
+import { Bot, Database, History, Send } from 'lucide-react';
+import { getCopilotConversation, streamCopilotMessage, type CopilotConversationDetail } from '@/lib/api';
 
 type ChatMessage = {
   id: string;
@@ -17,36 +17,52 @@ export function CopilotView() {
   const [input, setInput] = useState('');
   const [sending, setSending] = useState(false);
   const [typingMessage, setTypingMessage] = useState<string | null>(null);
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const bottomRef = useRef<HTMLDivElement | null>(null);
+  // Prepending an older page should leave the reader where they were, not jump to the newest message.
+  const keepScrollRef = useRef(false);
+
+  const toChatMessages = (detail: CopilotConversationDetail, page: string): ChatMessage[] =>
+    detail.messages.map((msg, index) => ({
+      id: `${detail.id}-${page}-${index}`,
+      role: msg.role === 'assistant' ? 'assistant' : 'user',
+      content: msg.content,
+    }));
 
   useEffect(() => {
+    if (keepScrollRef.current) {
+      keepScrollRef.current = false;
+      return;
+    }
     bottomRef.current?.scrollIntoView({ behavior: 'smooth' });
   }, [messages, typingMessage]);
 
   useEffect(() => {
     if (!conversationId) return;
     void getCopilotConversation(conversationId).then((detail) => {
-      const loaded: ChatMessage[] = detail.messages.map((msg, index) => ({
-        id: `${conversationId}-${index}`,
-        role: msg.role === 'assistant' ? 'assistant' : 'user',
-        content: msg.content,
-      }));
-      setMessages(loaded);
+      setMessages(toChatMessages(detail, 'latest'));
+      setOlderCursor(detail.nextCursor);
     }).catch(() => undefined);
   }, [conversationId]);
 
-  const canSend = useMemo(() => input.trim().length > 0 && !sending, [input, sending]);
-
-  const runTypingAnimation = async (message: string, dbAction: boolean) => {
-    setTypingMessage('');
-    for (let i = 1; i <= message.length; i += 1) {
-      setTypingMessage(message.slice(0, i));
-      await new Promise((resolve) => setTimeout(resolve, 8));
+  const loadOlder = async () => {
+    if (!conversationId || !olderCursor || loadingOlder) return;
+    setLoadingOlder(true);
+    try {
+      const detail = await getCopilotConversation(conversationId, olderCursor);
+      keepScrollRef.current = true;
+      setMessages((prev) => [...toChatMessages(detail, olderCursor), ...prev]);
+      setOlderCursor(detail.nextCursor);
+    } catch {
+      // Keep the cursor so the button can retry.
+    } finally {
+      setLoadingOlder(false);
     }
-    setMessages((prev) => [...prev, { id: crypto.randomUUID(), role: 'assistant', content: message, dbAction }]);
-    setTypingMessage(null);
   };
 
+  const canSend = useMemo(() => input.trim().length > 0 && !sending, [input, sending]);
+
   const sendMessage = async () => {
     if (!canSend) return;
     const content = input.trim();
@@ -55,10 +71,16 @@ export function CopilotView() {
     setMessages((prev) => [...prev, { id: crypto.randomUUID(), role: 'user', content }]);
 
     try {
-      const response = await sendCopilotMessage({ message: content, conversation_id: conversationId });
+      let streamed = '';
+      setTypingMessage('');
+      const response = await streamCopilotMessage({ message: content, conversation_id: conversationId }, (text) => {
+        streamed += text;
+        setTypingMessage(streamed);
+      });
       setConversationId(response.conversation_id);
       const dbAction = response.actions_executed.some((action) => action.db_action);
-      await runTypingAnimation(response.assistant_message, dbAction);
+      setMessages((prev) => [...prev, { id: crypto.randomUUID(), role: 'assistant', content: response.assistant_message, dbAction }]);
+      setTypingMessage(null);
     } catch {
       setMessages((prev) => [...prev, { id: crypto.randomUUID(), role: 'assistant', content: 'Copilot is unavailable. Please retry.' }]);
       setTypingMessage(null);
@@ -75,6 +97,18 @@ export function CopilotView() {
       </header>
 
       <div className="flex-1 space-y-3 overflow-y-auto pr-1">
+        {olderCursor && (
+          <div className="flex justify-center">
+            <button
+              type="button"
+              onClick={() => void loadOlder()}
+              disabled={loadingOlder}
+              className="inline-flex items-center gap-1 rounded-full border border-white/15 px-3 py-1 text-[10px] uppercase tracking-[0.15em] text-slate-300 disabled:opacity-50"
+            >
+              <History size={11} /> {loadingOlder ? 'Loading…' : 'Load older messages'}
+            </button>
+          </div>
+        )}
         {messages.map((message) => (
           <div key={message.id} className={`flex ${message.role === 'user' ? 'justify-end' : 'justify-start'}`}>
             <div className={`max-w-[82%] rounded-2xl px-3 py-2 text-sm ${message.role === 'user' ? 'bg-electric/40 text-white' : 'bg-white/10 text-slate-100'}`}>
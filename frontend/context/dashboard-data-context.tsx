@@ -1,7 +1,7 @@
 'use client';
 
-import { createContext, useCallback, useContext, useEffect, useMemo, useState } from 'react';
-import { getDashboardData } from '@/lib/api';
+import { createContext, useCallback, useContext, useEffect, useMemo, useRef, useState } from 'react';
+import { getDashboardData, subscribeLiveEvents } from '@/lib/api';
 import { useAuth } from '@/context/auth-provider';
 
 type DashboardDataValue = {
@@ -32,6 +32,21 @@ export function DashboardDataProvider({ children }: { children: React.ReactNode
     void refreshDashboard();
   }, [refreshDashboard]);
 
+  // Server-pushed change events replace polling; a burst of events triggers one refresh.
+  const pendingRefresh = useRef<ReturnType<typeof setTimeout> | null>(null);
+  useEffect(() => {
+    if (!token || !user) return;
+    const controller = new AbortController();
+    void subscribeLiveEvents(() => {
+      if (pendingRefresh.current) clearTimeout(pendingRefresh.current);
+      pendingRefresh.current = setTimeout(() => void refreshDashboard(), 500);
+    }, controller.signal);
+    return () => {
+      controller.abort();
+      if (pendingRefresh.current) clearTimeout(pendingRefresh.current);
+    };
+  }, [token, user, refreshDashboard]);
+
   const value = useMemo(() => ({ data, loading, refreshDashboard }), [data, loading, refreshDashboard]);
 
   return <DashboardDataContext.Provider value={value}>{children}</DashboardDataContext.Provider>;
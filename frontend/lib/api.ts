@@ -217,6 +217,13 @@ export type CopilotConversation = {
 
 export type CopilotConversationDetail = CopilotConversation & {
   messages: Array<{ role: 'user' | 'assistant' | 'system' | string; content: string; created_at: string }>;
+  // Pass back as `cursor` for the page of older messages; null once the history is exhausted.
+  nextCursor: string | null;
+};
+
+export type CopilotConversationPage = {
+  conversations: CopilotConversation[];
+  nextCursor: string | null;
 };
 
 export type RecipeSuggestion = {
@@ -320,18 +327,65 @@ async function apiRequest(path: string, init: RequestInit = {}, retryOn401 = tru
   return response;
 }
 
+// Bodies of ETag-bearing GETs; polls revalidate with If-None-Match and reuse them on 304.
+const etagCache = new Map<string, { etag: string; body: unknown }>();
+
 async function readJson<T>(path: string): Promise<T | null> {
   try {
-    const response = await apiRequest(path);
+    const cached = etagCache.get(path);
+    const response = await apiRequest(path, cached ? { headers: { 'If-None-Match': cached.etag } } : {});
+    if (response.status === 304 && cached) {
+      return cached.body as T;
+    }
     if (!response.ok) {
       return null;
     }
-    return (await response.json()) as T;
+    const body = (await response.json()) as T;
+    const etag = response.headers.get('ETag');
+    if (etag) {
+      etagCache.set(path, { etag, body });
+    }
+    return body;
   } catch {
     return null;
   }
 }
 
+export type LiveEventType = 'daily_totals' | 'insulin_score' | 'movement_alert' | 'pending_recommendation';
+
+export type LiveEvent = { type: LiveEventType; data: Record<string, unknown> };
+
+// EventSource cannot send an Authorization header, so the stream is read with fetch.
+export async function subscribeLiveEvents(onEvent: (event: LiveEvent) => void, signal: AbortSignal): Promise<void> {
+  while (!signal.aborted) {
+    try {
+      const response = await apiRequest('/events/stream', { headers: { Accept: 'text/event-stream' }, signal });
+      if (response.ok && response.body) {
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = '';
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          let boundary = buffer.indexOf('\n\n');
+          while (boundary !== -1) {
+            const data = buffer
+              .slice(0, boundary)
+              .split('\n')
+              .find((line) => line.startsWith('data: '));
+            buffer = buffer.slice(boundary + 2);
+            if (data) onEvent(JSON.parse(data.slice(6)) as LiveEvent);
+            boundary = buffer.indexOf('\n\n');
+          }
+        }
+      }
+    } catch {
+      if (signal.aborted) return;
+    }
+    await new Promise((resolve) => setTimeout(resolve, 5000));
+  }
+}
+
 export async function refreshAccessToken(): Promise<boolean> {
   const response = await fetch(`${baseUrl}/auth/refresh`, {
     method: 'POST',
@@ -346,23 +400,40 @@ export async function refreshAccessToken(): Promise<boolean> {
   return true;
 }
 
+type DashboardBootstrap = {
+  user_id: number;
+  daily_summary?: DailySummary | null;
+  profile?: Profile | null;
+  vitals_summary?: VitalsSummary | null;
+  exercise_summary?: ExerciseSummary | null;
+  challenge?: Challenge | null;
+  monthly_challenge?: Challenge | null;
+  recipes?: Recipe[] | null;
+  recipe_suggestions?: RecipeSuggestion | null;
+  analytics?: AdvancedAnalytics | null;
+  habit_intelligence?: HabitIntelligence | null;
+  performance_view?: MetabolicPhasePerformance | null;
+  movement_panel?: MovementPanel | null;
+  notification_settings?: NotificationSettings | null;
+};
+
 export async function getDashboardData(userId: number) {
-  const [daily, profile, vitals, exercise, challenge, monthlyChallenge, recipes, recipeSuggestion, analytics, habitIntelligence, metabolicPerformance, movementPanel] = await Promise.all([
-    readJson<DailySummary>(`/daily-summary?user_id=${userId}`),
-    readJson<Profile>(`/profile?user_id=${userId}`),
-    readJson<VitalsSummary>(`/vitals-summary?user_id=${userId}`),
-    readJson<ExerciseSummary>(`/exercise-summary?user_id=${userId}`),
-    readJson<Challenge>(`/challenge?user_id=${userId}`),
-    readJson<Challenge>(`/challenge/monthly?user_id=${userId}`),
-    readJson<Recipe[]>('/recipes'),
-    readJson<RecipeSuggestion>(`/recipes/suggestions?user_id=${userId}`),
-    readJson<AdvancedAnalytics>(`/analytics/advanced?user_id=${userId}&days=30`),
-    readJson<HabitIntelligence>(`/habits/intelligence?user_id=${userId}&days=90`),
-    readJson<MetabolicPhasePerformance>(`/metabolic/performance-view?user_id=${userId}`),
-    readJson<MovementPanel>(`/movement/panel?user_id=${userId}`),
-  ]);
-
-  return { daily, profile, vitals, exercise, challenge, monthlyChallenge, recipes, recipeSuggestion, analytics, habitIntelligence, metabolicPerformance, movementPanel };
+  const bootstrap = await readJson<DashboardBootstrap>(`/dashboard/bootstrap?user_id=${userId}`);
+
+  return {
+    daily: bootstrap?.daily_summary ?? null,
+    profile: bootstrap?.profile ?? null,
+    vitals: bootstrap?.vitals_summary ?? null,
+    exercise: bootstrap?.exercise_summary ?? null,
+    challenge: bootstrap?.challenge ?? null,
+    monthlyChallenge: bootstrap?.monthly_challenge ?? null,
+    recipes: bootstrap?.recipes ?? null,
+    recipeSuggestion: bootstrap?.recipe_suggestions ?? null,
+    analytics: bootstrap?.analytics ?? null,
+    habitIntelligence: bootstrap?.habit_intelligence ?? null,
+    metabolicPerformance: bootstrap?.performance_view ?? null,
+    movementPanel: bootstrap?.movement_panel ?? null,
+  };
 }
 
 export async function getNotificationSettings() {
@@ -484,6 +555,7 @@ export async function logout() {
   const csrf = getCsrfTokenFromCookie();
   await fetch(`${baseUrl}/auth/logout`, { method: 'POST', credentials: 'include', headers: csrf ? { 'X-CSRF-Token': csrf } : undefined });
   setAccessToken(null);
+  etagCache.clear();
 }
 
 
@@ -551,14 +623,56 @@ export async function sendCopilotMessage(payload: { message: string; conversatio
   return response.json();
 }
 
-export async function getCopilotConversations(): Promise<CopilotConversation[]> {
-  const response = await apiRequest('/copilot/conversations');
+// Streams the reply as `delta` frames; the final `done` frame carries the persisted turn.
+export async function streamCopilotMessage(
+  payload: { message: string; conversation_id?: number | null },
+  onDelta: (text: string) => void,
+): Promise<CopilotMessageResponse> {
+  const response = await apiRequest('/copilot/message/stream', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(payload),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error('Failed to send copilot message');
+  }
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const lines = buffer.slice(0, boundary).split('\n');
+      buffer = buffer.slice(boundary + 2);
+      const event = lines.find((line) => line.startsWith('event: '))?.slice(7);
+      const data = lines.find((line) => line.startsWith('data: '))?.slice(6);
+      if (event && data) {
+        const body = JSON.parse(data);
+        if (event === 'delta') onDelta(body.text as string);
+        if (event === 'done') return body as CopilotMessageResponse;
+        if (event === 'error') throw new Error(body.detail as string);
+      }
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+  throw new Error('Copilot stream ended early');
+}
+
+// Copilot lists are keyset-paged: the server returns the next page's cursor in X-Next-Cursor.
+function withCursor(path: string, cursor?: string | null) {
+  return cursor ? `${path}?cursor=${encodeURIComponent(cursor)}` : path;
+}
+
+export async function getCopilotConversations(cursor?: string | null): Promise<CopilotConversationPage> {
+  const response = await apiRequest(withCursor('/copilot/conversations', cursor));
   if (!response.ok) throw new Error('Failed to load copilot conversations');
-  return response.json();
+  return { conversations: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') };
 }
 
-export async function getCopilotConversation(id: number): Promise<CopilotConversationDetail> {
-  const response = await apiRequest(`/copilot/conversations/${id}`);
+export async function getCopilotConversation(id: number, cursor?: string | null): Promise<CopilotConversationDetail> {
+  const response = await apiRequest(withCursor(`/copilot/conversations/${id}`, cursor));
   if (!response.ok) throw new Error('Failed to load copilot conversation');
-  return response.json();
+  return { ...(await response.json()), nextCursor: response.headers.get('X-Next-Cursor') };
 }
@@ -0,0 +1,35 @@
+ALTER TABLE daily_logs
+    ADD COLUMN IF NOT EXISTS fruit_servings FLOAT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS nut_servings FLOAT NOT NULL DEFAULT 0;
+
+-- Backfill the denormalized servings, then bring every stored total in line with its meal entries.
+UPDATE daily_logs AS dl
+SET
+    total_protein = agg.total_protein,
+    total_carbs = agg.total_carbs,
+    total_fats = agg.total_fats,
+    total_sugar = agg.total_sugar,
+    total_fiber = agg.total_fiber,
+    total_hdl_support = agg.total_hdl_support,
+    total_triglyceride_risk = agg.total_triglyceride_risk,
+    total_hidden_oil = agg.total_hidden_oil,
+    fruit_servings = agg.fruit_servings,
+    nut_servings = agg.nut_servings
+FROM (
+    SELECT
+        me.daily_log_id,
+        SUM(fi.protein * me.servings) AS total_protein,
+        SUM(fi.carbs * me.servings) AS total_carbs,
+        SUM(fi.fats * me.servings) AS total_fats,
+        SUM(COALESCE(fi.sugar, 0) * me.servings) AS total_sugar,
+        SUM(COALESCE(fi.fiber, 0) * me.servings) AS total_fiber,
+        SUM(COALESCE(fi.hdl_support_score, 0) * me.servings) AS total_hdl_support,
+        SUM(COALESCE(fi.triglyceride_risk_weight, 0) * me.servings) AS total_triglyceride_risk,
+        SUM(fi.hidden_oil_estimate * me.servings) AS total_hidden_oil,
+        SUM(CASE WHEN fi.food_group = 'fruit' THEN me.servings ELSE 0 END) AS fruit_servings,
+        SUM(CASE WHEN fi.food_group = 'nut' AND NOT COALESCE(fi.nut_seed_exception, FALSE) THEN me.servings ELSE 0 END) AS nut_servings
+    FROM meal_entries AS me
+    JOIN food_items AS fi ON fi.id = me.food_item_id
+    GROUP BY me.daily_log_id
+) AS agg
+WHERE agg.daily_log_id = dl.id;
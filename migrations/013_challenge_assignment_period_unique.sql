@@ -0,0 +1,10 @@
+-- One challenge per user, frequency and period; keep the earliest row if duplicates slipped in.
+DELETE FROM challenge_assignments AS dup
+USING challenge_assignments AS keep
+WHERE dup.user_id = keep.user_id
+  AND dup.frequency = keep.frequency
+  AND dup.period_start = keep.period_start
+  AND dup.id > keep.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_user_challenge_period
+    ON challenge_assignments (user_id, frequency, period_start);
@@ -0,0 +1,14 @@
+-- Client-generated operation ids already applied by /sync/batch, so offline replays are idempotent.
+CREATE TABLE IF NOT EXISTS sync_operations (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    client_op_id VARCHAR(36) NOT NULL,
+    op_type VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    entity_id INTEGER NULL,
+    detail VARCHAR(255) NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_sync_operation_user_client_op UNIQUE (user_id, client_op_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_sync_operations_user_id ON sync_operations (user_id);
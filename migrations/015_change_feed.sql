@@ -0,0 +1,32 @@
+-- Per-user change sequence behind /sync/changes. Rows written before this migration keep a NULL
+-- change_seq; they are still returned by a full sync (since=0).
+CREATE TABLE IF NOT EXISTS user_change_counters (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+    last_seq BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    entity VARCHAR(40) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    change_seq BIGINT NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS ix_sync_tombstones_user_change_seq ON sync_tombstones (user_id, change_seq);
+
+ALTER TABLE daily_logs ADD COLUMN IF NOT EXISTS change_seq BIGINT NULL;
+ALTER TABLE meal_entries ADD COLUMN IF NOT EXISTS change_seq BIGINT NULL;
+ALTER TABLE vitals_entries ADD COLUMN IF NOT EXISTS change_seq BIGINT NULL;
+ALTER TABLE exercise_entries ADD COLUMN IF NOT EXISTS change_seq BIGINT NULL;
+ALTER TABLE habit_checkins ADD COLUMN IF NOT EXISTS change_seq BIGINT NULL;
+ALTER TABLE metabolic_recommendation_logs ADD COLUMN IF NOT EXISTS change_seq BIGINT NULL;
+ALTER TABLE pending_recommendations ADD COLUMN IF NOT EXISTS change_seq BIGINT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_daily_logs_user_change_seq ON daily_logs (user_id, change_seq);
+CREATE INDEX IF NOT EXISTS ix_meal_entries_daily_log_change_seq ON meal_entries (daily_log_id, change_seq);
+CREATE INDEX IF NOT EXISTS ix_vitals_entries_user_change_seq ON vitals_entries (user_id, change_seq);
+CREATE INDEX IF NOT EXISTS ix_exercise_entries_user_change_seq ON exercise_entries (user_id, change_seq);
+CREATE INDEX IF NOT EXISTS ix_habit_checkins_user_change_seq ON habit_checkins (user_id, change_seq);
+CREATE INDEX IF NOT EXISTS ix_metabolic_recommendation_logs_user_change_seq ON metabolic_recommendation_logs (user_id, change_seq);
+CREATE INDEX IF NOT EXISTS ix_pending_recommendations_user_change_seq ON pending_recommendations (user_id, change_seq);
@@ -0,0 +1,36 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.admission import AdmissionController
+
+
+def test_cancelled_request_waits_for_the_guarded_route_to_finish():
+    controller = AdmissionController("cancel-test", max_concurrency=1, max_queue=0, retry_after_seconds=1)
+    release = threading.Event()
+    events: list[str] = []
+
+    @controller.guard
+    def route():
+        release.wait(5)
+        events.append("route returned")
+
+    async def disconnect_mid_route():
+        task = asyncio.create_task(route())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        assert not task.done()
+
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        events.append("request scope unwound")
+
+    try:
+        asyncio.run(disconnect_mid_route())
+    finally:
+        controller.shutdown()
+    assert events == ["route returned", "request scope unwound"]
+    assert controller.in_flight == 0
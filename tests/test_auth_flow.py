@@ -1,15 +1,23 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.api.routes import router
 from app.core.config import settings
-from app.core.security import CSRFMiddleware, InputSanitizationMiddleware, RateLimitMiddleware, RateLimitRule, SecurityHeadersMiddleware
+from app.core.security import (
+    CSRFMiddleware,
+    InputSanitizationMiddleware,
+    RateLimitMiddleware,
+    RateLimitRule,
+    SecurityHeadersMiddleware,
+    verify_password,
+)
 from app.db.base import Base
 from app.db.session import get_db
+from app.models import User
 
 
 def build_test_client() -> TestClient:
@@ -71,6 +79,17 @@ def test_register_login_refresh_http():
         settings.environment = prior_environment
 
 
+def test_passwords_are_hashed_as_typed():
+    client = build_test_client()
+    password = "Tom&Jerry<3 "
+
+    assert client.post("/auth/register", json={"email": "tom@example.com", "password": password}).status_code == 200
+    db = next(client.app.dependency_overrides[get_db]())
+    stored_hash = db.scalar(select(User.hashed_password).where(User.email == "tom@example.com"))
+    db.close()
+    assert verify_password(password, stored_hash)
+
+
 def test_refresh_without_cookie():
     client = build_test_client()
     response = client.post("/auth/refresh")
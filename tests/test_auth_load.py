@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.api.routes import login_rate_limiter
+from app.core.kdf_pool import kdf_pool
+from app.models import AuthLoginAttempt
+from app.services.login_attempts import login_attempt_buffer
+from test_copilot import auth_headers, build_test_client
+
+
+def _p99(latencies: list[float]) -> float:
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+def _timed_profile_reads(client, headers, count: int) -> list[float]:
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        assert client.get("/profile", headers=headers).status_code == 200
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def test_login_flood_is_shed_without_slowing_core_routes(tmp_path, monkeypatch):
+    kdf_pool.shutdown()
+    monkeypatch.setattr(kdf_pool, "max_workers", 1)
+    monkeypatch.setattr(kdf_pool, "max_queue", 2)
+    # Every flood request must reach the KDF pool; the per-IP and per-email pre-checks would stop most of them first.
+    monkeypatch.setattr(login_rate_limiter, "is_allowed", lambda *_args: True)
+
+    client, session_local = build_test_client(f"sqlite+pysqlite:///{tmp_path / 'auth-load.db'}")
+    headers = auth_headers(client)
+    baseline = _timed_profile_reads(client, headers, 30)
+
+    logins = []
+
+    def login():
+        logins.append(client.post("/auth/login", json={"email": "copilot@example.com", "password": "Password123"}))
+
+    flood = [threading.Thread(target=login) for _ in range(24)]
+    try:
+        for thread in flood:
+            thread.start()
+        time.sleep(0.1)
+        during = _timed_profile_reads(client, headers, 30)
+        for thread in flood:
+            thread.join()
+    finally:
+        kdf_pool.shutdown()
+
+    statuses = [response.status_code for response in logins]
+    assert set(statuses) == {200, 429}
+    assert all(response.headers["Retry-After"] for response in logins if response.status_code == 429)
+    assert _p99(during) < max(_p99(baseline) * 3, 0.25), (baseline, during)
+
+    login_attempt_buffer.flush()
+    with session_local() as db:
+        assert db.scalar(select(func.count(AuthLoginAttempt.id))) == statuses.count(200)
+
+
+def test_a_dead_kdf_worker_is_replaced(monkeypatch):
+    kdf_pool.shutdown()
+    monkeypatch.setattr(kdf_pool, "max_workers", 1)
+    try:
+        with pytest.raises(HTTPException) as refused:
+            kdf_pool._run(os._exit, 1)
+        assert refused.value.status_code == 503
+        assert refused.value.headers["Retry-After"]
+
+        assert kdf_pool.verify_password("Password123", kdf_pool.hash_password("Password123"))
+    finally:
+        kdf_pool.shutdown()
+    assert kdf_pool._in_flight == 0
@@ -0,0 +1,111 @@
+from datetime import datetime, time
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from app.data.seed_data import seed_initial_data
+from app.models import FoodItem, MealEntry
+from test_copilot import auth_headers, build_test_client
+
+VITALS = {"weight_kg": 80.0, "fasting_glucose": 95.0, "hba1c": 5.6, "triglycerides": 150.0, "hdl": 45.0}
+
+
+def _food_ids(session_local) -> dict[str, int]:
+    with session_local() as db:
+        seed_initial_data(db)
+        return {food.name: food.id for food in db.scalars(select(FoodItem))}
+
+
+def _changes(client, headers, since: int) -> dict:
+    response = client.get("/sync/changes", params={"since": since}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_changes_feed_returns_only_rows_written_after_the_cursor():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    foods = _food_ids(session_local)
+    consumed_at = datetime.combine(datetime.utcnow().date(), time(hour=10)).isoformat()
+
+    client.post("/log-food", json={"consumed_at": consumed_at, "entries": [{"food_item_id": foods["Dal"]}]}, headers=headers)
+    snapshot = _changes(client, headers, since=0)
+    assert len(snapshot["changes"]["daily_logs"]) == 1
+    assert len(snapshot["changes"]["meal_entries"]) == 1
+    assert snapshot["cursor"] > 0 and snapshot["has_more"] is False
+
+    client.post("/log-vitals", json=VITALS, headers=headers)
+    delta = _changes(client, headers, since=snapshot["cursor"])
+    assert len(delta["changes"]["vitals"]) == 1
+    assert delta["changes"]["meal_entries"] == []
+    assert delta["cursor"] > snapshot["cursor"]
+
+    unchanged = _changes(client, headers, since=delta["cursor"])
+    assert unchanged["cursor"] == delta["cursor"]
+    assert all(rows == [] for rows in unchanged["changes"].values())
+
+
+def test_bulk_sync_writes_and_counter_updates_are_stamped():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    foods = _food_ids(session_local)
+    cursor = _changes(client, headers, since=0)["cursor"]
+    consumed_at = datetime.combine(datetime.utcnow().date(), time(hour=10)).isoformat()
+
+    client.post(
+        "/sync/batch",
+        json={
+            "operations": [
+                {"op_id": str(uuid4()), "type": "meal", "data": {"consumed_at": consumed_at, "entries": [{"food_item_id": foods["Dal"]}]}},
+                {"op_id": str(uuid4()), "type": "vitals", "data": VITALS},
+            ]
+        },
+        headers=headers,
+    )
+    delta = _changes(client, headers, since=cursor)
+    assert len(delta["changes"]["meal_entries"]) == 1
+    assert len(delta["changes"]["vitals"]) == 1
+    assert len(delta["changes"]["daily_logs"]) == 1
+
+    client.post("/hydration/log", json={"amount_ml": 300}, headers=headers)
+    after_water = _changes(client, headers, since=delta["cursor"])
+    assert [row["water_ml"] for row in after_water["changes"]["daily_logs"]] == [300]
+    assert after_water["changes"]["meal_entries"] == []
+
+
+def test_deleted_rows_leave_tombstones():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    foods = _food_ids(session_local)
+    consumed_at = datetime.combine(datetime.utcnow().date(), time(hour=10)).isoformat()
+    client.post("/log-food", json={"consumed_at": consumed_at, "entries": [{"food_item_id": foods["Dal"]}]}, headers=headers)
+    cursor = _changes(client, headers, since=0)["cursor"]
+
+    with session_local() as db:
+        entry = db.scalar(select(MealEntry))
+        entry_id = entry.id
+        db.delete(entry)
+        db.commit()
+
+    delta = _changes(client, headers, since=cursor)
+    assert [(item["entity"], item["entity_id"]) for item in delta["tombstones"]] == [("meal_entries", entry_id)]
+
+
+def test_daily_log_created_by_exercise_is_in_the_delta():
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+    cursor = _changes(client, headers, since=0)["cursor"]
+    client.post("/log-vitals", json=VITALS, headers=headers)
+    cursor = _changes(client, headers, since=cursor)["cursor"]
+    assert cursor > 0
+
+    response = client.post(
+        "/log-exercise",
+        json={"user_id": 1, "activity_type": "walk", "performed_at": "2026-03-01T08:00:00", "duration_minutes": 20},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    delta = _changes(client, headers, since=cursor)
+    assert len(delta["changes"]["exercise"]) == 1
+    assert [row["log_date"] for row in delta["changes"]["daily_logs"]] == ["2026-03-01"]
+    assert delta["cursor"] > cursor
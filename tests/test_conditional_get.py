@@ -0,0 +1,80 @@
+from sqlalchemy import event
+
+from test_copilot import auth_headers, build_test_client
+
+CONDITIONAL_ENDPOINTS = (
+    "/profile",
+    "/recipes",
+    "/habits/intelligence",
+    "/metabolic/performance-view",
+    "/challenge",
+    "/challenge/monthly",
+    "/dashboard/bootstrap",
+)
+
+
+def _get_recording_statements(client, session_local, url, headers):
+    engine = session_local.kw["bind"]
+    statements: list[str] = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return response, statements
+
+
+def test_unchanged_data_returns_304_without_domain_queries():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+
+    for url in CONDITIONAL_ENDPOINTS:
+        first = client.get(url, headers=headers)
+        assert first.status_code == 200, url
+        etag = first.headers["etag"]
+
+        response, statements = _get_recording_statements(client, session_local, url, {**headers, "If-None-Match": etag})
+
+        assert response.status_code == 304, url
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        # Only the version lookup runs; recipes need no query at all.
+        assert all("user_change_counters" in statement for statement in statements), (url, statements)
+        assert len(statements) <= 1
+
+
+def test_relevant_writes_invalidate_the_etag():
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+    profile_etag = client.get("/profile", headers=headers).headers["etag"]
+    bootstrap_etag = client.get("/dashboard/bootstrap", headers=headers).headers["etag"]
+
+    client.put("/profile", json={"carb_ceiling": 80}, headers=headers)
+
+    refreshed = client.get("/profile", headers={**headers, "If-None-Match": profile_etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["carb_ceiling"] == 80
+    assert refreshed.headers["etag"] != profile_etag
+    assert client.get("/profile", headers={**headers, "If-None-Match": refreshed.headers["etag"]}).status_code == 304
+
+    client.post(
+        "/log-vitals",
+        json={"weight_kg": 80.0, "fasting_glucose": 95.0, "hba1c": 5.6, "triglycerides": 150.0, "hdl": 45.0},
+        headers=headers,
+    )
+    assert client.get("/dashboard/bootstrap", headers={**headers, "If-None-Match": bootstrap_etag}).status_code == 200
+
+
+def test_etag_varies_with_query_parameters():
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+    etag = client.get("/habits/intelligence", params={"days": 30}, headers=headers).headers["etag"]
+
+    other = client.get("/habits/intelligence", params={"days": 60}, headers={**headers, "If-None-Match": etag})
+
+    assert other.status_code == 200
+    assert other.headers["etag"] != etag
@@ -1,32 +1,44 @@
+import json
+import threading
+import time
 from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, select
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.api.routes import register_rate_limiter
+from app.core.admission import llm_admission
+from app.core.compression import StreamAwareGZipMiddleware
 from app.core.config import settings
 from app.core.security import CSRFMiddleware, InputSanitizationMiddleware, RateLimitMiddleware, RateLimitRule, SecurityHeadersMiddleware
 from app.db.base import Base
 from app.db.session import get_db
 from app.models import AIActionLog, DailyLog
 from app.routers import router
+from app.services.llm_service import llm_service
 from app.services.metabolic_copilot_service import metabolic_copilot_service
 
 
-def build_test_client() -> tuple[TestClient, sessionmaker]:
-    engine = create_engine(
-        "sqlite+pysqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        future=True,
-    )
+def build_test_client(database_url: str | None = None) -> tuple[TestClient, sessionmaker]:
+    if database_url:
+        engine = create_engine(database_url, connect_args={"check_same_thread": False}, future=True)
+    else:
+        engine = create_engine(
+            "sqlite+pysqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+            future=True,
+        )
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base.metadata.create_all(bind=engine)
 
-    app = FastAPI()
+    app = FastAPI(default_response_class=ORJSONResponse)
     allow_origins = [origin.strip() for origin in settings.cors_allowed_origins.split(",") if origin.strip()]
     app.add_middleware(
         CORSMiddleware,
@@ -34,7 +46,9 @@ def build_test_client() -> tuple[TestClient, sessionmaker]:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor"],
     )
+    app.add_middleware(StreamAwareGZipMiddleware, minimum_size=settings.gzip_minimum_size_bytes)
     app.add_middleware(SecurityHeadersMiddleware)
     app.add_middleware(CSRFMiddleware)
     app.add_middleware(InputSanitizationMiddleware)
@@ -52,6 +66,8 @@ def build_test_client() -> tuple[TestClient, sessionmaker]:
 
     app.dependency_overrides[get_db] = override_get_db
     app.include_router(router)
+    # Every client gets a fresh database, so registrations from earlier tests should not count against it.
+    register_rate_limiter._events.clear()
     return TestClient(app), SessionLocal
 
 
@@ -64,7 +80,7 @@ def auth_headers(client: TestClient) -> dict[str, str]:
 def with_fake_llm(fn: Callable[[], None]) -> None:
     original = metabolic_copilot_service._call_structured_llm
 
-    async def fake_llm(**_kwargs):
+    def fake_llm(**_kwargs):
         return {
             "assistant_message": "Logged your meal.",
             "action": {
@@ -149,3 +165,105 @@ def test_token_limit_enforced_for_daily_usage():
         assert response.status_code == 429
     finally:
         settings.llm_requests_per_day = prior_limit
+
+
+def test_slow_copilot_turn_does_not_block_other_requests(tmp_path):
+    client, _session_local = build_test_client(f"sqlite+pysqlite:///{tmp_path / 'load.db'}")
+    headers = auth_headers(client)
+    original = metabolic_copilot_service._call_structured_llm
+
+    def slow_llm(**_kwargs):
+        time.sleep(1.5)
+        return {"assistant_message": "Slow answer.", "action": None}
+
+    metabolic_copilot_service._call_structured_llm = slow_llm
+    try:
+        copilot_status: list[int] = []
+        copilot_thread = threading.Thread(
+            target=lambda: copilot_status.append(
+                client.post("/copilot/message", json={"message": "Long question"}, headers=headers).status_code
+            )
+        )
+        copilot_thread.start()
+        time.sleep(0.2)
+
+        latencies: list[float] = []
+
+        def timed_get():
+            started = time.perf_counter()
+            response = client.get("/copilot/conversations", headers=headers)
+            assert response.status_code == 200
+            latencies.append(time.perf_counter() - started)
+
+        readers = [threading.Thread(target=timed_get) for _ in range(5)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        copilot_thread.join()
+    finally:
+        metabolic_copilot_service._call_structured_llm = original
+
+    assert copilot_status == [200]
+    assert len(latencies) == 5
+    assert max(latencies) < 1.0
+
+
+class _SlowChatCompletionHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(1.0)
+        body = json.dumps({"choices": [{"message": {"content": "{}"}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+def test_llm_saturation_sheds_load_without_slowing_core_routes(tmp_path, monkeypatch):
+    fake_llm = ThreadingHTTPServer(("127.0.0.1", 0), _SlowChatCompletionHandler)
+    threading.Thread(target=fake_llm.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "openai_api_base_url", f"http://127.0.0.1:{fake_llm.server_address[1]}/v1")
+    monkeypatch.setattr(llm_service, "api_key", "test-key")
+    monkeypatch.setattr(llm_admission, "max_concurrency", 2)
+    monkeypatch.setattr(llm_admission, "max_queue", 1)
+    monkeypatch.setattr(llm_admission, "_executor", None)
+
+    client, _session_local = build_test_client(f"sqlite+pysqlite:///{tmp_path / 'admission.db'}")
+    headers = auth_headers(client)
+    assert client.get("/profile", headers=headers).status_code == 200
+    assert client.get("/notification-settings", headers=headers).status_code == 200
+
+    llm_responses = []
+
+    def send_whatsapp(index: int):
+        llm_responses.append(
+            client.post("/whatsapp-message", json={"user_id": 1, "text": f"ate dal bowl {index}"}, headers=headers)
+        )
+
+    try:
+        senders = [threading.Thread(target=send_whatsapp, args=(index,)) for index in range(6)]
+        for sender in senders:
+            sender.start()
+        time.sleep(0.3)
+
+        latencies: list[float] = []
+        for _ in range(5):
+            started = time.perf_counter()
+            assert client.get("/copilot/conversations", headers=headers).status_code == 200
+            latencies.append(time.perf_counter() - started)
+
+        for sender in senders:
+            sender.join()
+    finally:
+        llm_admission.shutdown()
+        fake_llm.shutdown()
+
+    statuses = sorted(response.status_code for response in llm_responses)
+    assert statuses == [200, 200, 200, 503, 503, 503]
+    assert all(int(response.headers["Retry-After"]) >= 1 for response in llm_responses if response.status_code == 503)
+    assert max(latencies) < 0.5
@@ -0,0 +1,128 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from app.data.seed_data import seed_initial_data
+from app.models import AIConversation, AIMessage, AIMessageRole, FoodItem
+from app.services.metabolic_copilot_service import CONTEXT_WINDOW_MESSAGES, metabolic_copilot_service
+from test_copilot import auth_headers, build_test_client
+
+
+def _seed_conversation(session_local, message_count: int) -> int:
+    started = datetime.utcnow() - timedelta(days=30)
+    with session_local() as db:
+        conversation = AIConversation(user_id=1, title="seeded")
+        db.add(conversation)
+        db.flush()
+        db.execute(
+            insert(AIMessage),
+            [
+                {
+                    "conversation_id": conversation.id,
+                    "role": AIMessageRole.USER if index % 2 == 0 else AIMessageRole.ASSISTANT,
+                    "content": f"message {index} about lunch",
+                    "created_at": started + timedelta(seconds=index),
+                }
+                for index in range(message_count)
+            ],
+        )
+        db.commit()
+        return conversation.id
+
+
+def _turn_seconds(session_local, conversation_id: int, message: str) -> float:
+    with session_local() as db:
+        started = time.perf_counter()
+        metabolic_copilot_service.process_message(db, 1, message, conversation_id)
+        db.commit()
+        return time.perf_counter() - started
+
+
+def test_turn_cost_stays_flat_as_the_conversation_grows(monkeypatch):
+    monkeypatch.setattr(metabolic_copilot_service, "api_key", None)
+    client, session_local = build_test_client()
+    auth_headers(client)
+
+    timings = {}
+    for size in (10, 10_000):
+        conversation_id = _seed_conversation(session_local, size)
+        # The first turn on a seeded thread builds the summary once; later turns only fold what they evict.
+        _turn_seconds(session_local, conversation_id, "warm up")
+        timings[size] = min(_turn_seconds(session_local, conversation_id, f"turn {n}") for n in range(5))
+
+    assert timings[10_000] < max(timings[10] * 3, 0.05), timings
+
+
+def test_rolling_summary_matches_a_full_rebuild(monkeypatch):
+    monkeypatch.setattr(metabolic_copilot_service, "api_key", None)
+    client, session_local = build_test_client()
+    auth_headers(client)
+    conversation_id = _seed_conversation(session_local, 3)
+
+    for n in range(12):
+        _turn_seconds(session_local, conversation_id, f"turn {n} " + "x" * 150)
+
+    with session_local() as db:
+        conversation = db.get(AIConversation, conversation_id)
+        rows = db.scalars(select(AIMessage).where(AIMessage.conversation_id == conversation_id).order_by(AIMessage.id)).all()
+        # The window excludes the reply written in the same turn, so the last full window plus that reply stay out.
+        older = rows[: -(CONTEXT_WINDOW_MESSAGES + 1)]
+        assert conversation.summary == " ".join(f"{m.role.value}: {m.content}" for m in older)[-3000:]
+        assert conversation.summarized_through_id == older[-1].id
+
+
+def test_grounding_snapshot_is_reused_until_the_user_writes(monkeypatch):
+    monkeypatch.setattr(metabolic_copilot_service, "_snapshot_cache", {})
+    builds = []
+    build = metabolic_copilot_service._build_grounding_snapshot
+    monkeypatch.setattr(metabolic_copilot_service, "_build_grounding_snapshot", lambda db, user_id: builds.append(user_id) or build(db, user_id))
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    with session_local() as db:
+        seed_initial_data(db)
+        dal_id = db.scalar(select(FoodItem.id).where(FoodItem.name == "Dal"))
+
+    with session_local() as db:
+        before = metabolic_copilot_service._get_grounding_snapshot(db, 1)
+        assert metabolic_copilot_service._get_grounding_snapshot(db, 1) is before
+    assert len(builds) == 1
+
+    consumed_at = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0).isoformat()
+    response = client.post("/log-food", json={"consumed_at": consumed_at, "entries": [{"food_item_id": dal_id, "servings": 1}]}, headers=headers)
+    assert response.status_code == 200
+
+    with session_local() as db:
+        after = metabolic_copilot_service._get_grounding_snapshot(db, 1)
+    assert len(builds) == 2
+    assert after["today_macros"]["carbs"] == before["today_macros"]["carbs"] + 20.0
+
+
+def test_concurrent_snapshot_misses_build_once(monkeypatch, tmp_path):
+    monkeypatch.setattr(metabolic_copilot_service, "_snapshot_cache", {})
+    builds = []
+    build = metabolic_copilot_service._build_grounding_snapshot
+
+    def slow_build(db, user_id):
+        builds.append(user_id)
+        time.sleep(0.2)
+        return build(db, user_id)
+
+    monkeypatch.setattr(metabolic_copilot_service, "_build_grounding_snapshot", slow_build)
+    client, session_local = build_test_client(f"sqlite+pysqlite:///{tmp_path / 'snapshot.db'}")
+    auth_headers(client)
+
+    results = []
+
+    def read():
+        with session_local() as db:
+            results.append(metabolic_copilot_service._get_grounding_snapshot(db, 1))
+
+    threads = [threading.Thread(target=read) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert len(results) == 5 and all(result == results[0] for result in results)
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, update
+
+from app.models import AIConversation, AIMessage, AIMessageRole
+from test_copilot import auth_headers, build_test_client
+
+
+def _seed(session_local, conversations: int, messages: int) -> int:
+    started = datetime(2026, 1, 1)
+    with session_local() as db:
+        rows = [
+            AIConversation(
+                user_id=1,
+                title=f"chat {n}",
+                summary="s" * 3000,
+                created_at=started + timedelta(hours=n),
+                updated_at=started + timedelta(hours=n),
+            )
+            for n in range(conversations)
+        ]
+        db.add_all(rows)
+        db.flush()
+        if messages:
+            # Pairs share a timestamp so the id tie-breaker is exercised.
+            db.execute(
+                insert(AIMessage),
+                [
+                    {"conversation_id": rows[-1].id, "role": AIMessageRole.USER, "content": f"m{n}", "created_at": started + timedelta(seconds=n // 2)}
+                    for n in range(messages)
+                ],
+            )
+        db.commit()
+        return rows[-1].id
+
+
+def _walk(client, path: str, headers: dict, key=None) -> list[list]:
+    pages, cursor = [], None
+    while True:
+        response = client.get(path, params={"limit": 50} | ({"cursor": cursor} if cursor else {}), headers=headers)
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body[key] if key else body)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_messages_page_backwards_from_the_latest_without_gaps():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    conversation_id = _seed(session_local, 1, 121)
+
+    pages = _walk(client, f"/copilot/conversations/{conversation_id}", headers, key="messages")
+    assert [len(page) for page in pages] == [50, 50, 21]
+    assert pages[0][-1]["content"] == "m120"
+    contents = [message["content"] for page in reversed(pages) for message in page]
+    assert contents == [f"m{n}" for n in range(121)]
+
+
+def test_conversation_list_is_paged_with_summary_previews():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    _seed(session_local, 120, 0)
+
+    pages = _walk(client, "/copilot/conversations", headers)
+    assert [len(page) for page in pages] == [50, 50, 20]
+    titles = [item["title"] for page in pages for item in page]
+    assert titles == [f"chat {n}" for n in reversed(range(120))]
+    assert all(len(item["summary"]) == 280 for item in pages[0])
+
+    assert client.get("/copilot/conversations", params={"cursor": "not-a-cursor"}, headers=headers).status_code == 400
+    assert client.get("/copilot/conversations", params={"limit": 1000}, headers=headers).status_code == 422
+
+
+def test_resumed_conversation_moves_to_the_top_of_the_list():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    _seed(session_local, 30, 0)
+    with session_local() as db:
+        db.execute(update(AIConversation).where(AIConversation.title == "chat 3").values(updated_at=datetime(2026, 2, 1)))
+        db.commit()
+
+    pages = _walk(client, "/copilot/conversations", headers)
+    titles = [item["title"] for page in pages for item in page]
+    assert titles[:2] == ["chat 3", "chat 29"]
+    assert sorted(titles) == sorted(f"chat {n}" for n in range(30))
@@ -0,0 +1,158 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.llm_gateway import llm_gateway
+from app.models import AIConversation, AIMessage, AIMessageRole, MealEntry
+from app.services.metabolic_copilot_service import StreamedStringField, metabolic_copilot_service
+from test_copilot import auth_headers, build_test_client
+
+# The frontend asks for an event stream; that keeps the request out of body sanitization.
+SSE_ACCEPT = {"Accept": "text/event-stream"}
+
+STRUCTURED_REPLY = json.dumps(
+    {
+        "assistant_message": "Dal is a \"solid\" choice —\nlogging it now.",
+        "action": {
+            "action": "log_meal",
+            "items": ["dal"],
+            "estimated_macros": {"protein": 9, "carbs": 20, "fats": 4, "hidden_oil": 1},
+            "confidence": 0.9,
+        },
+    }
+)
+
+
+class _StreamingChatHandler(BaseHTTPRequestHandler):
+    """Streams the structured reply a few characters at a time, like the chat-completions stream."""
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        self.server.requests.append(request)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for start in range(0, len(STRUCTURED_REPLY), 7):
+            chunk = {"choices": [{"index": 0, "delta": {"content": STRUCTURED_REPLY[start : start + 7]}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(0.01)
+        usage = {"choices": [], "usage": {"prompt_tokens": 200, "completion_tokens": 40, "total_tokens": 240}}
+        self.wfile.write(f"data: {json.dumps(usage)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def streaming_llm(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamingChatHandler)
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "openai_api_base_url", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(metabolic_copilot_service, "api_key", "test-key")
+    yield server
+    server.shutdown()
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_forwards_reply_tokens_then_logs_the_meal(streaming_llm):
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    ttft_before = REGISTRY.get_sample_value("myhealthtracker_copilot_time_to_first_token_seconds_count") or 0
+
+    response = client.post("/copilot/message/stream", json={"message": "I had dal for lunch"}, headers=headers | SSE_ACCEPT)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert streaming_llm.requests[0]["stream"] is True
+
+    events = _events(response.text)
+    deltas = [data["text"] for event, data in events if event == "delta"]
+    assert len(deltas) > 3
+    assert "".join(deltas) == json.loads(STRUCTURED_REPLY)["assistant_message"]
+
+    event, done = events[-1]
+    assert event == "done"
+    assert done["actions_executed"][0]["action_type"] == "meal_logged"
+    assert done["assistant_message"].startswith("Logged successfully.")
+    assert REGISTRY.get_sample_value("myhealthtracker_copilot_time_to_first_token_seconds_count") == ttft_before + 1
+
+    with session_local() as db:
+        conversation = db.get(AIConversation, done["conversation_id"])
+        assert conversation.total_tokens == 240
+        roles = db.scalars(select(AIMessage.role).where(AIMessage.conversation_id == conversation.id).order_by(AIMessage.id)).all()
+        assert roles == [AIMessageRole.USER, AIMessageRole.ASSISTANT]
+        assert db.scalar(select(MealEntry.id)) is not None
+
+
+def test_stream_runs_on_the_admission_executor(streaming_llm, monkeypatch):
+    stream_threads = []
+    original_stream_turn = metabolic_copilot_service.stream_turn
+
+    def recording_stream_turn(turn, slot=None):
+        stream_threads.append(threading.current_thread().name)
+        yield from original_stream_turn(turn, slot)
+
+    monkeypatch.setattr(metabolic_copilot_service, "stream_turn", recording_stream_turn)
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+
+    response = client.post("/copilot/message/stream", json={"message": "I had dal for lunch"}, headers=headers | SSE_ACCEPT)
+    assert _events(response.text)[-1][0] == "done"
+    assert len(stream_threads) == 1
+    assert stream_threads[0].startswith("llm-admission")
+
+
+def test_stream_is_refused_when_every_copilot_slot_is_busy(streaming_llm, monkeypatch):
+    monkeypatch.setitem(llm_gateway._semaphores, "copilot", threading.BoundedSemaphore(1))
+    held = llm_gateway.try_reserve("copilot")
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+
+    try:
+        started = time.perf_counter()
+        response = client.post("/copilot/message/stream", json={"message": "hello"}, headers=headers | SSE_ACCEPT)
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        assert time.perf_counter() - started < settings.llm_gateway_queue_wait_seconds
+    finally:
+        held.release()
+    assert streaming_llm.requests == []
+    with session_local() as db:
+        assert db.scalar(select(AIMessage.id)) is None
+
+    # Neither the refused request nor the finished stream keeps the slot.
+    response = client.post("/copilot/message/stream", json={"message": "I had dal for lunch"}, headers=headers | SSE_ACCEPT)
+    assert _events(response.text)[-1][0] == "done"
+    assert llm_gateway.try_reserve("copilot") is not None
+
+
+def test_stream_falls_back_when_the_provider_is_unreachable(monkeypatch):
+    monkeypatch.setattr(settings, "openai_api_base_url", "http://127.0.0.1:9/v1")
+    monkeypatch.setattr(metabolic_copilot_service, "api_key", "test-key")
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+
+    response = client.post("/copilot/message/stream", json={"message": "hello"}, headers=headers | SSE_ACCEPT)
+    event, done = _events(response.text)[-1]
+    assert event == "done"
+    assert done["assistant_message"] == "Copilot is temporarily unavailable. Please retry."
+
+
+def test_streamed_field_holds_back_split_escapes():
+    field = StreamedStringField("assistant_message")
+    pieces = [field.feed(part) for part in ['{"assistant_message": "a\\', 'u00e9', 'b\\', '"c"', ', "action": null}']]
+    assert pieces == ["a", "é", "b", '"c', ""]
@@ -0,0 +1,128 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models import AIConversation, DailyLog, User
+from app.services.daily_totals import get_or_create_daily_log
+from app.services.hydration_engine import apply_hydration_update
+from app.services.metabolic_copilot_service import metabolic_copilot_service
+
+THREADS = 12
+
+
+def _session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'counters.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def widen_race_window(_conn, _cursor, statement, *_args):
+        # A read-modify-write would read the same starting value in every thread.
+        if statement.lstrip().upper().startswith("SELECT"):
+            time.sleep(0.05)
+
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+def _run_concurrently(work) -> tuple[list[object], list[Exception]]:
+    barrier = threading.Barrier(THREADS)
+    results: list[object] = []
+    errors: list[Exception] = []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(work())
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_hydration_logs_keep_every_increment(tmp_path):
+    SessionLocal = _session_factory(tmp_path)
+    with SessionLocal() as db:
+        user = User(email="water@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        get_or_create_daily_log(db, user_id, date(2026, 3, 1))
+        db.commit()
+
+    def log_water():
+        with SessionLocal() as db:
+            daily_log = get_or_create_daily_log(db, user_id, date(2026, 3, 1))
+            data = apply_hydration_update(db, daily_log, 250)
+            db.commit()
+            return data["water_ml"]
+
+    returned, errors = _run_concurrently(log_water)
+
+    assert errors == []
+    # Each caller sees the total its own increment produced, never a stale read.
+    assert sorted(returned) == [250 * step for step in range(1, THREADS + 1)]
+    with SessionLocal() as db:
+        daily_log = db.scalar(select(DailyLog))
+        assert daily_log.water_ml == 250 * THREADS
+        assert daily_log.hydration_score == 100.0
+
+
+def test_hydration_score_is_computed_in_the_update(tmp_path):
+    SessionLocal = _session_factory(tmp_path)
+    with SessionLocal() as db:
+        user = User(email="score@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        daily_log = get_or_create_daily_log(db, user.id, date(2026, 3, 1))
+
+        data = apply_hydration_update(db, daily_log, 333)
+
+        assert data["water_ml"] == daily_log.water_ml == 333
+        assert data["hydration_score"] == daily_log.hydration_score == 13.3
+        assert not db.is_modified(daily_log)
+
+
+def test_concurrent_copilot_usage_keeps_every_increment(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "llm_input_cost_per_1k_tokens", 0.5)
+    monkeypatch.setattr(settings, "llm_output_cost_per_1k_tokens", 1.5)
+    SessionLocal = _session_factory(tmp_path)
+    with SessionLocal() as db:
+        user = User(email="tokens@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        conversation = AIConversation(user_id=user.id, title="Metabolic Copilot")
+        db.add(conversation)
+        db.commit()
+        conversation_id = conversation.id
+
+    def record_usage():
+        with SessionLocal() as db:
+            conversation = db.get(AIConversation, conversation_id)
+            metabolic_copilot_service._record_usage(
+                db, conversation, {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+            )
+            total_tokens = conversation.total_tokens
+            db.commit()
+            return total_tokens
+
+    returned, errors = _run_concurrently(record_usage)
+
+    assert errors == []
+    assert sorted(returned) == [120 * step for step in range(1, THREADS + 1)]
+    with SessionLocal() as db:
+        conversation = db.get(AIConversation, conversation_id)
+        assert conversation.total_tokens == 120 * THREADS
+        assert conversation.total_cost == pytest.approx(THREADS * (100 * 0.5 + 20 * 1.5) / 1000)
@@ -0,0 +1,93 @@
+from datetime import date, datetime, time, timedelta
+from uuid import uuid4
+
+from sqlalchemy import event, select
+
+from app.core.config import settings
+from app.data.seed_data import seed_initial_data
+from app.models import FoodItem
+from test_copilot import auth_headers, build_test_client
+
+
+def _seed_days(client, session_local, headers, days: int) -> date:
+    with session_local() as db:
+        seed_initial_data(db)
+        dal_id = db.scalar(select(FoodItem.id).where(FoodItem.name == "Dal"))
+
+    end = date.today()
+    operations = []
+    for offset in range(days):
+        day = end - timedelta(days=offset)
+        for meal in range(1 + offset % 3):
+            consumed_at = datetime.combine(day, time(hour=10 + meal)).isoformat()
+            operations.append(
+                {"op_id": str(uuid4()), "type": "meal", "data": {"consumed_at": consumed_at, "entries": [{"food_item_id": dal_id}]}}
+            )
+        operations.append({"op_id": str(uuid4()), "type": "hydration", "data": {"amount_ml": 250 + 50 * (offset % 30), "log_date": day.isoformat()}})
+    response = client.post("/sync/batch", json={"operations": operations}, headers=headers)
+    assert response.status_code == 200, response.text
+    return end
+
+
+def _count_statements(session_local, send):
+    engine = session_local.kw["bind"]
+    statements: list[str] = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = send()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_range_matches_single_day_summaries_with_constant_queries():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    end = _seed_days(client, session_local, headers, days=30)
+    start = end - timedelta(days=29)
+
+    response, range_count = _count_statements(
+        session_local, lambda: client.get("/daily-summary/range", params={"start": start, "end": end}, headers=headers)
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert len(body["dates"]) == 30
+    assert body["meal_count"][-1] == 1 and body["meal_count"][0] == 1 + 29 % 3
+
+    loop_count = 0
+    for index, day in enumerate(body["dates"]):
+        single, count = _count_statements(
+            session_local, lambda day=day: client.get("/daily-summary", params={"date": f"{day}T12:00:00"}, headers=headers)
+        )
+        loop_count += count
+        single = single.json()
+        assert body["total_carbs"][index] == single["total_carbs"]
+        assert body["water_ml"][index] == single["water_ml"]
+        assert body["insulin_load_score"][index] == single["insulin_load_score"]
+        assert body["carb_compliance"][index] == single["validations"]["carb_limit"]
+
+    week, week_count = _count_statements(
+        session_local,
+        lambda: client.get("/daily-summary/range", params={"start": end - timedelta(days=6), "end": end}, headers=headers),
+    )
+    assert len(week.json()["dates"]) == 7
+    assert week_count == range_count
+    assert range_count * 10 < loop_count
+
+
+def test_range_is_capped_and_validated(monkeypatch):
+    monkeypatch.setattr(settings, "daily_summary_range_max_days", 7)
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+    end = date.today()
+
+    too_long = client.get("/daily-summary/range", params={"start": end - timedelta(days=7), "end": end}, headers=headers)
+    assert too_long.status_code == 400
+    reversed_range = client.get("/daily-summary/range", params={"start": end, "end": end - timedelta(days=1)}, headers=headers)
+    assert reversed_range.status_code == 400
+    empty = client.get("/daily-summary/range", params={"start": end - timedelta(days=6), "end": end}, headers=headers)
+    assert empty.status_code == 200 and empty.json()["dates"] == []
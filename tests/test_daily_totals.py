@@ -0,0 +1,75 @@
+from datetime import datetime, time
+
+from sqlalchemy import event, select
+
+from app.data.seed_data import seed_initial_data
+from app.models import DailyLog, FoodItem
+from app.services.daily_totals import compute_totals_from_entries, find_drift, rebuild_daily_totals
+from test_copilot import auth_headers, build_test_client
+
+
+def _food_ids(session_local) -> dict[str, int]:
+    with session_local() as db:
+        seed_initial_data(db)
+        return {food.name: food.id for food in db.scalars(select(FoodItem))}
+
+
+def test_log_food_applies_deltas_with_constant_statement_count():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    foods = _food_ids(session_local)
+    consumed_at = datetime.combine(datetime.utcnow().date(), time(hour=10)).isoformat()
+    engine = session_local.kw["bind"]
+
+    statement_counts: list[int] = []
+    for _ in range(6):
+        statements: list[str] = []
+
+        def record(*args, statements=statements):
+            statements.append(args[2])
+
+        event.listen(engine, "before_cursor_execute", record)
+        response = client.post(
+            "/log-food",
+            json={
+                "consumed_at": consumed_at,
+                "entries": [
+                    {"food_item_id": foods["Dal"], "servings": 1},
+                    {"food_item_id": foods["Apple (1 medium)"], "servings": 0.5},
+                    {"food_item_id": foods["Almond (10 pieces)"], "servings": 1},
+                ],
+            },
+            headers=headers,
+        )
+        event.remove(engine, "before_cursor_execute", record)
+        assert response.status_code == 200
+        statement_counts.append(len(statements))
+
+    payload = response.json()
+    assert payload["total_carbs"] == round(6 * (20.0 + 0.5 * 25.0 + 2.4), 2)
+    assert payload["fruit_servings"] == 3.0
+    assert payload["nuts_servings"] == 6.0
+    # Early logs also fire threshold alerts; once those settle, cost must not track meals already logged.
+    assert len(set(statement_counts[3:])) == 1
+
+    with session_local() as db:
+        daily_log = db.scalar(select(DailyLog))
+        assert find_drift(db, daily_log) == {}
+
+
+def test_rebuild_repairs_drifted_totals():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    foods = _food_ids(session_local)
+    consumed_at = datetime.combine(datetime.utcnow().date(), time(hour=9)).isoformat()
+    client.post("/log-food", json={"consumed_at": consumed_at, "entries": [{"food_item_id": foods["Chapati"], "servings": 2}]}, headers=headers)
+
+    with session_local() as db:
+        daily_log = db.scalar(select(DailyLog))
+        daily_log.total_carbs = 999.0
+        db.flush()
+        assert set(find_drift(db, daily_log)) == {"total_carbs"}
+
+        rebuild_daily_totals(db, daily_log)
+        assert daily_log.total_carbs == compute_totals_from_entries(db, daily_log.id)["total_carbs"] == 36.0
+        assert find_drift(db, daily_log) == {}
@@ -0,0 +1,163 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import event, select
+
+from app.data.seed_data import seed_initial_data
+from app.models import ExerciseCategory, ExerciseEntry, FoodItem, User, VitalsEntry
+from app.services.dashboard_service import DashboardService
+from test_copilot import auth_headers, build_test_client
+
+# Statements one full bootstrap may issue; the standalone endpoints need about
+# twice that between them for the same panels.
+BOOTSTRAP_QUERY_BUDGET = 40
+
+PANEL_ENDPOINTS = {
+    "daily_summary": "/daily-summary",
+    "movement_panel": "/movement/panel",
+    "challenge": "/challenge",
+    "monthly_challenge": "/challenge/monthly",
+    "profile": "/profile",
+    "vitals_summary": "/vitals-summary",
+    "exercise_summary": "/exercise-summary",
+    "analytics": "/analytics/advanced",
+    "performance_view": "/metabolic/performance-view",
+    "habit_intelligence": "/habits/intelligence",
+    "recipes": "/recipes",
+    "recipe_suggestions": "/recipes/suggestions",
+    "notification_settings": "/notification-settings",
+}
+
+
+def _seed_history(client, session_local, headers) -> None:
+    with session_local() as db:
+        seed_initial_data(db)
+        dal_id = db.scalar(select(FoodItem.id).where(FoodItem.name == "Dal"))
+
+    today = datetime.utcnow().date()
+    for offset in range(14):
+        day = today - timedelta(days=offset)
+        consumed_at = datetime.combine(day, time(hour=10)).isoformat()
+        client.post("/log-food", json={"consumed_at": consumed_at, "entries": [{"food_item_id": dal_id}]}, headers=headers)
+        client.post(
+            "/log-exercise",
+            json={
+                "activity_type": "walk",
+                "exercise_category": "WALK",
+                "movement_type": "post_meal_walk",
+                "duration_minutes": 15,
+                "post_meal_walk": True,
+                "performed_at": datetime.combine(day, time(hour=11)).isoformat(),
+            },
+            headers=headers,
+        )
+    client.post(
+        "/log-vitals",
+        json={"weight_kg": 80.0, "fasting_glucose": 95.0, "hba1c": 5.6, "triglycerides": 150.0, "hdl": 45.0},
+        headers=headers,
+    )
+
+
+def _get_counting_statements(client, session_local, url, headers, params=None):
+    engine = session_local.kw["bind"]
+    statements: list[str] = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(url, params=params, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.text
+    return response.json(), len(statements)
+
+
+def test_bootstrap_matches_standalone_panels_within_query_budget():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    _seed_history(client, session_local, headers)
+
+    standalone_total = 0
+    standalone = {}
+    for panel, url in PANEL_ENDPOINTS.items():
+        standalone[panel], count = _get_counting_statements(client, session_local, url, headers)
+        standalone_total += count
+
+    body, bootstrap_count = _get_counting_statements(client, session_local, "/dashboard/bootstrap", headers)
+
+    assert bootstrap_count <= BOOTSTRAP_QUERY_BUDGET
+    assert bootstrap_count < standalone_total
+    assert body["movement_panel"]["walk_streak"] == 14
+    for panel, payload in standalone.items():
+        assert body[panel] == payload, panel
+
+
+def test_bootstrap_field_selection_skips_other_panels():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+
+    full, full_count = _get_counting_statements(client, session_local, "/dashboard/bootstrap", headers)
+    body, count = _get_counting_statements(
+        client, session_local, "/dashboard/bootstrap", headers, params={"fields": "profile,daily_summary"}
+    )
+
+    assert set(body) == {"user_id", "profile", "daily_summary"}
+    assert body["daily_summary"] is None
+    assert body["profile"] == full["profile"]
+    assert count < full_count
+
+    response = client.get("/dashboard/bootstrap", params={"fields": "profile,nope"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_bootstrap_loads_only_the_rendered_window_but_keeps_all_time_totals():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    _seed_history(client, session_local, headers)
+
+    long_ago = datetime.utcnow() - timedelta(days=400)
+    with session_local() as db:
+        db.add_all(
+            [
+                ExerciseEntry(
+                    user_id=1,
+                    activity_type="monkey bars",
+                    exercise_category=ExerciseCategory.MONKEY_BAR,
+                    movement_type="pushups",
+                    reps=10,
+                    sets=3,
+                    pull_up_count=4,
+                    dead_hang_duration_seconds=45,
+                    duration_minutes=20,
+                    step_count=500,
+                    performed_at=long_ago,
+                ),
+                *[
+                    VitalsEntry(
+                        user_id=1,
+                        recorded_at=long_ago + timedelta(days=offset),
+                        weight_kg=82.0,
+                        fasting_glucose=100.0,
+                        hba1c=5.8,
+                        triglycerides=160.0,
+                        hdl=42.0,
+                        waist_cm=90.0 + offset,
+                    )
+                    for offset in range(3)
+                ],
+            ]
+        )
+        db.commit()
+
+        context = DashboardService().load_context(db, db.get(User, 1))
+        assert len(context.exercises) == 14
+        # The window's single reading plus the older ones that complete the last three.
+        assert len(context.vitals) == 3
+
+    standalone = {panel: client.get(PANEL_ENDPOINTS[panel], headers=headers).json() for panel in ("exercise_summary", "vitals_summary")}
+    body = client.get("/dashboard/bootstrap", headers=headers).json()
+    assert body["exercise_summary"] == standalone["exercise_summary"]
+    assert body["exercise_summary"]["total_sessions"] == 15
+    assert body["exercise_summary"]["monkey_bar_progress"]["pull_up_count"] == 4
+    assert body["vitals_summary"] == standalone["vitals_summary"]
@@ -0,0 +1,60 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.session import (
+    ENGINE_PROFILES,
+    InstrumentedQueuePool,
+    _track_pool_usage,
+    create_db_engine,
+    get_engine,
+    get_sessionmaker,
+)
+
+
+def _sample(name: str, role: str) -> float:
+    return REGISTRY.get_sample_value(name, {"role": role}) or 0.0
+
+
+def test_profiles_follow_settings_and_migrations_do_not_pool(tmp_path):
+    assert ENGINE_PROFILES["api"].pool_size == settings.db_api_pool_size
+    assert ENGINE_PROFILES["scheduler"].max_overflow == settings.db_scheduler_max_overflow
+    assert ENGINE_PROFILES["worker"].statement_timeout_ms == settings.db_worker_statement_timeout_ms
+
+    migration_engine = create_db_engine("migration", f"sqlite+pysqlite:///{tmp_path / 'migrate.db'}")
+    assert isinstance(migration_engine.pool, NullPool)
+    migration_engine.dispose()
+
+
+def test_sessionmaker_is_shared_per_role():
+    scheduler_sessions = get_sessionmaker("scheduler")
+    assert get_sessionmaker("scheduler") is scheduler_sessions
+    assert scheduler_sessions.kw["bind"] is get_engine("scheduler")
+    assert get_sessionmaker("api") is not scheduler_sessions
+
+
+def test_pool_gauges_track_checkouts_overflow_and_timeouts(tmp_path):
+    role = "pool-test"
+    pool_class = type("PoolTestQueuePool", (InstrumentedQueuePool,), {"role": role})
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'pool.db'}", poolclass=pool_class, pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    _track_pool_usage(engine, role)
+    timeouts_before = _sample("myhealthtracker_db_pool_timeouts_total", role)
+
+    first, second = engine.connect(), engine.connect()
+    assert _sample("myhealthtracker_db_pool_checked_out", role) == 2
+    assert _sample("myhealthtracker_db_pool_overflow", role) == 1
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    assert _sample("myhealthtracker_db_pool_timeouts_total", role) == timeouts_before + 1
+    assert _sample("myhealthtracker_db_pool_wait_seconds_count", role) == 3
+
+    first.close()
+    second.close()
+    assert _sample("myhealthtracker_db_pool_checked_out", role) == 0
+    engine.dispose()
@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_service import llm_service
+from test_copilot import auth_headers, build_test_client
+
+LLM_EXTRACTION = {
+    "food_items": ["egg"],
+    "portion": "2 eggs",
+    "estimated_macros": {"protein": 12.0, "carbs": 1.0, "fats": 10.0, "hidden_oil": 0.5},
+    "reasoning": "Two boiled eggs.",
+}
+
+
+class _SlowExtractionHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.hits += 1
+        time.sleep(self.server.delay)
+        body = json.dumps({"choices": [{"message": {"content": json.dumps(LLM_EXTRACTION)}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def slow_llm(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowExtractionHandler)
+    server.lock = threading.Lock()
+    server.hits = 0
+    server.delay = 2.5
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "openai_api_base_url", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(settings, "llm_extraction_deadline_seconds", 0.3)
+    monkeypatch.setattr(llm_service, "api_key", "test-key")
+    monkeypatch.setattr(llm_service, "_cache", {})
+    yield server
+    llm_service.shutdown()
+    server.shutdown()
+
+
+def _analyze(client, headers, text):
+    started = time.perf_counter()
+    response = client.post("/llm/analyze", json={"user_id": 1, "text": text}, headers=headers)
+    assert response.status_code == 200
+    return response.json(), time.perf_counter() - started
+
+
+def test_slow_llm_is_bounded_by_the_deadline_and_lands_in_cache(slow_llm):
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+    client.get("/profile", headers=headers)
+
+    latencies = []
+    for index in range(3):
+        body, elapsed = _analyze(client, headers, f"two eggs {index}")
+        latencies.append(elapsed)
+        assert body["provisional"] is True
+        assert body["source"] == "fallback"
+    assert max(latencies) < 0.3 + 0.5
+
+    # A repeat while the first call is still running waits on it instead of calling again.
+    body, _ = _analyze(client, headers, "two eggs 0")
+    assert body["provisional"] is True
+    assert slow_llm.hits == 3
+
+    time.sleep(slow_llm.delay)
+    body, elapsed = _analyze(client, headers, "two eggs 0")
+    assert body["provisional"] is False
+    assert body["source"] == "llm"
+    assert body["food_items"] == ["egg"]
+    assert elapsed < 0.3
+    assert slow_llm.hits == 3
+
+
+def test_fast_llm_answer_within_the_deadline_is_used(slow_llm):
+    slow_llm.delay = 0.0
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+
+    body, _ = _analyze(client, headers, "two eggs")
+    assert body["provisional"] is False
+    assert body["source"] == "llm"
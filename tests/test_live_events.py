@@ -0,0 +1,168 @@
+import asyncio
+import json
+import threading
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import StreamAwareGZipMiddleware
+from app.core.security import decode_token
+from app.models import DailyLog
+from app.routers.events_router import _sse_frames
+from app.services import live_events
+from app.services.live_events import LiveEvent, LiveEventBus, LiveEventLimitError, live_event_bus, queue_live_event
+from test_copilot import auth_headers, build_test_client
+
+
+def test_bus_fans_out_cross_thread_and_enforces_limits():
+    bus = LiveEventBus(redis_url="", max_connections=3, max_connections_per_user=2)
+
+    async def scenario():
+        first = bus.subscribe(1)
+        second = bus.subscribe(1)
+        other = bus.subscribe(2)
+        try:
+            bus.subscribe(1)
+            raise AssertionError("per-user limit not enforced")
+        except LiveEventLimitError:
+            pass
+        try:
+            bus.subscribe(3)
+            raise AssertionError("global limit not enforced")
+        except LiveEventLimitError:
+            pass
+
+        publisher = threading.Thread(target=bus.publish, args=(1, LiveEvent("daily_totals", {"water_ml": 500})))
+        publisher.start()
+        publisher.join()
+        received = [await first.next(1), await second.next(1)]
+        assert [item.data for item in received] == [{"water_ml": 500}] * 2
+        assert await other.next(0.05) is None
+
+        other.close()
+        other.close()
+        assert bus.connection_count == 2
+        first.close()
+        second.close()
+
+    asyncio.run(scenario())
+    assert bus.connection_count == 0
+
+
+class _FlakyPubSub:
+    def __init__(self, messages: list[dict] | None):
+        self.messages = messages
+
+    def psubscribe(self, _pattern):
+        pass
+
+    def listen(self):
+        if self.messages is None:
+            raise ConnectionError("redis went away")
+        yield from self.messages
+        threading.Event().wait()
+
+    def close(self):
+        pass
+
+
+class _FlakyRedis:
+    """The first pubsub connection drops; the next one delivers ``messages``."""
+
+    def __init__(self, messages: list[dict]):
+        self.connections = [_FlakyPubSub(None), _FlakyPubSub(messages)]
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self.connections.pop(0)
+
+
+def test_redis_listener_reconnects_after_the_connection_drops(monkeypatch):
+    monkeypatch.setattr(live_events, "LISTENER_RETRY_INITIAL_SECONDS", 0.01)
+    bus = LiveEventBus(redis_url="redis://live-events", max_connections=2, max_connections_per_user=2)
+    message = {"channel": b"live_events:1", "data": json.dumps({"type": "daily_totals", "data": {"water_ml": 250}})}
+    bus._redis = _FlakyRedis([message])
+
+    async def scenario():
+        subscription = bus.subscribe(1)
+        received = await subscription.next(2)
+        subscription.close()
+        return received
+
+    received = asyncio.run(scenario())
+    assert received is not None and received.data == {"water_ml": 250}
+
+
+def test_sse_frames_start_with_retry_and_send_heartbeats(monkeypatch):
+    monkeypatch.setattr("app.routers.events_router.settings.live_events_heartbeat_seconds", 0.05)
+
+    async def scenario():
+        subscription = live_event_bus.subscribe(99)
+        frames = _sse_frames(subscription)
+        assert (await frames.__anext__()).startswith("retry: ")
+        assert await frames.__anext__() == ": ping\n\n"
+        live_event_bus.publish(99, LiveEvent("insulin_score", {"score": 42.0}))
+        assert await frames.__anext__() == 'event: insulin_score\ndata: {"type":"insulin_score","data":{"score":42.0}}\n\n'
+        await frames.aclose()
+        assert live_event_bus.connection_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_events_publish_only_after_commit_over_websocket():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    user_id = int(decode_token(headers["Authorization"].removeprefix("Bearer "))["sub"])
+
+    with client.websocket_connect("/events/ws") as websocket:
+        websocket.send_json({"access_token": headers["Authorization"].removeprefix("Bearer ")})
+
+        with session_local() as db:
+            db.get(DailyLog, 1)
+            queue_live_event(db, user_id, "movement_alert", {"alert_type": "dropped"})
+            db.rollback()
+        with session_local() as db:
+            db.get(DailyLog, 1)
+            queue_live_event(db, user_id, "movement_alert", {"alert_type": "closed"})
+        assert not db.info
+
+        response = client.post("/hydration/log", json={"user_id": user_id, "amount_ml": 750}, headers=headers)
+        assert response.status_code == 200
+        message = websocket.receive_json()
+        assert message["type"] == "daily_totals"
+        assert message["data"]["water_ml"] == 750
+
+        with session_local() as db:
+            assert db.query(DailyLog).filter_by(user_id=user_id).one().water_ml == 750
+
+
+def test_stream_requires_auth_and_sheds_load_with_503(monkeypatch):
+    client, _ = build_test_client()
+    assert client.get("/events/stream").status_code == 401
+
+    headers = auth_headers(client)
+    monkeypatch.setattr(live_event_bus, "max_connections", 0)
+    response = client.get("/events/stream", headers=headers)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+
+    with client.websocket_connect("/events/ws") as websocket:
+        websocket.send_json({"access_token": "not-a-token"})
+        assert websocket.receive()["code"] == 1008
+
+
+def test_gzip_leaves_event_streams_uncompressed():
+    app = FastAPI()
+    app.add_middleware(StreamAwareGZipMiddleware, minimum_size=10)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter(["data: x\n\n"] * 200), media_type="text/event-stream")
+
+    @app.get("/json")
+    def payload():
+        return {"values": list(range(200))}
+
+    client = TestClient(app)
+    assert "content-encoding" not in client.get("/stream", headers={"Accept-Encoding": "gzip"}).headers
+    assert client.get("/json", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.core.llm_gateway import (
+    CircuitBreaker,
+    LLMGateway,
+    LLMGatewayError,
+    LLMPurpose,
+    LLMTimeoutError,
+    LLMUnavailableError,
+    TokenBucket,
+)
+from app.services.llm_service import llm_service
+
+
+class _FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Chat completions endpoint whose latency and status codes are scripted per test."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.hits += 1
+            server.client_ports.add(self.client_address[1])
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            status = server.statuses.pop(0) if server.statuses else server.default_status
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        payload = {"choices": [{"message": {"content": "{}"}}], "usage": {"prompt_tokens": 12, "completion_tokens": 3}}
+        body = json.dumps(payload if status == 200 else {"error": {"message": "injected"}}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOpenAIHandler)
+    server.lock = threading.Lock()
+    server.hits = 0
+    server.client_ports = set()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.statuses = []
+    server.default_status = 200
+    server.delay = 0.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "openai_api_base_url", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    yield server
+    server.shutdown()
+
+
+def _gateway(**overrides) -> LLMGateway:
+    options = {
+        "max_connections": 4,
+        "max_retries": 2,
+        "backoff_seconds": 0.01,
+        "queue_wait_seconds": 2.0,
+        "rate_limiter": TokenBucket(1000, 1000),
+        "circuit_breaker": CircuitBreaker(failure_threshold=3, reset_seconds=0.3),
+    }
+    options.update(overrides)
+    purposes = options.pop("purposes", {"test": LLMPurpose("test", 2, 1.0)})
+    return LLMGateway(purposes, **options)
+
+
+def test_sequential_calls_reuse_one_keep_alive_connection(fake_openai):
+    gateway = _gateway()
+    try:
+        for _ in range(5):
+            assert gateway.chat_completion("test", {"messages": []}, api_key="k")["usage"]["prompt_tokens"] == 12
+    finally:
+        gateway.close()
+    assert fake_openai.hits == 5
+    assert len(fake_openai.client_ports) == 1
+
+
+def test_retryable_errors_are_retried_and_client_errors_are_not(fake_openai):
+    gateway = _gateway()
+    fake_openai.statuses = [503, 429]
+    assert gateway.chat_completion("test", {}, api_key="k")["choices"]
+    assert fake_openai.hits == 3
+
+    fake_openai.statuses = [400]
+    with pytest.raises(LLMGatewayError, match="http_400"):
+        gateway.chat_completion("test", {}, api_key="k")
+    assert fake_openai.hits == 4
+    assert not gateway.circuit_breaker.is_open
+    gateway.close()
+
+
+def test_circuit_opens_fails_fast_and_recovers_through_a_probe(fake_openai):
+    gateway = _gateway(max_retries=0)
+    fake_openai.default_status = 500
+    for _ in range(3):
+        with pytest.raises(LLMGatewayError):
+            gateway.chat_completion("test", {}, api_key="k")
+    assert gateway.circuit_breaker.is_open
+
+    started = time.perf_counter()
+    with pytest.raises(LLMUnavailableError):
+        gateway.chat_completion("test", {}, api_key="k")
+    assert time.perf_counter() - started < 0.05
+    assert fake_openai.hits == 3
+
+    time.sleep(0.35)
+    fake_openai.default_status = 200
+    assert gateway.chat_completion("test", {}, api_key="k")["choices"]
+    assert not gateway.circuit_breaker.is_open
+    gateway.close()
+
+
+def test_timeouts_respect_the_purpose_budget(fake_openai):
+    gateway = _gateway(purposes={"test": LLMPurpose("test", 2, 0.2)})
+    fake_openai.delay = 0.5
+    started = time.perf_counter()
+    with pytest.raises(LLMTimeoutError):
+        gateway.chat_completion("test", {}, api_key="k")
+    assert time.perf_counter() - started < 0.45
+    gateway.close()
+
+
+def test_purpose_concurrency_cap_bounds_in_flight_provider_calls(fake_openai):
+    gateway = _gateway(max_connections=10)
+    fake_openai.delay = 0.1
+    callers = [threading.Thread(target=gateway.chat_completion, args=("test", {}), kwargs={"api_key": "k"}) for _ in range(6)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    gateway.close()
+    assert fake_openai.hits == 6
+    assert fake_openai.max_in_flight == 2
+
+
+def test_token_bucket_sheds_calls_beyond_the_rate():
+    bucket = TokenBucket(rate_per_second=10, capacity=2)
+    assert bucket.acquire(timeout=0) and bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0.2)
+
+
+def test_open_circuit_drops_meal_extraction_to_fallback(fake_openai, monkeypatch):
+    from app.core import llm_gateway as gateway_module
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    monkeypatch.setattr(gateway_module.llm_gateway, "circuit_breaker", breaker)
+    monkeypatch.setattr(llm_service, "api_key", "test-key")
+
+    assert llm_service._extract_from_llm("two eggs") is None
+    assert fake_openai.hits == 0
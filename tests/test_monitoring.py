@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+
+def _run(code: str, multiproc_dir: str) -> str:
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": multiproc_dir}
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def test_metrics_aggregate_across_worker_processes(tmp_path):
+    multiproc_dir = str(tmp_path)
+    record = (
+        "from app.core.monitoring import REQUEST_COUNT, DB_POOL_CHECKED_OUT, mark_process_dead\n"
+        "REQUEST_COUNT.labels(method='GET', path='/daily-summary', status=200).inc()\n"
+        "DB_POOL_CHECKED_OUT.labels(role='api').set(3)\n"
+    )
+    _run(record, multiproc_dir)
+    _run(record + "mark_process_dead()\n", multiproc_dir)
+
+    scrape = "from app.core.monitoring import metrics_response\nprint(metrics_response().body.decode())\n"
+    output = _run(scrape, multiproc_dir)
+
+    assert 'myhealthtracker_http_requests_total{method="GET",path="/daily-summary",status="200"} 2.0' in output
+    # The second worker announced its exit, so only the first one's live gauge remains.
+    assert 'myhealthtracker_db_pool_checked_out{role="api"} 3.0' in output
+
+    output = _run("from app.core.monitoring import reap_dead_process_files\nreap_dead_process_files()\n" + scrape, multiproc_dir)
+    assert 'myhealthtracker_db_pool_checked_out{role="api"}' not in output
+    assert 'myhealthtracker_http_requests_total{method="GET",path="/daily-summary",status="200"} 2.0' in output
+
+
+def test_celery_task_metrics_from_a_child_process_reach_the_exporter(tmp_path):
+    multiproc_dir = str(tmp_path)
+    _run("from app.core.monitoring import clear_multiprocess_dir\nclear_multiprocess_dir()\n", multiproc_dir)
+    task_in_child = (
+        "from types import SimpleNamespace\n"
+        "from app.celery_app import _record_task_duration, _record_task_start\n"
+        "_record_task_start(task_id='t1')\n"
+        "_record_task_duration(task_id='t1', task=SimpleNamespace(name='daily_totals.verify_recent'), state='SUCCESS')\n"
+    )
+    _run(task_in_child, multiproc_dir)
+
+    scrape = (
+        "from prometheus_client import generate_latest\n"
+        "from app.core.monitoring import build_registry\n"
+        "print(generate_latest(build_registry()).decode())\n"
+    )
+    output = _run(scrape, multiproc_dir)
+    assert 'myhealthtracker_celery_task_duration_seconds_count{state="SUCCESS",task="daily_totals.verify_recent"} 1.0' in output
+
+
+def test_celery_exporter_refuses_to_start_without_multiprocess_dir(monkeypatch, caplog):
+    from app import celery_app
+
+    started = []
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    monkeypatch.setattr(celery_app, "start_http_server", lambda *args, **kwargs: started.append(args))
+
+    celery_app._start_metrics_exporter()
+    assert started == []
+    assert "PROMETHEUS_MULTIPROC_DIR is not set" in caplog.text
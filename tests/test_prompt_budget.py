@@ -0,0 +1,63 @@
+import json
+from datetime import datetime
+
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.llm_gateway import LLMGateway, LLMPurpose
+from app.core.prompt_budget import compact, compact_json, estimate_chat_tokens, estimate_tokens
+from app.data.seed_data import seed_initial_data
+from app.models import FoodItem
+from app.services.metabolic_copilot_service import metabolic_copilot_service
+from test_copilot import auth_headers, build_test_client
+
+# Estimated prompt tokens for the fixture user's first copilot turn. A change
+# here means every copilot call got more expensive; update it deliberately.
+PINNED_COPILOT_PROMPT_TOKENS = 290
+
+
+def test_compaction_is_deterministic_and_smaller():
+    payload = {"carb_ceiling": 90.0, "hdl": 45.456, "notes": None, "series": [{"carbs": 10.0}] * 12, "empty": {}}
+    assert compact(payload, key_aliases={"carb_ceiling": "ceiling"}, max_list_items=3) == {
+        "ceiling": 90,
+        "hdl": 45.46,
+        "series": [{"carbs": 10}] * 3,
+    }
+    assert compact_json(payload) == compact_json(payload)
+    assert compact_json(payload, token_budget=40).count("carbs") == 3
+    assert estimate_tokens(compact_json(payload, token_budget=40)) <= 40 < estimate_tokens(json.dumps(payload))
+    assert estimate_tokens("The quick brown fox jumps over the lazy dog.") == 10
+
+
+def test_copilot_prompt_size_is_pinned_for_a_fixture_user(monkeypatch):
+    monkeypatch.setattr(metabolic_copilot_service, "_snapshot_cache", {})
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    with session_local() as db:
+        seed_initial_data(db)
+        dal_id = db.scalar(select(FoodItem.id).where(FoodItem.name == "Dal"))
+    consumed_at = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0).isoformat()
+    client.post("/log-food", json={"consumed_at": consumed_at, "entries": [{"food_item_id": dal_id, "servings": 2}]}, headers=headers)
+
+    with session_local() as db:
+        turn = metabolic_copilot_service.start_turn(db, 1, "Can I have rice tonight?")
+        db.rollback()
+    prompt = [{"role": "system", "content": turn.system_prompt}, *turn.messages, {"role": "user", "content": turn.user_message}]
+    assert estimate_chat_tokens(prompt) == PINNED_COPILOT_PROMPT_TOKENS
+    grounding = turn.system_prompt.split("Grounding data: ", 1)[1]
+    assert estimate_tokens(grounding) < estimate_tokens(json.dumps(turn.snapshot)) * 0.8
+
+
+def test_history_is_trimmed_to_the_budget_and_overruns_are_counted(monkeypatch):
+    monkeypatch.setattr(settings, "llm_copilot_prompt_token_budget", 600)
+    snapshot = {"today_macros": {"carbs": 40.0}}
+    messages = [{"role": "user", "content": f"message {n} " + "detail " * 40} for n in range(10)]
+    system_prompt, kept = metabolic_copilot_service._fit_prompt(snapshot, "summary " * 300, messages, "hello")
+    assert "Conversation summary: none" in system_prompt
+    assert 0 < len(kept) < len(messages) and kept[-1] == messages[-1]
+    assert estimate_chat_tokens([{"role": "system", "content": system_prompt}, *kept, {"role": "user", "content": "hello"}]) <= 600
+
+    before = REGISTRY.get_sample_value("myhealthtracker_llm_prompt_over_budget_total", {"purpose": "test"}) or 0
+    LLMGateway._check_prompt_budget(LLMPurpose("test", 1, 1.0, prompt_token_budget=50), {"messages": messages})
+    assert REGISTRY.get_sample_value("myhealthtracker_llm_prompt_over_budget_total", {"purpose": "test"}) == before + 1
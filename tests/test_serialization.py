@@ -0,0 +1,51 @@
+from test_copilot import auth_headers, build_test_client
+from test_dashboard import _seed_history
+
+from app.core.serialization import COLUMNAR_MEDIA_TYPE
+
+
+def test_analytics_columnar_format_carries_the_same_points():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    _seed_history(client, session_local, headers)
+
+    points = client.get("/analytics/advanced", params={"days": 30}, headers=headers).json()
+    by_query = client.get("/analytics/advanced", params={"days": 30, "series_format": "columnar"}, headers=headers)
+    by_accept = client.get("/analytics/advanced", params={"days": 30}, headers={**headers, "Accept": COLUMNAR_MEDIA_TYPE})
+
+    assert by_query.json() == by_accept.json()
+    assert "Accept" in by_query.headers["vary"].split(", ")
+    columnar = by_query.json()
+    series = columnar["carb_intake_pattern"]
+    assert "points" not in series
+    assert series["dates"] == [point["date"] for point in points["carb_intake_pattern"]["points"]]
+    assert series["values"] == [point["value"] for point in points["carb_intake_pattern"]["points"]]
+    assert columnar["metabolic_momentum"] == points["metabolic_momentum"]
+    assert len(by_query.content) < len(client.get("/analytics/advanced", params={"days": 30}, headers=headers).content)
+
+
+def test_habit_heatmap_columnar_format_has_its_own_etag():
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+
+    points = client.get("/habits/intelligence", headers=headers)
+    columnar = client.get("/habits/intelligence", headers={**headers, "Accept": COLUMNAR_MEDIA_TYPE})
+
+    heatmap = columnar.json()["heatmap"]
+    assert heatmap["dates"] == [cell["date"] for cell in points.json()["heatmap"]]
+    assert columnar.headers["etag"] != points.headers["etag"]
+    revalidated = client.get("/habits/intelligence", headers={**headers, "If-None-Match": points.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["vary"] == "Accept"
+
+
+def test_large_responses_are_gzipped():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    _seed_history(client, session_local, headers)
+
+    large = client.get("/analytics/advanced", params={"days": 180}, headers={**headers, "Accept-Encoding": "gzip"})
+    small = client.get("/profile", headers={**headers, "Accept-Encoding": "gzip"})
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in small.headers
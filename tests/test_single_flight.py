@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.core.single_flight import LOCK_TTL_MARGIN_SECONDS, SingleFlight
+from app.services.food_image_service import EXAMPLE_ANALYSIS_JSON, food_image_service
+from app.services.llm_service import llm_service
+from test_copilot import auth_headers, build_test_client
+
+VISION_RESULT = EXAMPLE_ANALYSIS_JSON | {"reference_card": {"detected": True, "width_px": 160, "height_px": 100}}
+
+
+class _SlowVisionHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.hits += 1
+        time.sleep(0.5)
+        body = json.dumps({"choices": [{"message": {"content": json.dumps(VISION_RESULT)}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def slow_provider(monkeypatch, tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowVisionHandler)
+    server.lock = threading.Lock()
+    server.hits = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "openai_api_base_url", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(settings, "food_image_upload_dir", str(tmp_path / "uploads"))
+    monkeypatch.setattr(food_image_service, "api_key", "test-key")
+    monkeypatch.setattr(food_image_service, "_cache", {})
+    monkeypatch.setattr(llm_service, "api_key", "test-key")
+    monkeypatch.setattr(llm_service, "_cache", {})
+    yield server
+    server.shutdown()
+
+
+def _concurrently(count: int, fn) -> list:
+    results: list = [None] * count
+
+    def run(index: int):
+        results[index] = fn()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_callers_share_one_execution_and_its_errors():
+    flight = SingleFlight("test")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": len(calls)}
+
+    assert _concurrently(5, lambda: flight.do("key", slow)) == [{"value": 1}] * 5
+    assert flight.do("key", slow) == {"value": 2}
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("provider down")
+
+    def call_failing():
+        try:
+            flight.do("boom", failing)
+        except RuntimeError as exc:
+            return str(exc)
+
+    calls.clear()
+    assert _concurrently(4, call_failing) == ["provider down"] * 4
+    assert len(calls) == 1
+
+
+def test_duplicate_photo_uploads_make_one_vision_call(slow_provider, tmp_path):
+    client, _ = build_test_client(f"sqlite+pysqlite:///{tmp_path / 'flight.db'}")
+    headers = auth_headers(client)
+    # Creating the profile inside the first request would hold SQLite's write lock and serialize the rest.
+    assert client.get("/profile", headers=headers).status_code == 200
+
+    def upload():
+        return client.post(
+            "/analyze-food-image",
+            files={"image": ("meal.jpg", b"\xff\xd8same-photo-bytes", "image/jpeg")},
+            data={"user_id": "1"},
+            headers=headers,
+        )
+
+    responses = _concurrently(4, upload)
+    assert [response.status_code for response in responses] == [200] * 4
+    assert slow_provider.hits == 1
+
+    grams = {tuple(food["estimated_quantity_grams"] for food in response.json()["foods"]) for response in responses}
+    grams.add(tuple(food["estimated_quantity_grams"] for food in upload().json()["foods"]))
+    assert len(grams) == 1, "portion scaling must not compound on shared or cached results"
+    assert slow_provider.hits == 1
+
+
+def test_repeated_meal_text_makes_one_llm_call(slow_provider, tmp_path):
+    client, _ = build_test_client(f"sqlite+pysqlite:///{tmp_path / 'flight.db'}")
+    headers = auth_headers(client)
+    assert client.get("/profile", headers=headers).status_code == 200
+
+    responses = _concurrently(
+        4, lambda: client.post("/whatsapp-message", json={"user_id": 1, "text": "two eggs and toast"}, headers=headers)
+    )
+    assert [response.status_code for response in responses] == [200] * 4
+    assert slow_provider.hits == 1
+
+
+class _FakeRedis:
+    """Just the SET NX / GET / DELETE subset the shared flight uses."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+def test_failed_leader_releases_the_shared_lock():
+    flight = SingleFlight("test", redis_url="redis://unused", lock_ttl_seconds=30)
+    flight._redis = _FakeRedis()
+
+    def failing():
+        raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", failing)
+    assert flight._redis.values == {}
+
+    # Another worker's follower would now take the lock at once instead of waiting out the TTL.
+    started = time.perf_counter()
+    assert flight.do("key", lambda: {"value": 1}) == {"value": 1}
+    assert time.perf_counter() - started < 1
+
+
+def test_flights_in_two_workers_share_one_execution():
+    shared_redis = _FakeRedis()
+    workers = [SingleFlight("test", redis_url="redis://unused", lock_ttl_seconds=30) for _ in range(2)]
+    calls = []
+
+    def slow_call():
+        calls.append(threading.current_thread().name)
+        time.sleep(0.3)
+        return {"value": 1}
+
+    results = []
+
+    def run(flight: SingleFlight):
+        flight._redis = shared_redis
+        results.append(flight.do("key", slow_call))
+
+    leader = threading.Thread(target=run, args=(workers[0],))
+    follower = threading.Thread(target=run, args=(workers[1],))
+    leader.start()
+    time.sleep(0.05)
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert len(calls) == 1
+    assert results == [{"value": 1}, {"value": 1}]
+
+
+def test_llm_flights_hold_their_lock_just_past_the_call_timeout():
+    assert food_image_service._flight.lock_ttl_seconds == settings.llm_vision_timeout_seconds + LOCK_TTL_MARGIN_SECONDS
+    assert llm_service._flight.lock_ttl_seconds == settings.llm_timeout_seconds + LOCK_TTL_MARGIN_SECONDS
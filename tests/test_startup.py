@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.data.seed_data import FOOD_ITEMS, HABIT_DEFINITIONS, seed_initial_data
+from app.db.base import Base
+from app.models import FoodItem, HabitCheckin, MetabolicProfile, User
+
+HEAVY_MODULES = {"alembic", "pdfminer", "pytesseract", "PIL", "pywebpush"}
+IMPORT_BUDGET_SECONDS = 5.0
+
+
+def test_seed_is_idempotent_and_set_based():
+    engine = create_engine("sqlite+pysqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    with SessionLocal() as db:
+        db.add(User(email="seed@example.com", hashed_password="x"))
+        db.commit()
+
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with SessionLocal() as db:
+        seed_initial_data(db)
+        seed_initial_data(db)
+
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count(FoodItem.id))) == len(FOOD_ITEMS)
+        assert db.scalar(select(func.count(MetabolicProfile.id))) == 1
+        assert db.scalar(select(func.count(HabitCheckin.id))) == 30 * len(HABIT_DEFINITIONS)
+
+    # A fixed number of statements per run, independent of the 30-day x habit history size.
+    assert len(statements) < 40
+
+
+def test_app_import_skips_heavy_optional_stacks():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if cumulative_us.strip().isdigit():
+            imported[name.strip()] = int(cumulative_us)
+
+    assert not {name.split(".")[0] for name in imported} & HEAVY_MODULES
+    assert imported["app.main"] / 1_000_000 < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,135 @@
+from datetime import date, datetime, time, timedelta
+from uuid import uuid4
+
+from sqlalchemy import event, func, select
+
+from app.data.seed_data import seed_initial_data
+from app.models import DailyLog, ExerciseEntry, FoodItem, InsulinScore, MealEntry, SyncOperation, VitalsEntry
+from test_copilot import auth_headers, build_test_client
+
+
+def _food_ids(session_local) -> dict[str, int]:
+    with session_local() as db:
+        seed_initial_data(db)
+        return {food.name: food.id for food in db.scalars(select(FoodItem))}
+
+
+def _week_of_operations(foods: dict[str, int], meals_per_day: int, servings: float = 1.0) -> list[dict]:
+    start = date.today() - timedelta(days=6)
+    operations: list[dict] = []
+    for offset in range(7):
+        day = start + timedelta(days=offset)
+        for meal in range(meals_per_day):
+            operations.append(
+                {
+                    "op_id": str(uuid4()),
+                    "type": "meal",
+                    "data": {
+                        "consumed_at": datetime.combine(day, time(hour=10 + meal % 4, minute=meal)).isoformat(),
+                        "entries": [
+                            {"food_item_id": foods["Dal"], "servings": servings},
+                            {"food_item_id": foods["Chapati"], "servings": servings},
+                        ],
+                    },
+                }
+            )
+        operations.append({"op_id": str(uuid4()), "type": "hydration", "data": {"amount_ml": 500, "log_date": day.isoformat()}})
+        operations.append(
+            {
+                "op_id": str(uuid4()),
+                "type": "exercise",
+                "data": {
+                    "activity_type": "walk",
+                    "exercise_category": "WALK",
+                    "movement_type": "post_meal_walk",
+                    "duration_minutes": 20,
+                    "performed_at": datetime.combine(day, time(hour=20)).isoformat(),
+                },
+            }
+        )
+    vitals = {"weight_kg": 80.0, "fasting_glucose": 95.0, "hba1c": 5.6, "triglycerides": 150.0, "hdl": 45.0, "waist_cm": 90.0}
+    operations.append({"op_id": str(uuid4()), "type": "vitals", "data": vitals})
+    return operations
+
+
+def _post_counting_statements(client, session_local, payload, headers) -> tuple[dict, int]:
+    engine = session_local.kw["bind"]
+    statements: list[str] = []
+
+    def record(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post("/sync/batch", json=payload, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200, response.text
+    return response.json(), len(statements)
+
+
+def test_week_replay_applies_once_and_retries_are_duplicates():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    foods = _food_ids(session_local)
+    operations = _week_of_operations(foods, meals_per_day=3)
+
+    body = client.post("/sync/batch", json={"operations": operations}, headers=headers).json()
+    assert body["applied"] == len(operations) and body["duplicates"] == 0 and body["rejected"] == 0
+    assert len(body["days"]) == 7
+
+    retry = client.post("/sync/batch", json={"operations": operations}, headers=headers).json()
+    assert retry["applied"] == 0 and retry["duplicates"] == len(operations)
+    assert [result["entity_id"] for result in retry["results"]] == [result["entity_id"] for result in body["results"]]
+
+    with session_local() as db:
+        assert db.scalar(select(func.count()).select_from(DailyLog)) == 7
+        assert db.scalar(select(func.count()).select_from(MealEntry)) == 7 * 3 * 2
+        assert db.scalar(select(func.count()).select_from(ExerciseEntry)) == 7
+        assert db.scalar(select(func.count()).select_from(VitalsEntry)) == 1
+        assert db.scalar(select(func.count()).select_from(SyncOperation)) == len(operations)
+        # One evaluation per touched day, not one per replayed meal.
+        assert db.scalar(select(func.count()).select_from(InsulinScore)) == 7
+        for daily_log in db.scalars(select(DailyLog)):
+            assert daily_log.water_ml == 500
+            assert daily_log.total_carbs == 3 * (20.0 + 18.0)
+
+
+def test_statement_count_does_not_grow_with_operations_per_day():
+    counts = []
+    # Same daily totals either way, so both batches fire the same alerts.
+    for meals_per_day, servings in ((1, 6.0), (6, 1.0)):
+        client, session_local = build_test_client()
+        headers = auth_headers(client)
+        foods = _food_ids(session_local)
+        body, statement_count = _post_counting_statements(
+            client, session_local, {"operations": _week_of_operations(foods, meals_per_day, servings)}, headers
+        )
+        assert body["applied"] == 7 * (meals_per_day + 2) + 1
+        counts.append(statement_count)
+
+    assert counts[1] == counts[0]
+
+
+def test_invalid_operations_are_rejected_without_blocking_the_batch():
+    client, session_local = build_test_client()
+    headers = auth_headers(client)
+    foods = _food_ids(session_local)
+    consumed_at = datetime.combine(date.today(), time(hour=10)).isoformat()
+    operations = [
+        {"op_id": str(uuid4()), "type": "meal", "data": {"consumed_at": consumed_at, "entries": [{"food_item_id": 999_999}]}},
+        {"op_id": str(uuid4()), "type": "meal", "data": {"consumed_at": consumed_at, "entries": [{"food_item_id": foods["Dal"]}]}},
+        {
+            "op_id": str(uuid4()),
+            "type": "exercise",
+            "data": {"activity_type": "walk", "exercise_category": "WALK", "movement_type": "sprint", "duration_minutes": 10},
+        },
+    ]
+
+    body = client.post("/sync/batch", json={"operations": operations}, headers=headers).json()
+
+    assert [result["status"] for result in body["results"]] == ["rejected", "applied", "rejected"]
+    assert body["results"][0]["detail"] == "One or more food items not found"
+    retry = client.post("/sync/batch", json={"operations": operations[:1]}, headers=headers).json()
+    assert retry["results"][0]["status"] == "duplicate"
+    assert retry["results"][0]["detail"] == "One or more food items not found"
@@ -0,0 +1,135 @@
+import threading
+import time
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core import security, token_claims
+from app.core.security import create_access_token, get_current_token_claims
+from app.core.token_claims import TokenDenyList, token_claims_cache
+from test_copilot import auth_headers, build_test_client
+
+
+def _count_decodes(monkeypatch) -> list[str]:
+    calls = []
+    original = security.decode_token
+
+    def counting_decode(token):
+        calls.append(token)
+        return original(token)
+
+    monkeypatch.setattr(security, "decode_token", counting_decode)
+    return calls
+
+
+def test_token_is_verified_once_and_reused_across_requests(monkeypatch):
+    token_claims_cache.clear()
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+    decodes = _count_decodes(monkeypatch)
+
+    for _ in range(5):
+        assert client.get("/auth/me", headers=headers).status_code == 200
+    assert len(decodes) == 1
+
+
+def test_logout_revokes_the_access_token():
+    client, _ = build_test_client()
+    headers = auth_headers(client)
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    response = client.post("/auth/logout", headers=headers | {"X-CSRF-Token": client.cookies["csrf_token"]})
+    assert response.status_code == 200
+
+    response = client.get("/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revoked"
+
+
+def test_middleware_claims_are_not_decoded_again(monkeypatch):
+    app = FastAPI()
+    app.add_middleware(security.AuthRequiredMiddleware)
+
+    @app.get("/whoami")
+    def whoami(claims: dict = Depends(get_current_token_claims)):
+        return {"sub": claims["sub"]}
+
+    token_claims_cache.clear()
+    decodes = _count_decodes(monkeypatch)
+    headers = {"Authorization": f"Bearer {create_access_token(7, 'user')}"}
+    response = TestClient(app).get("/whoami", headers=headers)
+    assert response.json() == {"sub": "7"}
+    assert len(decodes) == 1
+
+
+def test_deny_list_forgets_tokens_once_they_expire():
+    deny_list = TokenDenyList()
+    deny_list.deny("live", time.time() + 60)
+    deny_list.deny("expired", time.time() - 1)
+    assert deny_list.is_denied("live")
+    assert not deny_list.is_denied("expired")
+    assert not deny_list.is_denied(None)
+
+
+class _FlakyDenyPubSub:
+    def __init__(self, drops: bool):
+        self.drops = drops
+
+    def subscribe(self, _channel):
+        pass
+
+    def listen(self):
+        if self.drops:
+            raise ConnectionError("redis went away")
+        threading.Event().wait()
+        yield
+
+    def close(self):
+        pass
+
+
+class _FlakyDenyRedis:
+    """The first connection drops; a token is revoked elsewhere before the listener reconnects."""
+
+    def __init__(self):
+        self.connections = [_FlakyDenyPubSub(drops=True), _FlakyDenyPubSub(drops=False)]
+        self.stored: dict[str, int] = {}
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        if len(self.connections) == 1:
+            self.stored["auth_deny:revoked-while-down"] = 60
+        return self.connections.pop(0)
+
+    def scan_iter(self, match):
+        return list(self.stored)
+
+    def ttl(self, key):
+        return self.stored[key]
+
+
+def test_deny_list_listener_reconnects_and_reloads_denials(monkeypatch):
+    monkeypatch.setattr(token_claims, "LISTENER_RETRY_INITIAL_SECONDS", 0.01)
+    deny_list = TokenDenyList(redis_url="redis://deny-list")
+    deny_list._redis = _FlakyDenyRedis()
+
+    deadline = time.monotonic() + 2
+    while not deny_list.is_denied("revoked-while-down") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert deny_list.is_denied("revoked-while-down")
+
+
+def test_cached_claims_cut_auth_overhead_per_request():
+    token = create_access_token(1, "user")
+    header = f"Bearer {token}"
+    rounds = 2000
+
+    def per_request(use_cache: bool) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            if not use_cache:
+                token_claims_cache.clear()
+            get_current_token_claims(Request({"type": "http", "method": "GET", "path": "/auth/me", "headers": []}), header)
+        return (time.perf_counter() - started) / rounds
+
+    uncached, cached = per_request(False), per_request(True)
+    assert cached < uncached / 2
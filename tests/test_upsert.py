@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.api import routes
+from app.core.config import settings
+from app.db.base import Base
+from app.models import (
+    ChallengeFrequency,
+    ChallengeStreak,
+    DailyLog,
+    LLMUsageDaily,
+    MetabolicAgentState,
+    MetabolicProfile,
+    NotificationSettings,
+    SecurityAuditLog,
+    User,
+)
+from app.routers.copilot_router import _increment_llm_daily_usage
+from app.services.challenge_engine import ChallengeEngine
+from app.services.daily_totals import get_or_create_daily_log
+from app.services.metabolic_agent import metabolic_agent_service
+from app.services.notification_service import notification_service
+from app.services.rule_engine import get_or_create_metabolic_profile
+
+THREADS = 12
+
+CASES = {
+    "daily_log": (DailyLog, lambda db, user: get_or_create_daily_log(db, user.id, date(2026, 3, 1))),
+    "metabolic_profile": (MetabolicProfile, get_or_create_metabolic_profile),
+    "notification_settings": (NotificationSettings, lambda db, user: notification_service.get_or_create_settings(db, user.id)),
+    "agent_state": (MetabolicAgentState, metabolic_agent_service._get_or_create_agent_state),
+    "challenge_streak": (ChallengeStreak, lambda db, user: ChallengeEngine(db).get_or_create_streak(user.id, ChallengeFrequency.DAILY)),
+}
+
+
+def _race_sessions(tmp_path):
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'upsert.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    with SessionLocal() as db:
+        db.add(User(email="race@example.com", hashed_password="x"))
+        db.commit()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def widen_race_window(_conn, _cursor, statement, *_args):
+        # Give every thread time to finish its existence check before anyone inserts.
+        if statement.lstrip().upper().startswith("SELECT"):
+            time.sleep(0.05)
+
+    return SessionLocal
+
+
+def _hammer(SessionLocal, call) -> tuple[list[object], list[Exception]]:
+    barrier = threading.Barrier(THREADS)
+    errors: list[Exception] = []
+    results: list[object] = []
+
+    def worker():
+        with SessionLocal() as db:
+            user = db.scalar(select(User))
+            barrier.wait()
+            try:
+                results.append(call(db, user))
+                db.commit()
+            except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+                errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_get_or_create_is_race_free(tmp_path, case):
+    model, get_or_create_row = CASES[case]
+    SessionLocal = _race_sessions(tmp_path)
+
+    def row_key(db, user):
+        row = get_or_create_row(db, user)
+        return getattr(row, "id", None) or row.user_id
+
+    row_keys, errors = _hammer(SessionLocal, row_key)
+
+    assert errors == []
+    assert len(set(row_keys)) == 1
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(model)) == 1
+
+
+@pytest.mark.parametrize("increment", [routes._increment_llm_daily_usage, _increment_llm_daily_usage], ids=["routes", "copilot"])
+def test_llm_daily_usage_is_race_free_under_the_limit(tmp_path, monkeypatch, increment):
+    monkeypatch.setattr(settings, "llm_requests_per_day", 5)
+    SessionLocal = _race_sessions(tmp_path)
+
+    admitted, errors = _hammer(SessionLocal, lambda db, user: increment(db, user.id, "/llm/analyze", "127.0.0.1"))
+
+    assert errors == []
+    assert sorted(admitted) == [False] * (THREADS - 5) + [True] * 5
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(LLMUsageDaily)) == 1
+        assert db.scalar(select(LLMUsageDaily.request_count)) == 5
+
+
+def test_llm_daily_limit_audit_records_the_actual_count(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'usage.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(settings, "llm_requests_per_day", 3)
+    with sessionmaker(bind=engine, autoflush=False)() as db:
+        user = User(email="usage@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        # The limit was lowered after this user had already made five calls today.
+        db.add(LLMUsageDaily(user_id=user.id, usage_date=date.today(), request_count=5))
+        db.commit()
+
+        assert _increment_llm_daily_usage(db, user.id, "/copilot/message", "127.0.0.1") is False
+        db.commit()
+        details = json.loads(db.scalar(select(SecurityAuditLog.details).where(SecurityAuditLog.event_type == "excess_llm_calls")))
+        assert details == {"daily_count": 5, "daily_limit": 3}